@@ -4,6 +4,7 @@
 #       resolving Qt platform plugin errors on certain environments.
 
 import os
+import sys
 import json
 import pandas as pd
 import numpy as np
@@ -19,6 +20,8 @@ PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
 INPUT_JSON = os.path.join(PROJECT_ROOT, 'experiment_summary.json')
 REPLAYS_DIR = os.path.join(PROJECT_ROOT, 'replays')
 OUTPUT_DIR = os.path.join(PROJECT_ROOT, 'reports')
+sys.path.insert(0, PROJECT_ROOT)
+from analysis.replay_io import list_replays, load_replay
 
 # --- Data Loading and Processing Functions (Unchanged) ---
 
@@ -43,30 +46,22 @@ def load_summary_data(json_path):
 def load_and_process_replay_data(replays_path):
     """Loads all replay files for trajectory plot."""
     if not os.path.exists(replays_path): return None
-    replay_files = [f for f in os.listdir(replays_path) if f.endswith('.json')]
+    replay_files = list_replays(replays_path)
     if not replay_files: return None
         
     all_replay_dfs = []
     print(f"Processing {len(replay_files)} replay files for 3D trajectory analysis...")
-    for filename in replay_files:
-        filepath = os.path.join(replays_path, filename)
-        with open(filepath, 'r') as f: replay_data = json.load(f)
-        timestamps = replay_data.get('timestamps', [])
-        if not timestamps: continue
+    for filepath in replay_files:
+        replay = load_replay(filepath)
+        if not len(replay): continue
 
-        frame_data = []
-        for frame in timestamps:
-            blue_health = sum(a['health'] for a in frame['agents'] if a['team_id'] == 1)
-            blue_max_health = sum(a['max_health'] for a in frame['agents'] if a['team_id'] == 1)
-            red_health = sum(a['health'] for a in frame['agents'] if a['team_id'] == 2)
-            red_max_health = sum(a['max_health'] for a in frame['agents'] if a['team_id'] == 2)
-            frame_info = {
-                'time': frame['time'],
-                'blue_health_pct': 100 * (blue_health / blue_max_health) if blue_max_health > 0 else 0,
-                'red_health_pct': 100 * (red_health / red_max_health) if red_max_health > 0 else 0,
-            }
-            frame_data.append(frame_info)
-        all_replay_dfs.append(pd.DataFrame(frame_data))
+        blue_health, blue_max_health = replay.team_health(1)
+        red_health, red_max_health = replay.team_health(2)
+        all_replay_dfs.append(pd.DataFrame({
+            'time': replay.time,
+            'blue_health_pct': np.divide(100 * blue_health, blue_max_health, out=np.zeros(len(replay)), where=blue_max_health > 0),
+            'red_health_pct': np.divide(100 * red_health, red_max_health, out=np.zeros(len(replay)), where=red_max_health > 0),
+        }))
 
     if not all_replay_dfs: return None
         
@@ -4,6 +4,7 @@
 #       resolving Qt platform plugin errors on certain environments.
 
 import os
+import sys
 import json
 import pandas as pd
 import numpy as np
@@ -18,6 +19,8 @@ PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
 INPUT_JSON = os.path.join(PROJECT_ROOT, 'experiment_summary.json')
 REPLAYS_DIR = os.path.join(PROJECT_ROOT, 'replays')
 OUTPUT_DIR = os.path.join(PROJECT_ROOT, 'reports')
+sys.path.insert(0, PROJECT_ROOT)
+from analysis.replay_io import list_replays, load_replay
 
 # --- Part A: Macro Analysis Functions (Unchanged) ---
 
@@ -90,33 +93,26 @@ def load_and_process_replay_data(replays_path):
     if not os.path.exists(replays_path):
         print(f"Warning: Replays directory not found at '{os.path.abspath(replays_path)}'. Skipping time-series charts.")
         return None
-    replay_files = [f for f in os.listdir(replays_path) if f.endswith('.json')]
+    replay_files = list_replays(replays_path)
     if not replay_files:
         print("Warning: No replay files found. Skipping time-series charts.")
         return None
     all_replay_dfs = []
     print(f"\nProcessing {len(replay_files)} replay files for time-series analysis...")
-    for i, filename in enumerate(replay_files):
-        print(f"  - Reading replay {i+1}/{len(replay_files)}: {filename}")
-        filepath = os.path.join(replays_path, filename)
-        with open(filepath, 'r') as f: replay_data = json.load(f)
-        timestamps = replay_data.get('timestamps', [])
-        if not timestamps: continue
-        frame_data = []
-        for frame in timestamps:
-            blue_health = sum(a['health'] for a in frame['agents'] if a['team_id'] == 1)
-            blue_max_health = sum(a['max_health'] for a in frame['agents'] if a['team_id'] == 1)
-            red_health = sum(a['health'] for a in frame['agents'] if a['team_id'] == 2)
-            red_max_health = sum(a['max_health'] for a in frame['agents'] if a['team_id'] == 2)
-            frame_info = {
-                'time': frame['time'], 'blue_survivors': frame['blue_count'], 'red_survivors': frame['red_count'],
-                'blue_health_pct': 100 * (blue_health / blue_max_health) if blue_max_health > 0 else 0,
-                'red_health_pct': 100 * (red_health / red_max_health) if red_max_health > 0 else 0,
-                'tasks_open': sum(1 for t in frame['tasks'] if t['status'] == 'OPEN'),
-                'tasks_assigned': sum(1 for t in frame['tasks'] if t['status'] == 'ASSIGNED')
-            }
-            frame_data.append(frame_info)
-        all_replay_dfs.append(pd.DataFrame(frame_data))
+    for i, filepath in enumerate(replay_files):
+        print(f"  - Reading replay {i+1}/{len(replay_files)}: {os.path.basename(filepath)}")
+        replay = load_replay(filepath)
+        if not len(replay): continue
+        # Whole-run columns, one value per frame.
+        blue_health, blue_max_health = replay.team_health(1)
+        red_health, red_max_health = replay.team_health(2)
+        all_replay_dfs.append(pd.DataFrame({
+            'time': replay.time, 'blue_survivors': replay.blue_count, 'red_survivors': replay.red_count,
+            'blue_health_pct': np.divide(100 * blue_health, blue_max_health, out=np.zeros(len(replay)), where=blue_max_health > 0),
+            'red_health_pct': np.divide(100 * red_health, red_max_health, out=np.zeros(len(replay)), where=red_max_health > 0),
+            'tasks_open': replay.task_counts('OPEN'),
+            'tasks_assigned': replay.task_counts('ASSIGNED')
+        }))
     if not all_replay_dfs:
         print("Warning: No valid timestamp data found in replays.")
         return None
@@ -2,129 +2,174 @@
 # UPGRADED: The manager now produces a rich, self-contained JSON summary file,
 # logging all critical configuration and detailed run-by-run results.
 
-import copy, time, json, multiprocessing, uuid, os, traceback
+import copy, json, multiprocessing, os, traceback
 from datetime import datetime, timezone
 
+import numpy as np
+
 from core.battlefield import Battlefield
+from core.jit_warmup import warm_up_kernels
+from intelligence.market_metrics import MarketMetrics
+from analysis.replay_io import ReplayRecorder, replay_path
+
+def init_worker():
+    """Pool initializer: loads every kernel once, before the worker takes its first run."""
+    warm_up_kernels()
 
 def run_single_sim_task(config_and_id):
-    config, sim_id = config_and_id
-    run_summary = { "simulation_id": sim_id, "error": None }
+    """
+    Runs one simulation, streaming its replay to `replay_file` (if given).
+    Returns only the run summary; the replay stays on disk. Termination and
+    payoff come from the battlefield's running team counters, so a run
+    without a replay never builds a snapshot.
+    """
+    config, sim_id, seed, replay_file = config_and_id
+    run_summary = { "simulation_id": sim_id, "seed": seed, "error": None }
+    recorder = None
     
     try:
-        import pygame
-        pygame.init()
-        battlefield = Battlefield(config)
-        start_time = time.time(); max_duration_seconds = 60
+        # Already done by the pool initializer; this returns that report (or warms up a serial caller).
+        run_summary["jit_warmup"] = warm_up_kernels()
+        battlefield = Battlefield(config, seed=seed)
+        max_duration_seconds = 60 # Simulated seconds
         
         # Get metadata from the specific config for this run
         blue_strat_name = config['TEAM_BLUE_CONFIG']['strategy_name']
         red_profile = config['TEAM_RED_CONFIG'].get('active_strategy_profile', {})
         red_strat_name = red_profile.get('display_name', 'Unknown')
         
-        simulation_log = {"metadata": {}, "timestamps": []}
+        dt = 0.016
+        if replay_file:
+            recorder = ReplayRecorder(replay_file, config['GLOBAL_SIMULATION_SETTINGS'].get('REPLAY_RECORDING'), tick_seconds=dt)
         
-        blue_id = config['TEAM_BLUE_CONFIG']['id']
-        red_id = config['TEAM_RED_CONFIG']['id']
-        initial_blue_value = sum(agent.health for agent in battlefield.agents if agent.team_id == blue_id)
-        initial_red_value = sum(agent.health for agent in battlefield.agents if agent.team_id == red_id)
+        initial_blue_value, initial_red_value = battlefield.team_health_totals()
         
-        current_time, dt = 0.0, 0.016
         while True:
-            battlefield.update(dt=dt); current_time += dt
-            snapshot = battlefield.get_snapshot()
-            snapshot['time'] = round(current_time, 3)
-            simulation_log["timestamps"].append(snapshot)
-            blue_alive, red_alive = snapshot['blue_count'] > 0, snapshot['red_count'] > 0
-            if not blue_alive or not red_alive or (time.time() - start_time > max_duration_seconds): break
+            battlefield.update(dt=dt); current_time = battlefield.clock.now()
+            blue_count, red_count = battlefield.team_alive_counts()
+            finished = blue_count == 0 or red_count == 0 or current_time >= max_duration_seconds
+            # The last tick is always recorded, so the replay ends on the final state.
+            if recorder: recorder.capture(battlefield, force_frame=finished)
+            if finished: break
             
-        final_snapshot = battlefield.get_snapshot()
-        final_blue_value = sum(a['health'] for a in final_snapshot['agents'] if a['team_id'] == blue_id)
-        final_red_value = sum(a['health'] for a in final_snapshot['agents'] if a['team_id'] == red_id)
+        final_blue_value, final_red_value = battlefield.team_health_totals()
         
         payoff = (initial_red_value - final_red_value) - (initial_blue_value - final_blue_value)
         
-        # Populate the full log for replay
-        simulation_log["metadata"] = {
-            "simulation_id": sim_id, "blue_strategy": blue_strat_name, "red_strategy": red_strat_name,
-            "duration": round(current_time, 2),
-            "result": { "payoff": round(payoff, 2), "blue_survivors": final_snapshot['blue_count'], "red_survivors": final_snapshot['red_count'] }
-        }
+        # Finish the replay file with the run's metadata
+        if recorder:
+            recorder.close({
+                "simulation_id": sim_id, "blue_strategy": blue_strat_name, "red_strategy": red_strat_name,
+                "seed": seed, "duration": round(current_time, 2),
+                "result": { "payoff": round(payoff, 2), "blue_survivors": blue_count, "red_survivors": red_count }
+            })
         
         # Populate the concise summary for the main report
         run_summary.update({
             "payoff": round(payoff, 2), "duration": round(current_time, 2),
-            "blue_survivors": final_snapshot['blue_count'], "red_survivors": final_snapshot['red_count']
+            "blue_survivors": blue_count, "red_survivors": red_count,
+            "auction": dict(battlefield.blue_marketplace.auction_stats)
         })
+        market_metrics = battlefield.blue_marketplace.metrics.summary()
+        if market_metrics is not None: run_summary["market_metrics"] = market_metrics
+        if recorder: run_summary["replay_file"] = replay_file.replace('\\', '/') # Use forward slashes
         
-        return simulation_log, run_summary
+        return run_summary
 
     except Exception as e:
         run_summary["error"] = f"{type(e).__name__}: {e}"
         traceback.print_exc()
-        return None, run_summary
+        if recorder: recorder.abort()
+        return run_summary
 
 
 class ExperimentManager:
     def __init__(self, base_config):
         self.base_config = base_config
         self.results = {} # This will now store much richer data
+        seed = base_config.get('GLOBAL_SIMULATION_SETTINGS', {}).get('RANDOM_SEED')
+        self.base_seed = seed if seed is not None else np.random.SeedSequence().entropy
         try: self.worker_count = max(1, multiprocessing.cpu_count() - 2)
         except NotImplementedError: self.worker_count = 1
         print(f"Detected {multiprocessing.cpu_count()} CPU cores. Using {self.worker_count} worker processes.")
         self.replays_dir = "replays"
         if not os.path.exists(self.replays_dir):
             os.makedirs(self.replays_dir)
+        self.jit_report = {"parent": None, "workers": {}}
+        settings = base_config.get('GLOBAL_SIMULATION_SETTINGS', {})
+        self.replay_format = settings.get('REPLAY_FORMAT', 'npz')
+        # Summary-only sweeps record a replay for just one run in every REPLAY_SAMPLE_EVERY (0: none).
+        self.summary_only = bool(settings.get('SUMMARY_ONLY', False))
+        self.replay_sample_every = int(settings.get('REPLAY_SAMPLE_EVERY', 20))
 
     def run_experiments(self, blue_strategies, red_strategies, runs_per_matchup=10):
         print("="*50); print("Starting Parallel Experiment Suite...")
+        # Compile every kernel once before any pool is spawned, so workers only load the on-disk cache.
+        self.jit_report["parent"] = warm_up_kernels()
+        print(f"JIT warm-up in parent: {self.jit_report['parent']['total_seconds']:.2f}s")
         
-        for b_strat_name in blue_strategies:
+        # The whole sweep is flattened into one task list: sim_id -> (matchup, run index).
+        tasks, run_slots, matchup_runs = [], {}, {}
+        for b_index, b_strat_name in enumerate(blue_strategies):
             # Note: red_strategies is now a list of display names
-            for r_strat_name in red_strategies:
+            for r_index, r_strat_name in enumerate(red_strategies):
                 # The key is now based on display names for clarity
                 matchup_key = f"{b_strat_name}_vs_{r_strat_name}"
-                print(f"\n--- Running Matchup: {matchup_key} ---")
-                
-                tasks = []
                 # We only need one config for the matchup, as it's the same for all runs
                 run_config = copy.deepcopy(self.base_config)
+                self.results[matchup_key] = {"config_snapshot": self._create_config_snapshot(run_config), "individual_runs": []}
+                matchup_runs[matchup_key] = [None] * runs_per_matchup
                 
                 for i in range(runs_per_matchup):
                     # Create a unique ID for each run
                     sim_id = f"sim_{b_strat_name.replace(' ', '')}_vs_{r_strat_name.replace(' ', '')}_{i+1}"
-                    tasks.append((run_config, sim_id))
+                    replay_file = replay_path(self.replays_dir, sim_id, self.replay_format) if self._records_replay(i) else None
+                    tasks.append((run_config, sim_id, self._derive_run_seed(b_index, r_index, i), replay_file))
+                    run_slots[sim_id] = (matchup_key, i)
 
-                with multiprocessing.Pool(processes=self.worker_count) as pool:
-                    print(f"  Dispatching {len(tasks)} runs to {self.worker_count} worker(s)...")
-                    # The result is now a list of (log, summary) tuples
-                    run_results = pool.map(run_single_sim_task, tasks)
-                    print("  All runs for this matchup are complete.")
-                
-                # --- NEW: Process rich results ---
-                individual_run_summaries = []
-                for full_log, run_summary in run_results:
-                    if run_summary.get("error"):
-                        print(f"  Run {run_summary['simulation_id']} failed: {run_summary['error']}")
-                        continue
-                    
-                    if full_log:
-                        replay_filename = os.path.join(self.replays_dir, f"{full_log['metadata']['simulation_id']}.json")
-                        with open(replay_filename, 'w') as f: json.dump(full_log, f)
-                        run_summary['replay_file'] = replay_filename.replace('\\', '/') # Use forward slashes
-                        print(f"    - Detailed log saved to {replay_filename}")
-                    
-                    individual_run_summaries.append(run_summary)
+        # One pool for the whole sweep; runs are handed out one at a time, so a slow run never
+        # holds the other workers back. Spawned (not forked) workers: the parent has already loaded
+        # the parallel steering kernel, and a fork after Numba's threading layer has started can deadlock.
+        replay_count = sum(1 for task in tasks if task[3])
+        print(f"Dispatching {len(tasks)} runs over {len(matchup_runs)} matchup(s) to {self.worker_count} worker(s), recording {replay_count} replay(s)...")
+        with multiprocessing.get_context("spawn").Pool(processes=self.worker_count, initializer=init_worker) as pool:
+            # Workers write their own replays, so only the small run summaries come back here.
+            for done, run_summary in enumerate(pool.imap_unordered(run_single_sim_task, tasks), start=1):
+                matchup_key, run_index = run_slots[run_summary['simulation_id']]
+                self._record_worker_jit(run_summary.pop("jit_warmup", None))
+                if run_summary.get("error"):
+                    print(f"  [{done}/{len(tasks)}] Run {run_summary['simulation_id']} failed: {run_summary['error']}")
+                    continue
                 
-                # Store everything for this matchup
-                self.results[matchup_key] = {
-                    "config_snapshot": self._create_config_snapshot(run_config),
-                    "individual_runs": individual_run_summaries
-                }
+                print(f"  [{done}/{len(tasks)}] {run_summary['simulation_id']}: payoff {run_summary['payoff']}")
+                matchup_runs[matchup_key][run_index] = run_summary
+
+        # Runs finish in any order; each matchup keeps its runs in run order.
+        for matchup_key, runs in matchup_runs.items():
+            individual_run_summaries = [run for run in runs if run is not None]
+            self.results[matchup_key]["individual_runs"] = individual_run_summaries
+            matchup_metrics = MarketMetrics.aggregate([run.get("market_metrics") for run in individual_run_summaries])
+            if matchup_metrics is not None: self.results[matchup_key]["market_metrics"] = matchup_metrics
         
         print("\nParallel Experiment Suite Finished!")
         return self.results
     
+    def _records_replay(self, run_index):
+        if not self.summary_only: return True
+        return self.replay_sample_every > 0 and run_index % self.replay_sample_every == 0
+
+    def _record_worker_jit(self, report):
+        if not report: return
+        pid = str(report["pid"])
+        if pid not in self.jit_report["workers"]:
+            self.jit_report["workers"][pid] = report
+            print(f"  JIT warm-up in worker {pid}: {report['total_seconds']:.2f}s")
+
+    def _derive_run_seed(self, blue_index, red_index, run_index):
+        """Derives an independent, reproducible seed for one run from the suite's base seed."""
+        sequence = np.random.SeedSequence(self.base_seed, spawn_key=(blue_index, red_index, run_index))
+        return int(sequence.generate_state(1, dtype=np.uint64)[0])
+
     def _create_config_snapshot(self, config):
         """Creates a concise snapshot of the run's configuration."""
         blue_comp = config['TEAM_BLUE_CONFIG']['swarm_composition']
@@ -172,7 +217,10 @@ class ExperimentManager:
         final_report = {
             "experiment_metadata": {
                 "timestamp_utc": datetime.now(timezone.utc).isoformat(),
-                "aegis_version": "3.1"
+                "aegis_version": "3.1",
+                "base_seed": self.base_seed,
+                "run_mode": {"summary_only": self.summary_only, "replay_sample_every": self.replay_sample_every if self.summary_only else 1},
+                "jit_warmup": self.jit_report
             },
             "global_settings": self.base_config.get('GLOBAL_SIMULATION_SETTINGS', {}),
             "matchup_results": []
@@ -203,7 +251,11 @@ class ExperimentManager:
                 "summary_stats": summary_stats,
                 "individual_runs": runs
             }
+            if "market_metrics" in matchup_data: report_entry["market_metrics"] = matchup_data["market_metrics"]
             final_report['matchup_results'].append(report_entry)
+
+        suite_metrics = MarketMetrics.aggregate([data.get("market_metrics") for data in self.results.values()])
+        if suite_metrics is not None: final_report["market_metrics"] = suite_metrics
             
         with open(filename, 'w') as f:
             json.dump(final_report, f, indent=4)
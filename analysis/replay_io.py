@@ -0,0 +1,485 @@
+# Aegis Swarm 3.2 - Replay I/O
+# Replays are written by the worker that runs the simulation, one frame at a
+# time, so neither the worker nor the experiment parent ever holds a whole
+# run in memory. Frames are encoded as they arrive and flushed to disk in
+# chunks of a bounded size.
+#
+# Two formats are supported:
+# - JSON (.json): the legacy list of per-frame snapshot dicts.
+# - Binary (.npz): a zip of NumPy arrays. A static agent manifest (id, team,
+#   role, max health) is stored once; every chunk of frames holds float32
+#   position/health columns over the manifest plus a packed presence mask,
+#   with tasks and events in side tables. Members are deflate-compressed.
+#   Positions can instead be stored as quantized deltas between keyframes,
+#   and health as a list of changes.
+# `load_replay` reads either into the same columnar ReplayData.
+#
+# ReplayRecorder applies a recording policy while a run is simulated: only
+# every Nth tick is stored as a frame, while detonations and task status
+# changes go to an event log at full tick resolution. The policy is kept in
+# the replay metadata so the Replayer can interpolate between frames.
+
+import argparse
+import json
+import os
+import shutil
+import zipfile
+import numpy as np
+
+from core.task import STATUS_NAMES
+
+REPLAY_FORMATS = {'json': '.json', 'npz': '.npz'}
+NPZ_FORMAT_VERSION = 1
+
+class JsonReplayWriter:
+    """
+    Streams a replay to a JSON file of the form {"timestamps": [...],
+    "metadata": {...}}. The file is written under a ".part" name and only
+    renamed into place by `close`, so an aborted run never leaves a truncated
+    replay behind.
+    """
+    def __init__(self, path, chunk_frames=256, **encoding_options):
+        # Delta encoding is a binary-format option; JSON frames are always stored in full.
+        self.path = path
+        self.chunk_frames = max(1, int(chunk_frames))
+        self.frame_count = 0
+        self.event_count = 0
+        self._part_path = path + ".part"
+        self._file = open(self._part_path, 'w')
+        self._file.write('{"timestamps": [')
+        self._buffer = []
+        # The event log goes to a side file and is appended to the replay by `close`.
+        self._event_path = path + ".events.part"
+        self._event_file = open(self._event_path, 'w')
+
+    def log_event(self, event):
+        if self.event_count: self._event_file.write(', ')
+        self._event_file.write(json.dumps(event))
+        self.event_count += 1
+
+    def write_frame(self, frame):
+        self._buffer.append(json.dumps(frame))
+        if len(self._buffer) >= self.chunk_frames: self._flush()
+
+    def _flush(self):
+        if not self._buffer: return
+        if self.frame_count: self._file.write(', ')
+        self._file.write(', '.join(self._buffer))
+        self.frame_count += len(self._buffer)
+        self._buffer.clear()
+
+    def close(self, metadata):
+        """Writes the metadata, finishes the file and moves it into place. Returns the path."""
+        self._flush()
+        self._file.write(']')
+        self._event_file.close()
+        if self.event_count:
+            self._file.write(', "event_log": [')
+            with open(self._event_path, 'r') as events: shutil.copyfileobj(events, self._file)
+            self._file.write(']')
+        os.remove(self._event_path)
+        self._file.write(', "metadata": ' + json.dumps(metadata) + '}')
+        self._file.close()
+        os.replace(self._part_path, self.path)
+        return self.path
+
+    def abort(self):
+        """Discards the partial files."""
+        self._file.close(); self._event_file.close()
+        for path in (self._part_path, self._event_path):
+            if os.path.exists(path): os.remove(path)
+
+def _id_array(ids):
+    # Engine ids are integers; replays recorded before that used UUID strings.
+    return np.array(ids) if ids else np.zeros(0, dtype=np.int64)
+
+class _FrameColumns:
+    """
+    Accumulates snapshot dicts as columns. Agents get a manifest column the
+    first time they appear; `take_chunk` returns the buffered frames as arrays
+    over the manifest as it stands, and starts a new chunk.
+    """
+    def __init__(self):
+        self.column_of_agent = {}
+        self.manifest = {"agent_id": [], "agent_team": [], "agent_role": [], "agent_max_health": []}
+        self._reset()
+
+    def _reset(self):
+        self.frames = 0
+        self.time, self.blue_count, self.red_count, self.events = [], [], [], []
+        self.agent_columns, self.agent_pos, self.agent_health = [], [], []
+        self.task_count, self.tasks = [], []
+
+    def add(self, frame):
+        columns = []
+        for agent in frame.get("agents", []):
+            column = self.column_of_agent.get(agent["id"])
+            if column is None:
+                column = self.column_of_agent[agent["id"]] = len(self.manifest["agent_id"])
+                self.manifest["agent_id"].append(agent["id"]); self.manifest["agent_team"].append(agent["team_id"])
+                self.manifest["agent_role"].append(agent.get("role", "")); self.manifest["agent_max_health"].append(agent["max_health"])
+            columns.append(column)
+            self.agent_pos.append(agent["pos"]); self.agent_health.append(agent["health"])
+        self.agent_columns.append(columns)
+        tasks = frame.get("tasks", [])
+        self.task_count.append(len(tasks)); self.tasks.extend(tasks)
+        self.time.append(frame.get("time", 0.0))
+        self.blue_count.append(frame.get("blue_count", 0)); self.red_count.append(frame.get("red_count", 0))
+        self.events.append(frame.get("events", []))
+        self.frames += 1
+
+    def take_chunk(self):
+        num_frames, num_agents = self.frames, len(self.manifest["agent_id"])
+        pos = np.zeros((num_frames, num_agents, 2), dtype=np.float32)
+        health = np.zeros((num_frames, num_agents), dtype=np.float32)
+        present = np.zeros((num_frames, num_agents), dtype=np.bool_)
+        frame_of_row = np.repeat(np.arange(num_frames), [len(c) for c in self.agent_columns])
+        column_of_row = np.fromiter((c for columns in self.agent_columns for c in columns), dtype=np.int64, count=len(frame_of_row))
+        if len(frame_of_row):
+            pos[frame_of_row, column_of_row] = self.agent_pos
+            health[frame_of_row, column_of_row] = self.agent_health
+            present[frame_of_row, column_of_row] = True
+        status_code = {name: code for code, name in enumerate(STATUS_NAMES)}
+        tasks = self.tasks
+        chunk = {
+            "time": np.array(self.time, dtype=np.float64),
+            "blue_count": np.array(self.blue_count, dtype=np.int32), "red_count": np.array(self.red_count, dtype=np.int32),
+            "pos": pos, "health": health, "present": present,
+            "task_count": np.array(self.task_count, dtype=np.int32),
+            "task_id": _id_array([t["id"] for t in tasks]),
+            "task_pos": np.array([t["pos"] for t in tasks], dtype=np.float32).reshape(-1, 2),
+            "task_status": np.array([status_code[t["status"]] for t in tasks], dtype=np.int8),
+            "task_value": np.array([t.get("value", 0.0) for t in tasks], dtype=np.float32),
+            "task_is_bundle": np.array([t.get("is_bundle", False) for t in tasks], dtype=np.bool_),
+            "task_sub_count": np.array([t.get("sub_task_count", 0) for t in tasks], dtype=np.int32),
+            "events": self.events,
+        }
+        self._reset()
+        return chunk
+
+    def manifest_arrays(self):
+        return {
+            "agent_id": _id_array(self.manifest["agent_id"]),
+            "agent_team": np.array(self.manifest["agent_team"], dtype=np.int8),
+            "agent_role": np.array(self.manifest["agent_role"], dtype=np.str_),
+            "agent_max_health": np.array(self.manifest["agent_max_health"], dtype=np.float32),
+        }
+
+class NpzReplayWriter:
+    """
+    Streams a replay to the binary format, one compressed chunk of
+    `chunk_frames` frames at a time. Like JsonReplayWriter it writes to a
+    ".part" file and renames it into place on `close`.
+    """
+    def __init__(self, path, chunk_frames=256, delta_encoding=False, keyframe_interval=60, position_quantum=0.1):
+        self.path = path
+        self.chunk_frames = max(1, int(chunk_frames))
+        self.delta_encoding = bool(delta_encoding)
+        self.keyframe_interval = max(1, int(keyframe_interval))
+        self.position_quantum = float(position_quantum)
+        self.frame_count = 0
+        self.chunk_count = 0
+        self.event_chunk_count = 0
+        self._part_path = path + ".part"
+        self._zip = zipfile.ZipFile(self._part_path, 'w', compression=zipfile.ZIP_DEFLATED)
+        self._columns = _FrameColumns()
+        self._events = []
+
+    def _write_array(self, name, array):
+        with self._zip.open(name + ".npy", 'w', force_zip64=True) as f:
+            np.lib.format.write_array(f, np.asarray(array), allow_pickle=False)
+
+    def write_frame(self, frame):
+        self._columns.add(frame)
+        if self._columns.frames >= self.chunk_frames: self._flush()
+
+    def log_event(self, event):
+        self._events.append(event)
+        if len(self._events) >= 16 * self.chunk_frames: self._flush_events()
+
+    def _flush_events(self):
+        if not self._events: return
+        self._write_array(f"events{self.event_chunk_count:05d}", np.array(json.dumps(self._events)))
+        self._events = []
+        self.event_chunk_count += 1
+
+    def _flush(self):
+        if not self._columns.frames: return
+        chunk = self._columns.take_chunk()
+        prefix = f"chunk{self.chunk_count:05d}_"
+        present = chunk.pop("present")
+        self._write_array(prefix + "present", np.packbits(present, axis=1))
+        self._write_array(prefix + "events", np.array(json.dumps(chunk.pop("events"))))
+        if self.delta_encoding:
+            for name, array in self._delta_encode(chunk.pop("pos"), chunk.pop("health")).items():
+                self._write_array(prefix + name, array)
+        for name, array in chunk.items(): self._write_array(prefix + name, array)
+        self.frame_count += len(present)
+        self.chunk_count += 1
+
+    def _delta_encode(self, pos, health):
+        # Positions: quantized, stored whole on keyframes and as the change from the previous frame
+        # otherwise (absent agents count as 0). Each chunk starts on a keyframe, so it decodes on its own.
+        quantized = np.round(pos / self.position_quantum).astype(np.int32)
+        keyframes = (self.frame_count + np.arange(len(pos))) % self.keyframe_interval == 0
+        keyframes[0] = True
+        delta = quantized.copy()
+        delta[1:] -= quantized[:-1]
+        delta[keyframes] = quantized[keyframes]
+        # Health: the chunk's first frame, then only the entries that changed.
+        changed = np.ones(health.shape, dtype=np.bool_)
+        changed[1:] = health[1:] != health[:-1]
+        frames, columns = np.nonzero(changed)
+        return {"pos_delta": delta, "keyframes": keyframes, "health_frame": frames.astype(np.int32),
+                "health_column": columns.astype(np.int32), "health_value": health[frames, columns]}
+
+    def close(self, metadata):
+        """Writes the last chunk, the agent manifest and the metadata, then moves the file into place."""
+        self._flush(); self._flush_events()
+        for name, array in self._columns.manifest_arrays().items(): self._write_array(name, array)
+        header = {"version": NPZ_FORMAT_VERSION, "frames": self.frame_count, "chunks": self.chunk_count,
+                  "event_chunks": self.event_chunk_count, "position_quantum": self.position_quantum}
+        self._write_array("header", np.array(json.dumps(header)))
+        self._write_array("metadata", np.array(json.dumps(metadata)))
+        self._zip.close()
+        os.replace(self._part_path, self.path)
+        return self.path
+
+    def abort(self):
+        """Discards the partial file."""
+        self._zip.close()
+        if os.path.exists(self._part_path): os.remove(self._part_path)
+
+def replay_path(directory, name, replay_format):
+    if replay_format not in REPLAY_FORMATS:
+        raise ValueError(f"Unknown REPLAY_FORMAT '{replay_format}', expected one of {tuple(REPLAY_FORMATS)}")
+    return os.path.join(directory, name + REPLAY_FORMATS[replay_format])
+
+def make_replay_writer(path, **options):
+    """A streaming writer for the format given by the file extension."""
+    return NpzReplayWriter(path, **options) if path.endswith(REPLAY_FORMATS['npz']) else JsonReplayWriter(path, **options)
+
+class ReplayRecorder:
+    """
+    Feeds a replay writer from a running Battlefield under a recording policy
+    (a REPLAY_RECORDING dict): `capture` is called once per tick and stores
+    the first tick and every `every_n_ticks`-th one after it as a frame. With `event_log`, detonations
+    and task status changes of every tick are logged as they happen.
+    """
+    def __init__(self, path, policy=None, tick_seconds=0.016):
+        policy = policy or {}
+        self.every_n_ticks = max(1, int(policy.get('every_n_ticks', 1)))
+        self.event_log = bool(policy.get('event_log', True))
+        encoding = {name: policy[name] for name in ('delta_encoding', 'keyframe_interval', 'position_quantum') if name in policy}
+        self.policy = dict(policy, every_n_ticks=self.every_n_ticks, event_log=self.event_log, tick_seconds=tick_seconds)
+        self.writer = make_replay_writer(path, **encoding)
+        self.ticks = 0
+        self._task_status = np.zeros(0, dtype=np.int8)
+
+    def capture(self, battlefield, force_frame=False):
+        """Records the tick just simulated; `force_frame` stores it as a frame regardless of the policy."""
+        self.ticks += 1
+        current_time = round(battlefield.clock.now(), 3)
+        if self.event_log:
+            for event in battlefield.current_frame_events: self.writer.log_event(dict(event, time=current_time))
+            # Task ids are rows of the task table, so new and changed statuses are one comparison. A reclaimed
+            # row shows up as a status change; its serial tells the new task from the row's previous one.
+            status = battlefield.blue_marketplace.table.status
+            known = len(self._task_status)
+            changed = np.concatenate((np.flatnonzero(status[:known] != self._task_status), np.arange(known, len(status))))
+            serial = battlefield.blue_marketplace.table.serial
+            for row, code, task_serial in zip(changed.tolist(), status[changed].tolist(), serial[changed].tolist()):
+                self.writer.log_event({"type": "task_status", "task_id": row, "serial": task_serial, "status": STATUS_NAMES[code], "time": current_time})
+            self._task_status = status.copy()
+        # The first tick is always a frame, so a sampled replay starts where the run does.
+        if force_frame or (self.ticks - 1) % self.every_n_ticks == 0:
+            snapshot = battlefield.get_snapshot()
+            snapshot['time'] = current_time
+            self.writer.write_frame(snapshot)
+
+    def close(self, metadata):
+        """Finishes the file, storing the recording policy with the metadata. Returns the path."""
+        return self.writer.close(dict(metadata, recording=self.policy))
+
+    def abort(self):
+        self.writer.abort()
+
+class ReplayData:
+    """
+    A whole replay in columnar form: per-frame arrays over the agent manifest
+    (pos, health, present), per-frame counters, and CSR task side tables
+    (the tasks of frame i are rows task_indptr[i]:task_indptr[i + 1]).
+    """
+    def __init__(self, metadata, manifest, chunks, event_log=None):
+        self.metadata = metadata
+        self.agent_id, self.agent_team = manifest["agent_id"], manifest["agent_team"]
+        self.agent_role, self.agent_max_health = manifest["agent_role"], manifest["agent_max_health"]
+        num_agents = len(self.agent_id)
+        chunks = chunks or [_FrameColumns().take_chunk()]
+
+        def joined(name, pad_agents=False):
+            parts = [chunk[name] for chunk in chunks]
+            if pad_agents:
+                # Chunks written before an agent first appeared are narrower than the manifest.
+                parts = [np.pad(p, [(0, 0), (0, num_agents - p.shape[1])] + [(0, 0)] * (p.ndim - 2)) for p in parts]
+            return np.concatenate(parts)
+
+        self.time = joined("time")
+        self.blue_count, self.red_count = joined("blue_count"), joined("red_count")
+        self.pos, self.health, self.present = joined("pos", True), joined("health", True), joined("present", True)
+        self.task_indptr = np.concatenate(([0], np.cumsum(joined("task_count"), dtype=np.int64)))
+        for name in ("task_id", "task_pos", "task_status", "task_value", "task_is_bundle", "task_sub_count"):
+            setattr(self, name, joined(name))
+        self.events = [events for chunk in chunks for events in chunk["events"]]
+        self.event_log = event_log or []
+        self._event_times = np.array([event["time"] for event in self.event_log], dtype=np.float64)
+        self.recording = metadata.get("recording", {})
+
+    def __len__(self):
+        return len(self.time)
+
+    def playback_times(self):
+        """
+        The times to show when playing back: every recorded frame, or every
+        simulated tick when only every Nth tick was recorded.
+        """
+        every_n, step = self.recording.get("every_n_ticks", 1), self.recording.get("tick_seconds")
+        if every_n <= 1 or not step or len(self) < 2: return self.time
+        return np.round(np.arange(self.time[0], self.time[-1] + step / 2, step), 3)
+
+    def frame_at(self, t, previous_t=None, max_step=None):
+        """
+        A snapshot dict for time t. Positions of agents present in the
+        frames on both sides of t are interpolated linearly, unless they moved
+        more than `max_step` along an axis (e.g. wrapped around the screen).
+        Events are those of the event log in (previous_t, t] when the replay
+        has one, else the frame's own events.
+        """
+        i = int(np.clip(np.searchsorted(self.time, t, side='right') - 1, 0, len(self) - 1))
+        frame = self.frame(i)
+        if i + 1 < len(self) and self.time[i] < t < self.time[i + 1]:
+            alpha = (t - self.time[i]) / (self.time[i + 1] - self.time[i])
+            columns = np.flatnonzero(self.present[i])
+            start, end = self.pos[i, columns], self.pos[i + 1, columns]
+            smooth = self.present[i + 1, columns]
+            if max_step is not None: smooth &= (np.abs(end - start) <= max_step).all(axis=1)
+            blended = np.where(smooth[:, None], start + (end - start) * alpha, start).tolist()
+            for agent, pos in zip(frame["agents"], blended): agent["pos"] = pos
+            frame["events"] = []
+        if len(self.event_log):
+            low = np.searchsorted(self._event_times, previous_t if previous_t is not None else t, side='right' if previous_t is not None else 'left')
+            high = np.searchsorted(self._event_times, t, side='right')
+            frame["events"] = [event for event in self.event_log[low:high] if event["type"] != "task_status"]
+        frame["time"] = float(t)
+        return frame
+
+    def frame(self, i):
+        """Frame i as a legacy snapshot dict."""
+        columns = np.flatnonzero(self.present[i])
+        pos, health, ids = self.pos[i, columns].tolist(), self.health[i, columns].tolist(), self.agent_id[columns].tolist()
+        agents = [{"id": ids[k], "team_id": int(self.agent_team[c]), "pos": pos[k], "health": health[k],
+                   "max_health": float(self.agent_max_health[c]), "role": str(self.agent_role[c])} for k, c in enumerate(columns.tolist())]
+        rows = range(self.task_indptr[i], self.task_indptr[i + 1])
+        tasks = [{"id": self.task_id[r].item(), "pos": self.task_pos[r].tolist(), "status": STATUS_NAMES[self.task_status[r]],
+                  "value": round(float(self.task_value[r]), 2), "is_bundle": bool(self.task_is_bundle[r]),
+                  "sub_task_count": int(self.task_sub_count[r])} for r in rows]
+        return {"blue_count": int(self.blue_count[i]), "red_count": int(self.red_count[i]), "events": self.events[i],
+                "agents": agents, "tasks": tasks, "time": float(self.time[i])}
+
+    def frames(self):
+        for i in range(len(self)): yield self.frame(i)
+
+    def team_health(self, team_id):
+        """Per-frame (health total, max-health total) over the team's agents present in each frame."""
+        on_team = self.present & (self.agent_team == team_id)
+        return (np.where(on_team, self.health, 0).sum(axis=1, dtype=np.float64),
+                (on_team * self.agent_max_health).sum(axis=1, dtype=np.float64))
+
+    def task_counts(self, status_name):
+        """Per-frame number of tasks with the given status."""
+        frame_of_row = np.repeat(np.arange(len(self)), np.diff(self.task_indptr))
+        matches = self.task_status == STATUS_NAMES.index(status_name)
+        return np.bincount(frame_of_row[matches], minlength=len(self))
+
+def _load_npz(path):
+    with np.load(path, allow_pickle=False) as archive:
+        header = json.loads(archive["header"].item())
+        if header["version"] > NPZ_FORMAT_VERSION:
+            raise ValueError(f"{path}: replay format version {header['version']} is newer than this reader")
+        manifest = {name: archive[name] for name in ("agent_id", "agent_team", "agent_role", "agent_max_health")}
+        chunks = []
+        for k in range(header["chunks"]):
+            prefix = f"chunk{k:05d}_"
+            chunk = {name[len(prefix):]: archive[name] for name in archive.files if name.startswith(prefix)}
+            if "pos_delta" in chunk: _delta_decode(chunk, header["position_quantum"])
+            width = chunk["pos"].shape[1]
+            chunk["present"] = np.unpackbits(chunk["present"], axis=1, count=width).astype(np.bool_)
+            chunk["events"] = json.loads(chunk["events"].item())
+            chunks.append(chunk)
+        event_log = [event for k in range(header.get("event_chunks", 0)) for event in json.loads(archive[f"events{k:05d}"].item())]
+        return ReplayData(json.loads(archive["metadata"].item()), manifest, chunks, event_log)
+
+def _delta_decode(chunk, position_quantum):
+    # Inverse of NpzReplayWriter._delta_encode.
+    delta = chunk.pop("pos_delta")
+    bounds = np.append(np.flatnonzero(chunk.pop("keyframes")), len(delta))
+    quantized = np.empty_like(delta)
+    for start, end in zip(bounds[:-1], bounds[1:]): quantized[start:end] = np.cumsum(delta[start:end], axis=0)
+    chunk["pos"] = (quantized * position_quantum).astype(np.float32)
+    num_frames, num_agents = delta.shape[:2]
+    frames, columns = chunk.pop("health_frame"), chunk.pop("health_column")
+    values = np.zeros((num_frames, num_agents), dtype=np.float32)
+    values[frames, columns] = chunk.pop("health_value")
+    # Forward-fill every column from its last change.
+    last_change = np.zeros((num_frames, num_agents), dtype=np.int64)
+    last_change[frames, columns] = frames
+    last_change = np.maximum.accumulate(last_change, axis=0)
+    chunk["health"] = values[last_change, np.arange(num_agents)]
+
+def _load_json(path):
+    with open(path, 'r') as f: log_data = json.load(f)
+    columns = _FrameColumns()
+    for frame in log_data.get("timestamps", []): columns.add(frame)
+    chunks = [columns.take_chunk()] if columns.frames else []
+    return ReplayData(log_data.get("metadata", {}), columns.manifest_arrays(), chunks, log_data.get("event_log"))
+
+def load_replay(path):
+    """Loads a .npz or legacy .json replay as ReplayData."""
+    return _load_npz(path) if path.endswith(REPLAY_FORMATS['npz']) else _load_json(path)
+
+def list_replays(directory):
+    """
+    Replay files in `directory`. When a run exists in both formats (e.g.
+    after a conversion) only the binary file is listed.
+    """
+    if not os.path.isdir(directory): return []
+    names = [f for f in os.listdir(directory) if os.path.splitext(f)[1] in REPLAY_FORMATS.values()]
+    stems_with_npz = {os.path.splitext(f)[0] for f in names if f.endswith(REPLAY_FORMATS['npz'])}
+    return [os.path.join(directory, f) for f in names
+            if f.endswith(REPLAY_FORMATS['npz']) or os.path.splitext(f)[0] not in stems_with_npz]
+
+def convert_replay(source_path, target_format, **options):
+    """
+    Rewrites a replay in the other format next to the source file; returns
+    the new path. `options` are passed to the writer (e.g. delta_encoding).
+    """
+    target_path = os.path.splitext(source_path)[0] + REPLAY_FORMATS[target_format]
+    replay = load_replay(source_path)
+    writer = make_replay_writer(target_path, **options)
+    try:
+        for frame in replay.frames(): writer.write_frame(frame)
+        for event in replay.event_log: writer.log_event(event)
+    except Exception:
+        writer.abort()
+        raise
+    return writer.close(replay.metadata)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Converts Aegis Swarm replays between the JSON and binary formats.")
+    parser.add_argument("replay_files", nargs='+', help="Replay files to convert.")
+    parser.add_argument("-t", "--to", choices=tuple(REPLAY_FORMATS), default='npz', help="Target format (default: npz).")
+    parser.add_argument("--delta-encoding", action="store_true", help="Store npz positions as quantized deltas between keyframes.")
+    args = parser.parse_args()
+    for source_path in args.replay_files:
+        target_path = convert_replay(source_path, args.to, delta_encoding=args.delta_encoding)
+        print(f"{source_path} ({os.path.getsize(source_path) / 1024:.0f} KB) -> {target_path} ({os.path.getsize(target_path) / 1024:.0f} KB)")
@@ -11,6 +11,21 @@ GLOBAL_SIMULATION_SETTINGS = {
     
     'RED_COLOR': (255, 50, 50), 
     'HEALTH_BAR_GREEN': (0, 255, 0), 'HEALTH_BAR_RED': (255, 0, 0),
+
+    # Base seed for experiment suites. None draws a fresh one, which is recorded in the summary.
+    'RANDOM_SEED': None,
+    # Replay files written by experiment suites: 'npz' (compact binary) or 'json' (legacy).
+    # Convert between them with `python -m analysis.replay_io --to json|npz <files>`.
+    'REPLAY_FORMAT': 'npz',
+    # Summary-only experiment suites skip replays (and with them every snapshot) except for one
+    # run in every REPLAY_SAMPLE_EVERY per matchup (0: none at all). Toggled from the GUI.
+    'SUMMARY_ONLY': False, 'REPLAY_SAMPLE_EVERY': 20,
+    # Replay recording policy. Only every Nth simulation tick is stored as a frame (the Replayer
+    # interpolates in between); with event_log, detonations and task status changes are still logged
+    # at every tick. delta_encoding (npz only) stores positions quantized to position_quantum pixels,
+    # as changes between keyframes every keyframe_interval frames, and health as a list of changes.
+    'REPLAY_RECORDING': { 'every_n_ticks': 1, 'event_log': True,
+                          'delta_encoding': False, 'keyframe_interval': 60, 'position_quantum': 0.1 },
 }
 
 MARKET_CONFIG = {
@@ -18,6 +33,19 @@ MARKET_CONFIG = {
     'VALUE_UPDATE_INTERVAL': 1.0, 'BASE_VALUE_DECAY_RATE': 0.05,
     'THREAT_VALUE_FACTOR': 3.0, 'RELIABILITY_BONUS': 0.5,
     'RISK_ASSESSMENT_RADIUS': 150.0, 'RISK_AVERSION_FACTOR': 0.8,
+    # Bid risk: 'exact' counts the OPEN tasks around each task; 'raster' looks it up in a summed-area
+    # table of OPEN tasks (cells of RISK_RASTER_CELL_SIZE), rebuilt every VALUE_UPDATE_INTERVAL.
+    'RISK_MODEL': 'exact', 'RISK_RASTER_CELL_SIZE': 25.0,
+    # An unassigned bundle whose live members drop below this is dissolved back into single tasks.
+    'BUNDLE_MIN_MEMBERS': 2,
+    # Task allocation: 'greedy' (highest value first, cheapest bidder wins), 'hungarian'
+    # (optimal 1:1 assignment, needs scipy) or 'epsilon' (warm-started epsilon-auction).
+    'AUCTION_MODE': 'greedy', 'AUCTION_EPSILON': 1.0,
+    # Incremental auctioning: a round only runs when tasks or idle strikers changed. Rounds are
+    # at least AUCTION_MIN_INTERVAL apart, with a full re-auction every AUCTION_FULL_REFRESH_INTERVAL (sim seconds).
+    'AUCTION_MIN_INTERVAL': 0.0, 'AUCTION_FULL_REFRESH_INTERVAL': 1.0, 'AUCTION_MOVE_THRESHOLD': 25.0,
+    # Record per-call timings and work counters in Marketplace.metrics (exported with the experiment summary).
+    'COLLECT_METRICS': False,
 }
 
 WEAPON_TEMPLATES = {
@@ -66,7 +94,8 @@ TEAM_RED_CONFIG = {
     }
 }
 
-INTELLIGENCE_CONFIG = { "detection_model": { "base_prob": 0.98, "prob_decay_rate": 2.5 } }
+INTELLIGENCE_CONFIG = { "detection_model": { "base_prob": 0.98, "prob_decay_rate": 2.5 },
+                        "situational_picture": { "info_lifespan": 5.0 } }
 
 full_config = {
     "GLOBAL_SIMULATION_SETTINGS": GLOBAL_SIMULATION_SETTINGS, "MARKET_CONFIG": MARKET_CONFIG,
@@ -1,16 +1,23 @@
 # Aegis Swarm 3.2 - Core Agent Class (Visual ID Edition)
 # UPGRADED: Agent now initializes with its specific role name and color.
 
-import pygame
-import uuid
-import random
 import numpy as np
-import time
+from core.clock import WallClock
 from core.task import Task
+from core.swarm_state import SwarmState
 
 class Agent:
-    def __init__(self, team_config, role_name, role_config, initial_pos, market_config):
-        self.id = uuid.uuid4(); self.is_alive = True
+    # Physical state lives in a shared SwarmState; the agent only keeps its row index.
+    BOIDS_WEIGHT_NAMES = ('separation', 'alignment', 'cohesion')
+    __slots__ = ('swarm', 'index', 'id', 'team_id', 'role_name', 'color', 'role_template', 'weapon_template',
+                 'strategy_name', 'max_health',
+                 'market_config', 'target_pos', 'is_detonating', 'tour', 'base_pos',
+                 'self_defense_radius', 'group_id', 'strategy_profile', 'clock',
+                 'patrol_target', 'locked_target')
+
+    def __init__(self, team_config, role_name, role_config, initial_pos, market_config, swarm=None, rng=None, clock=None):
+        rng = rng if rng is not None else np.random.default_rng()
+        self.clock = clock if clock is not None else WallClock()
         self.team_id = team_config['id']
         
         # --- [MODIFIED] Store role name and get role-specific color ---
@@ -21,58 +28,87 @@ class Agent:
         self.weapon_template = role_config.get('weapon_template')
         
         self.strategy_name = role_config.get('strategy', '')
-        self.boids_weights = role_config.get('boids_weights', {"separation": 1.0, "alignment": 1.0, "cohesion": 1.0})
+        boids_weights = role_config.get('boids_weights', {"separation": 1.0, "alignment": 1.0, "cohesion": 1.0})
         
-        self.max_health = self.role_template['health']; self.health = self.role_template['health']
-        self.max_speed = self.role_template['max_speed']; self.perception_radius = self.role_template['perception_radius']
-        self.drone_radius = self.role_template['drone_radius']
+        self.max_health = self.role_template['health']
+        max_speed = self.role_template['max_speed']
         
         self.market_config = market_config
-        self.pos = np.array(initial_pos, dtype=float)
-        random_velocity = np.random.uniform(-1, 1, size=2)
+        random_velocity = rng.uniform(-1, 1, size=2)
         norm = np.linalg.norm(random_velocity)
-        if norm > 0: self.velocity = random_velocity / norm * self.max_speed
-        else: self.velocity = np.array([self.max_speed, 0], dtype=float)
-        self.acceleration = np.array([0.0, 0.0], dtype=float)
+        if norm > 0: velocity = random_velocity / norm * max_speed
+        else: velocity = np.array([max_speed, 0], dtype=float)
+
+        # Kinematic parameters live only in the store (the kernels read them there); the agent exposes them read-only.
+        self.swarm = swarm if swarm is not None else SwarmState(capacity=1)
+        self.index = self.swarm.add(
+            self, pos=initial_pos, velocity=velocity, acceleration=(0.0, 0.0), health=self.role_template['health'],
+            team_id=self.team_id, role_id=self.swarm.role_id_for(role_name), radius=self.role_template['drone_radius'],
+            max_speed=max_speed, perception_radius=self.role_template['perception_radius'], death_linger=0.5,
+            boids_weights=tuple(boids_weights[name] for name in self.BOIDS_WEIGHT_NAMES))
+        self.id = int(self.swarm.agent_id[self.index])
+
         self.target_pos = None; self.is_detonating = False
         self.tour = []
-        self.current_sub_task_index = -1
         self.base_pos = self.pos.copy()
         self.self_defense_radius = 75.0; self.group_id = 0
-        self.time_of_death = None; self.death_linger_duration = 0.5
         
         self.strategy_profile = {}
 
+    # --- Views into the swarm state store ---
+    @property
+    def pos(self): return self.swarm.pos[self.index]
+    @pos.setter
+    def pos(self, value): self.swarm.pos[self.index] = value
+
+    @property
+    def velocity(self): return self.swarm.velocity[self.index]
+    @velocity.setter
+    def velocity(self, value): self.swarm.velocity[self.index] = value
+
+    @property
+    def acceleration(self): return self.swarm.acceleration[self.index]
+    @acceleration.setter
+    def acceleration(self, value): self.swarm.acceleration[self.index] = value
+
+    @property
+    def health(self): return self.swarm.health[self.index]
+    @health.setter
+    def health(self, value): self.swarm.set_health(self.index, value)
+
+    @property
+    def max_speed(self): return float(self.swarm.max_speed[self.index])
+
+    @property
+    def perception_radius(self): return float(self.swarm.perception_radius[self.index])
+
+    @property
+    def drone_radius(self): return float(self.swarm.radius[self.index])
+
+    @property
+    def death_linger_duration(self): return float(self.swarm.death_linger[self.index])
+
+    @property
+    def boids_weights(self): return dict(zip(self.BOIDS_WEIGHT_NAMES, self.swarm.boids_weights[self.index].tolist()))
+
+    @property
+    def is_alive(self): return bool(self.swarm.health[self.index] > 0)
+
+    @property
+    def time_of_death(self):
+        t = self.swarm.time_of_death[self.index]
+        return None if np.isnan(t) else t
+    @time_of_death.setter
+    def time_of_death(self, value): self.swarm.time_of_death[self.index] = np.nan if value is None else value
+
     # ... (The rest of the file is identical to the last working version) ...
     def is_truly_dead(self, current_time):
         if self.health <= 0 and self.time_of_death is not None:
             return current_time - self.time_of_death > self.death_linger_duration
         return self.health <= 0
 
-    def assess_risk(self, task, all_market_tasks):
-        risk_score = 0.0
-        assessment_radius_sq = self.market_config['RISK_ASSESSMENT_RADIUS'] ** 2
-        for other_task in all_market_tasks:
-            if other_task.id == task.id or other_task.status != 'OPEN': continue
-            dist_sq = np.sum((task.position - other_task.position)**2)
-            if dist_sq < assessment_radius_sq:
-                risk_score += 1.0 
-        return risk_score
-
-    def calculate_bid_for_task(self, task: Task, all_market_tasks):
-        if not self.weapon_template: return None
-        travel_cost = np.linalg.norm(self.pos - task.position) + np.linalg.norm(task.position - self.base_pos)
-        risk_score = self.assess_risk(task, all_market_tasks)
-        risk_factor = self.market_config['RISK_AVERSION_FACTOR']
-        final_bid = travel_cost * (1 + risk_score * risk_factor)
-        return final_bid
-
     def add_task_to_tour(self, task: Task):
         self.tour = [task]
-        if task.is_bundle and task.sub_tasks:
-            self.current_sub_task_index = 0
-        else:
-            self.current_sub_task_index = -1
 
     def _update_target_from_tour(self):
         if not self.tour:
@@ -80,27 +116,24 @@ class Agent:
             return
         active_task = self.tour[0]
         if active_task.is_bundle:
-            if self.current_sub_task_index != -1 and self.current_sub_task_index < len(active_task.sub_tasks):
-                self.target_pos = active_task.sub_tasks[self.current_sub_task_index].position
+            # Work through the bundle's members in order, skipping those already completed.
+            next_sub_task = active_task.first_open_sub_task()
+            if next_sub_task is not None:
+                self.target_pos = next_sub_task.position
             else:
                 self.tour = []
                 self.target_pos = None
         else:
             self.target_pos = active_task.position
 
-    def apply_movement_physics(self, dt, boundary_behavior, screen_width, screen_height):
-        if self.health <= 0:
-            self.velocity *= 0.9; self.pos += self.velocity * dt * 50
-            return
+    def update_tour_progress(self):
+        """Advances the bundle tour and refreshes target_pos. Movement itself is integrated in bulk by MotionModel."""
+        if self.health <= 0: return
 
         if self.tour:
             active_task = self.tour[0]
             if active_task.is_bundle:
-                if self.current_sub_task_index < len(active_task.sub_tasks):
-                    current_sub_task = active_task.sub_tasks[self.current_sub_task_index]
-                    if current_sub_task.status == 'COMPLETED':
-                        self.current_sub_task_index += 1
-                else:
+                if active_task.first_open_sub_task() is None:
                     active_task.complete()
                     self.tour = []
             else:
@@ -109,40 +142,6 @@ class Agent:
         
         self._update_target_from_tour()
 
-        accel_norm = np.linalg.norm(self.acceleration)
-        if accel_norm > 1.0: self.acceleration = self.acceleration / accel_norm
-        self.velocity += self.acceleration
-        speed = np.linalg.norm(self.velocity)
-        if speed > self.max_speed: self.velocity = (self.velocity / speed) * self.max_speed
-        self.pos += self.velocity * dt * 50
-        self.acceleration *= 0
-        if boundary_behavior == "wrap": self._handle_wrap_boundary(screen_width, screen_height)
-
-    def _handle_wrap_boundary(self, width, height):
-        if self.pos[0] > width: self.pos[0] = 0
-        elif self.pos[0] < 0: self.pos[0] = width
-        if self.pos[1] > height: self.pos[1] = 0
-        elif self.pos[1] < 0: self.pos[1] = height
-
     def take_damage(self, amount):
-        if self.health <= 0: return
-        self.health -= amount
-        if self.health <= 0:
-            self.health = 0; self.is_alive = False
-            if self.time_of_death is None: self.time_of_death = time.time()
-
-    def draw(self, screen, config):
-        draw_pos = (int(self.pos[0]), int(self.pos[1]))
-        if self.time_of_death is None:
-            pygame.draw.circle(screen, self.color, draw_pos, self.drone_radius)
-            bar_width = self.drone_radius * 2.5; bar_height = 4
-            bar_x = self.pos[0] - bar_width / 2
-            bar_y = self.pos[1] - self.drone_radius - bar_height - 5
-            health_percentage = self.health / self.max_health
-            pygame.draw.rect(screen, config['HEALTH_BAR_RED'], (bar_x, bar_y, bar_width, bar_height))
-            if health_percentage > 0:
-                pygame.draw.rect(screen, config['HEALTH_BAR_GREEN'], (bar_x, bar_y, bar_width * health_percentage, bar_height))
-        else:
-            p1,p2,p3,p4 = (draw_pos[0]-5, draw_pos[1]-5), (draw_pos[0]+5, draw_pos[1]+5), (draw_pos[0]-5, draw_pos[1]+5), (draw_pos[0]+5, draw_pos[1]-5)
-            pygame.draw.line(screen, (80,80,80), p1, p2, 1)
-            pygame.draw.line(screen, (80,80,80), p3, p4, 1)
\ No newline at end of file
+        if self.swarm.apply_damage(self.index, amount):
+            if self.time_of_death is None: self.time_of_death = self.clock.now()
@@ -2,34 +2,50 @@
 # UPGRADED: Battlefield now passes role names during agent creation and
 # includes role information in simulation snapshots for the replayer.
 
-import pygame
-import random
-import time
 import numpy as np
 from core.agent import Agent
-from core.models import BoidsModel, CombatModel, PerceptionModel
+from core.clock import SimulationClock
+from core.models import BoidsModel, CombatModel, MotionModel, PerceptionModel
+from core.spatial_index import UniformGrid
+from core.swarm_state import SwarmState
+from core.task import STATUS_COMPLETED, STATUS_NAMES
 from intelligence.marketplace import Marketplace
+from intelligence.situational_awareness import SharedSituationalPicture
 import strategies.blue_strategies as blue_strat
 import strategies.red_strategies as red_strat
 
 class Battlefield:
-    def __init__(self, config):
+    RNG_STREAMS = ('spawn', 'perception', 'combat', 'strategy')
+
+    def __init__(self, config, seed=None, clock=None):
         self.config = config
         self.global_config = config['GLOBAL_SIMULATION_SETTINGS']
         self.intel_config = config['INTELLIGENCE_CONFIG']
         self.market_config = config['MARKET_CONFIG']
         self.screen_dims = (self.global_config['SCREEN_WIDTH'], self.global_config['SCREEN_HEIGHT'])
         
-        self.blue_marketplace = Marketplace(config)
-        self.agents = []
+        # Every subsystem draws from its own stream derived from one recorded seed,
+        # so a run can be replayed exactly and parallel workers never share state.
+        seed_sequence = np.random.SeedSequence(seed)
+        self.seed = seed_sequence.entropy
+        self.rngs = dict(zip(self.RNG_STREAMS, (np.random.default_rng(s) for s in seed_sequence.spawn(len(self.RNG_STREAMS)))))
+
+        # Simulation time is owned here and advanced by update(dt), never read from the wall clock.
+        self.clock = clock if clock is not None else SimulationClock()
+
+        self.blue_marketplace = Marketplace(config, clock=self.clock)
+        # Blue's common operating picture: every contact any Blue agent has seen recently.
+        self.blue_picture = SharedSituationalPicture(self.intel_config, self.screen_dims, clock=self.clock,
+                                                     wrap=self.global_config['BOUNDARY_BEHAVIOR'] == "wrap")
+        self.swarm = SwarmState()
         self._create_teams()
 
         self.boids_model = BoidsModel()
-        self.combat_model = CombatModel()
-        self.perception_model = PerceptionModel()
-        pygame.font.init()
-        self.font = pygame.font.SysFont('Arial', 24)
+        self.combat_model = CombatModel(self.rngs['combat'])
+        self.motion_model = MotionModel()
+        self.perception_model = PerceptionModel(self.rngs['perception'])
         self.current_frame_events = []
+        self.detection_table = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
 
     def _create_teams(self):
         team_configs = {'blue': self.config['TEAM_BLUE_CONFIG'], 'red': self.config['TEAM_RED_CONFIG']}
@@ -45,61 +61,84 @@ class Battlefield:
 
                 for i in range(role_config['count']):
                     # --- [MODIFIED] Pass the role_name to the Agent constructor ---
-                    agent = Agent(team_config, role_name, final_role_config, self._get_initial_position(team_config['deployment_zone']), self.market_config)
+                    agent = Agent(team_config, role_name, final_role_config, self._get_initial_position(team_config['deployment_zone']), self.market_config, swarm=self.swarm, rng=self.rngs['spawn'], clock=self.clock)
                     
                     if team_name == 'red':
                         agent.strategy_profile = red_strategy_profile
                         num_groups = red_strategy_profile.get('params', {}).get('split_attack_groups', 1)
                         agent.group_id = i % num_groups
-
-                    self.agents.append(agent)
     
+    @property
+    def agents(self):
+        return self.swarm.agents
+
     def _get_initial_position(self, zone):
         w, h = self.screen_dims
-        if zone == 'left': return np.array([random.randint(50, w // 8), random.randint(50, h - 50)], dtype=float)
-        if zone == 'right': return np.array([random.randint(w * 7 // 8, w - 50), random.randint(50, h - 50)], dtype=float)
-        return np.array([random.randint(50, w - 50), random.randint(50, h - 50)], dtype=float)
+        rng = self.rngs['spawn']
+        if zone == 'left': return np.array([rng.integers(50, w // 8, endpoint=True), rng.integers(50, h - 50, endpoint=True)], dtype=float)
+        if zone == 'right': return np.array([rng.integers(w * 7 // 8, w - 50, endpoint=True), rng.integers(50, h - 50, endpoint=True)], dtype=float)
+        return np.array([rng.integers(50, w - 50, endpoint=True), rng.integers(50, h - 50, endpoint=True)], dtype=float)
 
     def update(self, dt):
-        current_time = time.time()
+        self.clock.advance(dt)
+        current_time = self.clock.now()
         self.current_frame_events = []
-        self.agents = [a for a in self.agents if not a.is_truly_dead(current_time)]
+        self.swarm.compact(~self.swarm.truly_dead_mask(current_time))
         
-        alive_agents = [a for a in self.agents if a.is_alive]
+        alive_idx = np.flatnonzero(self.swarm.alive_mask())
+        alive_agents = [self.agents[i] for i in alive_idx]
         blue_agents = [a for a in alive_agents if a.team_id == self.config['TEAM_BLUE_CONFIG']['id']]
         red_agents = [a for a in alive_agents if a.team_id == self.config['TEAM_RED_CONFIG']['id']]
         
         battlefield_context = {'screen_width': self.screen_dims[0], 'screen_height': self.screen_dims[1]}
         self.blue_marketplace.update_market_state(alive_agents, battlefield_context)
 
-        all_visible_blue_agents = set()
-        for red_agent in red_agents:
-            for blue_agent in blue_agents:
-                if np.linalg.norm(red_agent.pos - blue_agent.pos) < red_agent.perception_radius:
-                    if self.perception_model.detect_enemy(red_agent, blue_agent, self.intel_config['detection_model']):
-                        all_visible_blue_agents.add(blue_agent)
+        # One spatial index per tick answers every perception-radius query below.
+        wrap = self.global_config['BOUNDARY_BEHAVIOR'] == "wrap"
+        radii = self.swarm.perception_radius[alive_idx]
+        grid = UniformGrid(self.swarm.pos[alive_idx], radii.max() if alive_agents else 1.0, *self.screen_dims, wrap=wrap)
+        indptr, indices = grid.query_neighbors(radii)
+
+        # Split the neighbour list into friend pairs (for boids) and enemy candidate pairs (for perception).
+        alive_teams = self.swarm.team_id[alive_idx]
+        pair_rows = np.repeat(np.arange(len(alive_idx)), np.diff(indptr))
+        is_friend = alive_teams[indices] == alive_teams[pair_rows]
+        friend_indptr = self._csr_indptr(pair_rows[is_friend], len(alive_idx))
+        friend_indices = alive_idx[indices[is_friend]].astype(np.int64)
+
+        # One batched detection stage per tick. The resulting sparse observer -> target
+        # table feeds both the Red group-target assignment and every agent's intel.
+        observers, targets = pair_rows[~is_friend], indices[~is_friend]
+        detected = self.perception_model.detect_pairs(self.swarm, alive_idx[observers], alive_idx[targets], self.intel_config['detection_model'],
+                                                      self.screen_dims, wrap)
+        observers, targets = observers[detected], targets[detected]
+        detection_indptr = self._csr_indptr(observers, len(alive_idx))
+        self.detection_table = (alive_idx[observers], alive_idx[targets])
+
+        # Everything Blue saw this tick is published to its market in one batch.
+        blue_observer = alive_teams[observers] == self.config['TEAM_BLUE_CONFIG']['id']
+        blue_seen = alive_idx[targets[blue_observer]]
+        self.blue_marketplace.ingest_detections(self.swarm.agent_id[alive_idx[observers[blue_observer]]], self.swarm.agent_id[blue_seen], self.swarm.pos[blue_seen])
+        blue_seen = np.unique(blue_seen)
+        self.blue_picture.upsert_detections(self.swarm.agent_id[blue_seen], self.swarm.pos[blue_seen])
+        self.blue_picture.purge_stale_data()
+
+        red_observer = alive_teams[observers] == self.config['TEAM_RED_CONFIG']['id']
+        all_visible_blue_agents = [alive_agents[j] for j in np.unique(targets[red_observer])]
         
         num_groups = getattr(red_agents[0], 'strategy_profile', {}).get('params', {}).get('split_attack_groups', 1) if red_agents else 1
-        target_assignments = red_strat.assign_targets_to_groups(list(all_visible_blue_agents), num_groups)
+        target_assignments = red_strat.assign_targets_to_groups(all_visible_blue_agents, num_groups)
 
-        all_friends = {a.id: [] for a in alive_agents}
-        for agent in alive_agents:
-            my_friends, my_enemies = [], []
-            potential_enemies = blue_agents if agent.team_id == self.config['TEAM_RED_CONFIG']['id'] else red_agents
-            
-            for other_agent in alive_agents:
-                if agent.id == other_agent.id: continue
-                if np.linalg.norm(agent.pos - other_agent.pos) < agent.perception_radius:
-                    if agent.team_id == other_agent.team_id:
-                        my_friends.append(other_agent)
-                    elif other_agent in potential_enemies and self.perception_model.detect_enemy(agent, other_agent, self.intel_config['detection_model']):
-                        my_enemies.append(other_agent)
-
-            all_friends[agent.id] = my_friends
-            intel = { 'neighbors': {'friends': my_friends, 'enemies': my_enemies}, 'screen_width': self.screen_dims[0], 'screen_height': self.screen_dims[1] }
+        for i, agent in enumerate(alive_agents):
+            my_friends = [self.agents[r] for r in friend_indices[friend_indptr[i]:friend_indptr[i + 1]]]
+            my_enemies = [alive_agents[j] for j in targets[detection_indptr[i]:detection_indptr[i + 1]]]
+            # intel['rng'] is the seeded strategy stream; strategies draw all their randomness from it.
+            intel = { 'neighbors': {'friends': my_friends, 'enemies': my_enemies}, 'screen_width': self.screen_dims[0], 'screen_height': self.screen_dims[1],
+                      'rng': self.rngs['strategy'] }
 
             if agent.team_id == self.config['TEAM_BLUE_CONFIG']['id']:
                 intel['marketplace'] = self.blue_marketplace
+                intel['situational_picture'] = self.blue_picture
                 blue_strat.strategy_dispatcher(agent, intel)
             else:
                 intel['target_assignments'] = target_assignments
@@ -107,62 +146,62 @@ class Battlefield:
 
         if blue_agents: self.blue_marketplace.run_auction(blue_agents)
 
+        forces = self.boids_model.calculate_swarm_steering(self.swarm, alive_idx, friend_indptr, friend_indices,
+                                                           [a.target_pos for a in alive_agents], wrap_dims=self.screen_dims if wrap else None)
+        self.swarm.acceleration[alive_idx] += forces
         for agent in alive_agents:
-            agent.boids_weights = agent.boids_weights if hasattr(agent, 'boids_weights') else {"separation": 1.0, "alignment": 1.0, "cohesion": 1.0}
-            force = self.boids_model.calculate_steering_force(agent, all_friends[agent.id], agent.boids_weights, agent.target_pos)
-            agent.acceleration += force
-            agent.apply_movement_physics(dt, self.global_config['BOUNDARY_BEHAVIOR'], *self.screen_dims)
+            agent.update_tour_progress()
+        self.motion_model.integrate(self.swarm, alive_idx, dt, self.global_config['BOUNDARY_BEHAVIOR'], *self.screen_dims)
         
-        detonators = [a for a in alive_agents if getattr(a, 'is_detonating', False)]
+        detonators = [a for a in alive_agents if a.is_detonating and a.weapon_template and a.weapon_template['type'] == 'suicide_aoe']
         if detonators:
-            all_dmg_events = []
-            for d in detonators:
-                if d.weapon_template and d.weapon_template['type'] == 'suicide_aoe':
-                    d.take_damage(d.max_health * 2) 
-                    dmg_events = self.combat_model.suicide_aoe_detonation(d, alive_agents, d.weapon_template)
-                    all_dmg_events.extend(dmg_events)
-                    killed_count = sum(1 for e in dmg_events if e['damage'] >= e['agent'].health)
-                    self.current_frame_events.append({"type": "detonation", "agent_id": str(d.id), "pos": d.pos.tolist(), "killed": killed_count})
-            for event in all_dmg_events:
-                event['agent'].take_damage(event['damage'])
+            # Blasts are evaluated before the detonators self-destruct: a detonator can
+            # still be caught by the blasts that precede its own.
+            detonator_rows = np.array([d.index for d in detonators], dtype=np.int64)
+            target_rows = alive_idx[self.swarm.health[alive_idx] > 0]
+            hit_rows, hit_damage, kills = self.combat_model.resolve_detonations(self.swarm, detonator_rows, target_rows, self.screen_dims)
+            current_time = self.clock.now()
+            self.swarm.apply_damage_many(detonator_rows, [d.max_health * 2 for d in detonators], current_time)
+            for d, killed_count in zip(detonators, kills):
+                self.current_frame_events.append({"type": "detonation", "agent_id": d.id, "pos": d.pos.tolist(), "killed": int(killed_count)})
+            # Hits on the same target are summed; the detonators, already dead, take none.
+            self.swarm.apply_damage_many(hit_rows, hit_damage, current_time)
+
+    @staticmethod
+    def _csr_indptr(sorted_rows, num_rows):
+        return np.concatenate(([0], np.cumsum(np.bincount(sorted_rows, minlength=num_rows)))).astype(np.int64)
+
+    def team_alive_counts(self):
+        """(blue, red) living agents, from the swarm's running per-team counters."""
+        team_alive = self.swarm.team_alive
+        return team_alive.get(self.config['TEAM_BLUE_CONFIG']['id'], 0), team_alive.get(self.config['TEAM_RED_CONFIG']['id'], 0)
+
+    def team_health_totals(self):
+        """(blue, red) summed health of the living agents, from the swarm's running totals."""
+        team_health = self.swarm.team_health
+        return team_health.get(self.config['TEAM_BLUE_CONFIG']['id'], 0.0), team_health.get(self.config['TEAM_RED_CONFIG']['id'], 0.0)
 
     def get_snapshot(self):
         # --- [MODIFIED] Add agent's role to the snapshot ---
+        positions, healths, agent_ids = self.swarm.pos.tolist(), self.swarm.health.tolist(), self.swarm.agent_id.tolist()
         agent_states = [
-            { "id": str(a.id), "team_id": a.team_id, "pos": a.pos.tolist(), 
-              "health": a.health, "max_health": a.max_health, "role": a.role_name } 
-            for a in self.agents
+            { "id": agent_ids[i], "team_id": a.team_id, "pos": positions[i], 
+              "health": healths[i], "max_health": a.max_health, "role": a.role_name } 
+            for i, a in enumerate(self.agents)
         ]
         
+        table = self.blue_marketplace.table
+        rows = np.fromiter(self.blue_marketplace.tasks, dtype=np.int64, count=len(self.blue_marketplace.tasks))
+        rows = rows[table.status[rows] != STATUS_COMPLETED]
+        task_positions, task_values = table.position[rows].tolist(), table.current_value[rows].tolist()
+        task_statuses, task_bundles = table.status[rows].tolist(), table.is_bundle[rows].tolist()
         task_states = [
-            { "id": str(task.id), "pos": task.position.tolist(), "status": task.status, "value": round(task.current_value, 2), "is_bundle": task.is_bundle, "sub_task_count": len(task.sub_tasks) if task.is_bundle else 0 }
-            for task in self.blue_marketplace.tasks.values() if task.status != 'COMPLETED'
+            { "id": row, "pos": task_positions[k], "status": STATUS_NAMES[task_statuses[k]], "value": round(task_values[k], 2), "is_bundle": task_bundles[k], "sub_task_count": int(table.member_count[row]) if task_bundles[k] else 0 }
+            for k, row in enumerate(rows.tolist())
         ]
-        blue_count = sum(1 for a in self.agents if a.is_alive and a.team_id == self.config['TEAM_BLUE_CONFIG']['id'])
-        red_count = sum(1 for a in self.agents if a.is_alive and a.team_id == self.config['TEAM_RED_CONFIG']['id'])
+        blue_count, red_count = self.team_alive_counts()
         
         return { 
             "blue_count": blue_count, "red_count": red_count, 
             "events": self.current_frame_events, "agents": agent_states, "tasks": task_states 
         }
-
-    def draw(self, screen):
-        # The main draw function does not need to change, as it reads the agent's
-        # own color property, which is now correctly set during initialization.
-        task_color_open = (255, 255, 100); task_color_assigned = (100, 100, 100)
-        for task in self.blue_marketplace.tasks.values():
-            if task.status == 'COMPLETED': continue
-            color = task_color_open if task.status == 'OPEN' else task_color_assigned
-            pos_int = task.position.astype(int)
-            if task.is_bundle: pygame.draw.circle(screen, color, pos_int, 8, 2)
-            else: pygame.draw.rect(screen, color, (pos_int[0]-3, pos_int[1]-3, 6, 6))
-        
-        for agent in self.agents: 
-            agent.draw(screen, self.global_config)
-            
-        blue_count = sum(1 for a in self.agents if a.is_alive and a.team_id == self.config['TEAM_BLUE_CONFIG']['id'])
-        red_count = sum(1 for a in self.agents if a.is_alive and a.team_id == self.config['TEAM_RED_CONFIG']['id'])
-        blue_text = self.font.render(f"Blue Team: {blue_count}", True, self.global_config['INFO_FONT_COLOR'])
-        red_text = self.font.render(f"Red Team: {red_count}", True, self.global_config['INFO_FONT_COLOR'])
-        screen.blit(blue_text, (10, 10))
-        screen.blit(red_text, (self.screen_dims[0] - red_text.get_width() - 10, 10))
\ No newline at end of file
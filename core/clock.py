@@ -0,0 +1,25 @@
+# Aegis Swarm 3.2 - Simulation Clocks
+# All time-dependent logic (value decay, bundling windows, corpse linger) reads
+# time from an injectable clock. The Battlefield owns a SimulationClock that
+# advances by the step size, so results do not depend on how fast the host runs.
+
+import time
+
+class SimulationClock:
+    """Deterministic clock that only moves when the simulation steps."""
+    def __init__(self, start_time=0.0):
+        self.current_time = float(start_time)
+
+    def now(self):
+        return self.current_time
+
+    def advance(self, dt):
+        self.current_time += dt
+
+class WallClock:
+    """Real-time clock, for components used outside a stepped simulation."""
+    def now(self):
+        return time.time()
+
+    def advance(self, dt):
+        pass
@@ -4,111 +4,226 @@
 
 import numpy as np
 import math
-import random
-from numba import njit
+from numba import njit, prange
+from core.spatial_index import UniformGrid
 
 # --- Numba Accelerated Boids Calculations ---
+@njit(cache=True, parallel=True)
+def calculate_swarm_steering_numba(pos, vel, rows, drone_radius, max_speed, weights, targets, has_target,
+                                   friend_indptr, friend_indices, width, height, wrap):
+    # One parallel pass over the whole swarm. Friends of rows[k] are the store
+    # rows friend_indices[friend_indptr[k]:friend_indptr[k + 1]]. The arithmetic
+    # mirrors the per-agent boids/seek blend operation for operation.
+    forces = np.zeros((len(rows), 2), dtype=np.float64)
+    for k in prange(len(rows)):
+        i = rows[k]
+        px, py, vx, vy = pos[i, 0], pos[i, 1], vel[i, 0], vel[i, 1]
+        sep_x, sep_y, ali_x, ali_y, coh_x, coh_y = 0.0, 0.0, 0.0, 0.0, 0.0, 0.0
+        friend_count = friend_indptr[k + 1] - friend_indptr[k]
+        if friend_count > 0:
+            sum_px, sum_py, sum_vx, sum_vy = 0.0, 0.0, 0.0, 0.0
+            sep_limit_sq = (drone_radius[i] * 4) ** 2
+            for f in range(friend_indptr[k], friend_indptr[k + 1]):
+                j = friend_indices[f]
+                fx, fy = pos[j, 0], pos[j, 1]
+                if wrap:
+                    # Friends seen across a wrapped screen edge are moved into this agent's frame.
+                    if fx - px > width * 0.5: fx -= width
+                    elif fx - px < -width * 0.5: fx += width
+                    if fy - py > height * 0.5: fy -= height
+                    elif fy - py < -height * 0.5: fy += height
+                dx, dy = px - fx, py - fy
+                dist_sq = dx ** 2 + dy ** 2
+                if 0 < dist_sq < sep_limit_sq:
+                    dist = np.sqrt(dist_sq)
+                    sep_x += dx / dist; sep_y += dy / dist
+                sum_px += fx; sum_py += fy
+                sum_vx += vel[j, 0]; sum_vy += vel[j, 1]
+            ali_x, ali_y = sum_vx / friend_count - vx, sum_vy / friend_count - vy
+            coh_x, coh_y = sum_px / friend_count - px, sum_py / friend_count - py
+        boids_x = sep_x * weights[i, 0] + ali_x * weights[i, 1] + coh_x * weights[i, 2]
+        boids_y = sep_y * weights[i, 0] + ali_y * weights[i, 1] + coh_y * weights[i, 2]
+
+        seek_x, seek_y = 0.0, 0.0
+        if has_target[k]:
+            desired_x, desired_y = targets[k, 0] - px, targets[k, 1] - py
+            dist_sq = desired_x ** 2 + desired_y ** 2
+            if dist_sq > 0:
+                dist = np.sqrt(dist_sq)
+                desired_x = (desired_x / dist) * max_speed[i]; desired_y = (desired_y / dist) * max_speed[i]
+            seek_x, seek_y = desired_x - vx, desired_y - vy
+
+        if seek_x != 0 or seek_y != 0:
+            fx_total, fy_total = boids_x * 0.2 + seek_x * 0.8, boids_y * 0.2 + seek_y * 0.8
+        else:
+            fx_total, fy_total = boids_x, boids_y
+        if np.isfinite(fx_total) and np.isfinite(fy_total):
+            forces[k, 0], forces[k, 1] = fx_total, fy_total
+    return forces
+
+# --- Numba Accelerated Combat Calculation ---
 @njit(cache=True)
-def calculate_boids_forces_numba(pos, vel, friends_pos, friends_vel, drone_radius, weights):
-    separation_force = np.zeros(2, dtype=np.float64)
-    alignment_force = np.zeros(2, dtype=np.float64)
-    cohesion_force = np.zeros(2, dtype=np.float64)
-    friend_count = len(friends_pos)
-    if friend_count > 0:
-        for friend_pos in friends_pos:
-            dist_vec = pos - friend_pos
+def resolve_aoe_damage_numba(det_pos, det_team, kill_radius, kill_prob, damage_radius, base_damage,
+                             hit_indptr, hit_indices, target_pos, target_team, target_health, target_fired, rolls):
+    # Evaluates every detonation against its candidate targets before any damage
+    # is applied. `target_fired` is the target's own detonation number (or one
+    # past the last): as in a one-by-one resolution, a detonator is still a
+    # target for the blasts before its own but not for those after it.
+    # Returns per-hit (target, damage) arrays and the kill count of each detonation.
+    n_hits = len(hit_indices)
+    hit_targets = np.empty(n_hits, dtype=np.int64)
+    hit_damage = np.empty(n_hits, dtype=np.float64)
+    kills = np.zeros(len(det_pos), dtype=np.int64)
+    count = 0
+    for d in range(len(det_pos)):
+        kill_radius_sq, damage_radius_sq = kill_radius[d]**2, damage_radius[d]**2
+        for k in range(hit_indptr[d], hit_indptr[d + 1]):
+            i = hit_indices[k]
+            if target_team[i] == det_team[d] or target_fired[i] < d: continue
+            dist_vec = det_pos[d] - target_pos[i]
             dist_sq = dist_vec[0]**2 + dist_vec[1]**2
-            if 0 < dist_sq < (drone_radius * 4)**2:
+            damage = 0.0
+            if dist_sq < kill_radius_sq:
+                if rolls[k] < kill_prob[d]:
+                    damage = target_health[i] + 1.0
+            elif dist_sq < damage_radius_sq:
                 dist = np.sqrt(dist_sq)
-                separation_force += dist_vec / dist
-        avg_velocity = np.sum(friends_vel, axis=0) / friend_count
-        alignment_force = avg_velocity - vel
-        avg_position = np.sum(friends_pos, axis=0) / friend_count
-        cohesion_force = avg_position - pos
-    return (separation_force * weights[0] + 
-            alignment_force * weights[1] + 
-            cohesion_force * weights[2])
+                damage = base_damage[d] * ((damage_radius[d] - dist) / (damage_radius[d] - kill_radius[d]))
+            if damage > 0:
+                hit_targets[count] = i; hit_damage[count] = damage; count += 1
+                if damage >= target_health[i]: kills[d] += 1
+    return hit_targets[:count], hit_damage[:count], kills
 
+# --- Numba Accelerated Perception Calculation ---
 @njit(cache=True)
-def seek_numba(pos, vel, target_pos, max_speed):
-    desired_velocity = target_pos - pos
-    dist_sq = desired_velocity[0]**2 + desired_velocity[1]**2
-    if dist_sq > 0:
+def detect_pairs_numba(pos, perception_radius, observer_rows, target_rows, rolls, base_prob, decay_rate, width, height, wrap):
+    # Evaluates every candidate (observer, target) pair against its own pre-drawn roll.
+    # With wrap, distances are measured across the screen edges, as the grid that found the pairs does.
+    detected = np.zeros(len(observer_rows), dtype=np.bool_)
+    for k in range(len(observer_rows)):
+        o, t = observer_rows[k], target_rows[k]
+        observer_radius = perception_radius[o]
+        dx, dy = pos[o, 0] - pos[t, 0], pos[o, 1] - pos[t, 1]
+        if wrap:
+            if dx > width * 0.5: dx -= width
+            elif dx < -width * 0.5: dx += width
+            if dy > height * 0.5: dy -= height
+            elif dy < -height * 0.5: dy += height
+        dist_sq = dx ** 2 + dy ** 2
+        if dist_sq > observer_radius ** 2: continue
         dist = np.sqrt(dist_sq)
-        desired_velocity = (desired_velocity / dist) * max_speed
-    return desired_velocity - vel
+        detection_prob = base_prob * math.exp(-decay_rate * (dist / observer_radius))
+        detected[k] = rolls[k] < detection_prob
+    return detected
 
-# --- Numba Accelerated Combat Calculation ---
-@njit(cache=True) # <-- THE FIX IS HERE: 'true' has been corrected to 'True'
-def suicide_aoe_numba(detonator_pos, all_pos, all_health, all_teams_id, my_team_id, 
-                        kill_radius, kill_prob, damage_radius, base_damage):
-    damage_indices, damage_values = [], []
-    kill_radius_sq, damage_radius_sq = kill_radius**2, damage_radius**2
-    for i in range(len(all_pos)):
-        if all_teams_id[i] == my_team_id: continue
-        dist_vec = detonator_pos - all_pos[i]
-        dist_sq = dist_vec[0]**2 + dist_vec[1]**2
-        if dist_sq < kill_radius_sq:
-            if random.random() < kill_prob:
-                damage_indices.append(i); damage_values.append(all_health[i] + 1.0)
-        elif dist_sq < damage_radius_sq:
-            dist = np.sqrt(dist_sq)
-            damage = base_damage * ((damage_radius - dist) / (damage_radius - kill_radius))
-            damage_indices.append(i); damage_values.append(damage)
-    return damage_indices, damage_values
+# --- Numba Accelerated Movement Integration ---
+BOUNDARY_MODES = {"none": 0, "wrap": 1, "bounce": 2}
 
-# --- Numba Accelerated Perception Calculation ---
 @njit(cache=True)
-def detect_enemy_numba(observer_pos, observer_radius, target_pos, base_prob, decay_rate):
-    dist_vec = observer_pos - target_pos
-    dist_sq = dist_vec[0]**2 + dist_vec[1]**2
-    if dist_sq > observer_radius**2: return False
-    dist = np.sqrt(dist_sq)
-    detection_prob = base_prob * math.exp(-decay_rate * (dist / observer_radius))
-    return random.random() < detection_prob
+def integrate_swarm_numba(pos, vel, acc, health, max_speed, rows, dt, boundary_mode, width, height):
+    step = dt * 50
+    for k in range(len(rows)):
+        i = rows[k]
+        if health[i] <= 0:
+            # Dead agents drift to a stop and ignore boundaries.
+            vel[i, 0] *= 0.9; vel[i, 1] *= 0.9
+            pos[i, 0] += vel[i, 0] * step; pos[i, 1] += vel[i, 1] * step
+            continue
+        ax, ay = acc[i, 0], acc[i, 1]
+        accel_norm = np.sqrt(ax * ax + ay * ay)
+        if accel_norm > 1.0:
+            ax /= accel_norm; ay /= accel_norm
+        vx, vy = vel[i, 0] + ax, vel[i, 1] + ay
+        speed = np.sqrt(vx * vx + vy * vy)
+        if speed > max_speed[i]:
+            vx = (vx / speed) * max_speed[i]; vy = (vy / speed) * max_speed[i]
+        x, y = pos[i, 0] + vx * step, pos[i, 1] + vy * step
+        if boundary_mode == 1:
+            if x > width: x = 0.0
+            elif x < 0: x = width
+            if y > height: y = 0.0
+            elif y < 0: y = height
+        elif boundary_mode == 2:
+            if x > width: x = 2 * width - x; vx = -vx
+            elif x < 0: x = -x; vx = -vx
+            if y > height: y = 2 * height - y; vy = -vy
+            elif y < 0: y = -y; vy = -vy
+        pos[i, 0], pos[i, 1] = x, y
+        vel[i, 0], vel[i, 1] = vx, vy
+        acc[i, 0], acc[i, 1] = 0.0, 0.0
 
 # --- Main Model Classes ---
 
 class BoidsModel:
-    def calculate_steering_force(self, agent, friends, boids_weights, target_pos=None):
-        total_force = np.zeros(2, dtype=float)
-        friends_pos = np.array([f.pos for f in friends], dtype=float) if friends else np.empty((0, 2), dtype=float)
-        friends_vel = np.array([f.velocity for f in friends], dtype=float) if friends else np.empty((0, 2), dtype=float)
-        weights_np = np.array([boids_weights['separation'], boids_weights['alignment'], boids_weights['cohesion']], dtype=float)
-        boids_force = calculate_boids_forces_numba(agent.pos, agent.velocity, friends_pos, friends_vel, agent.drone_radius, weights_np)
-        
-        seek_force = np.zeros(2, dtype=float)
-        if target_pos is not None and isinstance(target_pos, np.ndarray):
-             seek_force = seek_numba(agent.pos, agent.velocity, target_pos, agent.max_speed)
-
-        if np.any(seek_force):
-            total_force = boids_force * 0.2 + seek_force * 0.8
-        else:
-            total_force = boids_force
+    def calculate_swarm_steering(self, swarm, rows, friend_indptr, friend_indices, target_positions, wrap_dims=None):
+        """
+        Computes the steering force of every agent in `rows` in one kernel call.
+        `target_positions` holds each agent's target_pos (or None); friends are
+        given as a CSR list of store rows, aligned with `rows`.
+        """
+        targets = np.zeros((len(rows), 2), dtype=np.float64)
+        has_target = np.zeros(len(rows), dtype=np.bool_)
+        for k, target_pos in enumerate(target_positions):
+            if target_pos is not None and isinstance(target_pos, np.ndarray):
+                targets[k] = target_pos; has_target[k] = True
+        width, height = wrap_dims if wrap_dims is not None else (0.0, 0.0)
+        return calculate_swarm_steering_numba(
+            swarm.pos, swarm.velocity, np.asarray(rows, dtype=np.int64), swarm.radius, swarm.max_speed,
+            swarm.boids_weights, targets, has_target, friend_indptr, friend_indices,
+            float(width), float(height), wrap_dims is not None)
 
-        if np.isnan(total_force).any() or np.isinf(total_force).any():
-            return np.zeros(2, dtype=float)
-            
-        return total_force
+class MotionModel:
+    def integrate(self, swarm, rows, dt, boundary_behavior, screen_width, screen_height):
+        """Moves every agent in `rows` one tick in a single kernel call."""
+        integrate_swarm_numba(swarm.pos, swarm.velocity, swarm.acceleration, swarm.health, swarm.max_speed,
+                              np.asarray(rows, dtype=np.int64), float(dt), BOUNDARY_MODES.get(boundary_behavior, 0),
+                              float(screen_width), float(screen_height))
 
 class CombatModel:
-    def suicide_aoe_detonation(self, detonator, all_agents, weapon_config):
-        agent_indices = [i for i, a in enumerate(all_agents) if a.is_alive]
-        if not agent_indices: return []
-        all_pos = np.array([all_agents[i].pos for i in agent_indices], dtype=float)
-        all_health = np.array([all_agents[i].health for i in agent_indices], dtype=float)
-        all_teams_id = np.array([all_agents[i].team_id for i in agent_indices])
-        indices, values = suicide_aoe_numba(
-            detonator.pos, all_pos, all_health, all_teams_id, detonator.team_id,
-            weapon_config["kill_radius"], weapon_config["kill_prob"],
-            weapon_config["damage_radius"], weapon_config["base_damage"])
-        damage_events = []
-        for i in range(len(indices)):
-            damage_events.append({'agent': all_agents[agent_indices[indices[i]]], 'damage': values[i]})
-        return damage_events
+    def __init__(self, rng=None):
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+    def resolve_detonations(self, swarm, detonator_rows, target_rows, screen_dims):
+        """
+        Resolves all of this tick's suicide AOE detonations at once, in
+        detonator order. Call it before the detonators self-destruct: they
+        are targets too, for the blasts that precede their own. Every blast
+        is evaluated before any damage lands.
+        Returns per-hit (store row, damage) arrays in that order and the kills
+        per detonator.
+        """
+        weapons = [swarm.agents[r].weapon_template for r in detonator_rows]
+        kill_radius = np.array([w["kill_radius"] for w in weapons], dtype=np.float64)
+        kill_prob = np.array([w["kill_prob"] for w in weapons], dtype=np.float64)
+        damage_radius = np.array([w["damage_radius"] for w in weapons], dtype=np.float64)
+        base_damage = np.array([w["base_damage"] for w in weapons], dtype=np.float64)
+        det_pos = swarm.pos[detonator_rows]
+
+        target_pos = swarm.pos[target_rows]
+        # The query radius is padded so the kernel's exact squared-distance test has the final say.
+        query_radius = damage_radius + 1.0
+        grid = UniformGrid(target_pos, query_radius.max(), *screen_dims)
+        hit_indptr, hit_indices = grid.query_points(det_pos, query_radius)
+        rolls = self.rng.random(len(hit_indices))
+        fired = np.full(swarm.count, len(detonator_rows), dtype=np.int64)
+        fired[detonator_rows] = np.arange(len(detonator_rows))
+        hit_targets, hit_damage, kills = resolve_aoe_damage_numba(
+            det_pos, swarm.team_id[detonator_rows], kill_radius, kill_prob, damage_radius, base_damage,
+            hit_indptr, hit_indices, target_pos, swarm.team_id[target_rows], swarm.health[target_rows], fired[target_rows], rolls)
+        return target_rows[hit_targets], hit_damage, kills
 
 class PerceptionModel:
-    def detect_enemy(self, observer, target, detection_config):
-        return detect_enemy_numba(
-            observer.pos, observer.perception_radius, target.pos,
-            detection_config["base_prob"], detection_config["prob_decay_rate"])
\ No newline at end of file
+    def __init__(self, rng=None):
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+    def detect_pairs(self, swarm, observer_rows, target_rows, detection_config, screen_dims, wrap=False):
+        """
+        Runs one detection roll per candidate (observer, target) pair of store
+        rows. All rolls for the tick come from a single draw. With wrap,
+        distances are measured across the edges of `screen_dims`. Returns a boolean mask.
+        """
+        rolls = self.rng.random(len(observer_rows))
+        return detect_pairs_numba(
+            swarm.pos, swarm.perception_radius, np.asarray(observer_rows, dtype=np.int64),
+            np.asarray(target_rows, dtype=np.int64), rolls,
+            detection_config["base_prob"], detection_config["prob_decay_rate"], float(screen_dims[0]), float(screen_dims[1]), wrap)
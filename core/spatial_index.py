@@ -0,0 +1,183 @@
+# Aegis Swarm 3.2 - Uniform-Grid Spatial Index
+# A cell-list index that is rebuilt once per tick. Cells are at least as wide as
+# the largest query radius, so any radius query only has to look at the 3x3
+# block of cells around the query point instead of at every agent.
+
+import numpy as np
+from numba import njit
+
+# --- Numba Accelerated Cell-List Kernels ---
+@njit(cache=True)
+def build_cell_lists_numba(cell_ids, num_cells):
+    # Counting sort of point indices by cell. Points keep their original
+    # (ascending) order inside each cell.
+    cell_start = np.zeros(num_cells + 1, dtype=np.int64)
+    for c in cell_ids:
+        cell_start[c + 1] += 1
+    for c in range(num_cells):
+        cell_start[c + 1] += cell_start[c]
+    fill = cell_start[:-1].copy()
+    order = np.empty(len(cell_ids), dtype=np.int64)
+    for i in range(len(cell_ids)):
+        c = cell_ids[i]
+        order[fill[c]] = i
+        fill[c] += 1
+    return order, cell_start
+
+@njit(cache=True)
+def neighbor_cells_numba(c, n, wrap):
+    # Returns the distinct cell coordinates adjacent to `c` along one axis.
+    out = np.empty(3, dtype=np.int64)
+    count = 0
+    if wrap and n <= 3:
+        for k in range(n):
+            out[count] = k; count += 1
+    else:
+        for d in range(-1, 2):
+            k = c + d
+            if wrap:
+                k = k % n
+            elif k < 0 or k >= n:
+                continue
+            out[count] = k; count += 1
+    return out[:count]
+
+@njit(cache=True)
+def pair_distance_numba(p, q, width, height, wrap):
+    dx = p[0] - q[0]
+    dy = p[1] - q[1]
+    if wrap:
+        if dx > width * 0.5: dx -= width
+        elif dx < -width * 0.5: dx += width
+        if dy > height * 0.5: dy -= height
+        elif dy < -height * 0.5: dy += height
+    return np.sqrt(dx * dx + dy * dy)
+
+@njit(cache=True)
+def query_radius_numba(query_pos, radii, query_cell_x, query_cell_y, pos, order, cell_start,
+                       nx, ny, width, height, wrap, exclude_self):
+    # Two passes (count, then fill) produce a CSR list: the indexed points
+    # within radii[q] of query point q are indices[indptr[q]:indptr[q + 1]],
+    # sorted ascending. With exclude_self, query q is indexed point q.
+    n = len(query_pos)
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    for q in range(n):
+        count = 0
+        for gx in neighbor_cells_numba(query_cell_x[q], nx, wrap):
+            for gy in neighbor_cells_numba(query_cell_y[q], ny, wrap):
+                c = gy * nx + gx
+                for k in range(cell_start[c], cell_start[c + 1]):
+                    j = order[k]
+                    if (not exclude_self or j != q) and pair_distance_numba(query_pos[q], pos[j], width, height, wrap) < radii[q]:
+                        count += 1
+        indptr[q + 1] = indptr[q] + count
+    indices = np.empty(indptr[n], dtype=np.int64)
+    for q in range(n):
+        cursor = indptr[q]
+        for gx in neighbor_cells_numba(query_cell_x[q], nx, wrap):
+            for gy in neighbor_cells_numba(query_cell_y[q], ny, wrap):
+                c = gy * nx + gx
+                for k in range(cell_start[c], cell_start[c + 1]):
+                    j = order[k]
+                    if (not exclude_self or j != q) and pair_distance_numba(query_pos[q], pos[j], width, height, wrap) < radii[q]:
+                        indices[cursor] = j; cursor += 1
+        indices[indptr[q]:indptr[q + 1]].sort()
+    return indptr, indices
+
+# --- Main Index Class ---
+
+class UniformGrid:
+    """
+    Buckets a set of 2D points into square cells of at least `cell_size`.
+    With `wrap=True` the world is treated as a torus, matching the "wrap"
+    boundary behavior, so neighbours across the screen edge are found.
+    """
+    def __init__(self, positions, cell_size, width, height, wrap=False):
+        self.positions = np.ascontiguousarray(positions, dtype=np.float64).reshape(-1, 2)
+        self.width, self.height = float(width), float(height)
+        self.wrap = bool(wrap)
+        cell_size = max(float(cell_size), 1.0)
+        self.nx = max(1, int(self.width // cell_size))
+        self.ny = max(1, int(self.height // cell_size))
+        self.cell_w, self.cell_h = self.width / self.nx, self.height / self.ny
+        self.cell_x, self.cell_y = self.cells_of(self.positions)
+        self.order, self.cell_start = build_cell_lists_numba(self.cell_y * self.nx + self.cell_x, self.nx * self.ny)
+
+    def cells_of(self, points):
+        x, y = points[:, 0], points[:, 1]
+        if self.wrap:
+            x, y = np.mod(x, self.width), np.mod(y, self.height)
+        cell_x = np.clip(np.floor(x / self.cell_w), 0, self.nx - 1).astype(np.int64)
+        cell_y = np.clip(np.floor(y / self.cell_h), 0, self.ny - 1).astype(np.int64)
+        return cell_x, cell_y
+
+    def query_neighbors(self, radii):
+        """
+        Finds, for every indexed point i, all other points closer than radii[i].
+        Radii must not exceed the cell size. Returns a CSR pair (indptr, indices).
+        """
+        radii = np.broadcast_to(np.asarray(radii, dtype=np.float64), (len(self.positions),)).copy()
+        return query_radius_numba(self.positions, radii, self.cell_x, self.cell_y,
+                                  self.positions, self.order, self.cell_start, self.nx, self.ny,
+                                  self.width, self.height, self.wrap, True)
+
+    def query_points(self, points, radii):
+        """
+        Finds, for every external query point q, the indexed points closer than
+        radii[q]. Radii must not exceed the cell size. Returns a CSR pair (indptr, indices).
+        """
+        points = np.ascontiguousarray(points, dtype=np.float64).reshape(-1, 2)
+        radii = np.broadcast_to(np.asarray(radii, dtype=np.float64), (len(points),)).copy()
+        cell_x, cell_y = self.cells_of(points)
+        return query_radius_numba(points, radii, cell_x, cell_y,
+                                  self.positions, self.order, self.cell_start, self.nx, self.ny,
+                                  self.width, self.height, self.wrap, False)
+
+class IncrementalGrid:
+    """
+    Dict-of-cells index over a slowly changing set of keyed points, updated in
+    place as points are inserted, moved or removed. Queries return candidate
+    keys in insertion order; callers apply their own exact distance test.
+    """
+    def __init__(self, cell_size):
+        self.cell_size = max(float(cell_size), 1.0)
+        self.cells = {}
+        self.entries = {}  # key -> (cell, insertion sequence)
+        self._next_seq = 0
+
+    def _cell_of(self, position):
+        return (int(np.floor(position[0] / self.cell_size)), int(np.floor(position[1] / self.cell_size)))
+
+    def insert(self, key, position):
+        cell = self._cell_of(position)
+        self.entries[key] = (cell, self._next_seq)
+        self.cells.setdefault(cell, set()).add(key)
+        self._next_seq += 1
+
+    def move(self, key, position):
+        old_cell, seq = self.entries[key]
+        cell = self._cell_of(position)
+        if cell == old_cell: return
+        self._discard_from_cell(key, old_cell)
+        self.entries[key] = (cell, seq)
+        self.cells.setdefault(cell, set()).add(key)
+
+    def remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None: self._discard_from_cell(key, entry[0])
+
+    def _discard_from_cell(self, key, cell):
+        members = self.cells[cell]
+        members.discard(key)
+        if not members: del self.cells[cell]
+
+    def candidates(self, position, radius):
+        """Keys in every cell that may hold a point within `radius`, in insertion order."""
+        cx, cy = self._cell_of(position)
+        reach = int(np.ceil(radius / self.cell_size))
+        found = []
+        for gx in range(cx - reach, cx + reach + 1):
+            for gy in range(cy - reach, cy + reach + 1):
+                found.extend(self.cells.get((gx, gy), ()))
+        found.sort(key=lambda key: self.entries[key][1])
+        return found
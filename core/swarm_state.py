@@ -0,0 +1,130 @@
+# Aegis Swarm 3.2 - Swarm State Store (Structure-of-Arrays)
+# Keeps the per-agent physical state of a whole swarm in contiguous NumPy
+# arrays. `Agent` objects are thin views (a row index) into this store, so
+# vectorized consumers can read positions, velocities or health directly
+# instead of re-gathering them from every agent each tick.
+
+import numpy as np
+
+class SwarmState:
+    # Column name -> (per-row shape, dtype)
+    FIELDS = {
+        'pos': ((2,), np.float64), 'velocity': ((2,), np.float64), 'acceleration': ((2,), np.float64),
+        'health': ((), np.float64), 'team_id': ((), np.int64), 'role_id': ((), np.int64),
+        'radius': ((), np.float64), 'max_speed': ((), np.float64), 'perception_radius': ((), np.float64),
+        'time_of_death': ((), np.float64), 'death_linger': ((), np.float64), 'boids_weights': ((3,), np.float64),
+        'agent_id': ((), np.int64),
+    }
+
+    def __init__(self, capacity=64):
+        self.capacity = max(1, int(capacity))
+        self.count = 0
+        self.next_agent_id = 0
+        self.agents = []
+        self.role_names = []
+        self._buffers = {name: np.zeros((self.capacity,) + shape, dtype=dtype) for name, (shape, dtype) in self.FIELDS.items()}
+        self._buffers['time_of_death'][:] = np.nan
+        # Per-team living-agent counts and health totals, kept in step by add(), apply_damage(), apply_damage_many() and set_health().
+        self.team_alive = {}
+        self.team_health = {}
+        self._refresh_views()
+
+    def _refresh_views(self):
+        # Public columns are always exactly `count` rows long.
+        for name, buf in self._buffers.items():
+            setattr(self, name, buf[:self.count])
+
+    def role_id_for(self, role_name):
+        if role_name not in self.role_names: self.role_names.append(role_name)
+        return self.role_names.index(role_name)
+
+    def add(self, agent, **values):
+        """Appends a row for `agent`, giving it the next integer agent id, and returns its index."""
+        if self.count == self.capacity:
+            self.capacity *= 2
+            for name, buf in self._buffers.items():
+                grown = np.zeros((self.capacity,) + buf.shape[1:], dtype=buf.dtype)
+                grown[:self.count] = buf[:self.count]
+                if name == 'time_of_death': grown[self.count:] = np.nan
+                self._buffers[name] = grown
+        index = self.count
+        for name, value in values.items():
+            self._buffers[name][index] = value
+        self._buffers['agent_id'][index] = self.next_agent_id
+        self.next_agent_id += 1
+        self.count += 1
+        self.agents.append(agent)
+        self._refresh_views()
+        team, health = int(self.team_id[index]), float(self.health[index])
+        self.team_alive.setdefault(team, 0); self.team_health.setdefault(team, 0.0)
+        if health > 0:
+            self.team_alive[team] += 1; self.team_health[team] += health
+        return index
+
+    def apply_damage(self, index, amount):
+        """
+        Lowers an agent's health by `amount` (never below 0) and updates its
+        team's totals. Returns True if this killed the agent.
+        """
+        health = self.health[index]
+        if health <= 0: return False
+        self.set_health(index, health - amount)
+        return self.health[index] <= 0
+
+    def apply_damage_many(self, rows, amounts, current_time):
+        """
+        Bulk form of apply_damage: damage to a repeated row is summed, health
+        is clamped at 0 and the team totals follow. Rows killed here get
+        `current_time` as their time of death (unless one is set). Returns those rows.
+        """
+        delta = np.zeros(self.count)
+        np.add.at(delta, np.asarray(rows, dtype=np.int64), amounts)
+        touched = np.flatnonzero((delta > 0) & (self.health > 0))
+        health = self.health[touched]
+        new_health = np.maximum(health - delta[touched], 0.0)
+        self.health[touched] = new_health
+        teams, killed = self.team_id[touched], new_health <= 0
+        for team in np.unique(teams).tolist():
+            mine = teams == team
+            self.team_health[team] -= (health[mine] - new_health[mine]).sum()
+            self.team_alive[team] -= int(np.count_nonzero(killed[mine]))
+        killed_rows = touched[killed]
+        self.time_of_death[killed_rows[np.isnan(self.time_of_death[killed_rows])]] = current_time
+        return killed_rows
+
+    def set_health(self, index, value):
+        """Sets an agent's health (clamped at 0), keeping its team's totals in step."""
+        health, new_health = self.health[index], max(value, 0)
+        team = int(self.team_id[index])
+        self.health[index] = new_health
+        self.team_health[team] += (new_health if new_health > 0 else 0) - (health if health > 0 else 0)
+        self.team_alive[team] += int(new_health > 0) - int(health > 0)
+
+    def alive_mask(self):
+        return self.health > 0
+
+    def truly_dead_mask(self, current_time):
+        """Dead agents whose corpse has lingered long enough to be removed."""
+        dead = self.health <= 0
+        expired = np.isnan(self.time_of_death) | (current_time - self.time_of_death > self.death_linger)
+        return dead & expired
+
+    def compact(self, keep_mask):
+        """
+        Drops every row where keep_mask is False, in bulk. Fresh buffers are
+        allocated so that any array views handed out before (e.g. an enemy's
+        position used as a steering target) stay valid rather than aliasing
+        another agent's row.
+        """
+        keep_idx = np.flatnonzero(keep_mask)
+        if len(keep_idx) == self.count: return
+        for name, buf in self._buffers.items():
+            compacted = np.zeros_like(buf)
+            compacted[:len(keep_idx)] = buf[keep_idx]
+            if name == 'time_of_death': compacted[len(keep_idx):] = np.nan
+            self._buffers[name] = compacted
+        self.agents = [self.agents[i] for i in keep_idx]
+        for new_index, agent in enumerate(self.agents):
+            agent.index = new_index
+        self.count = len(keep_idx)
+        self._refresh_views()
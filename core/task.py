@@ -1,85 +1,325 @@
-# Aegis Swarm 3.0 - Task Data Class (Patch 3.0.1)
-# PATCH: Added `is_part_of_bundle` flag to prevent re-bundling bugs.
+# Aegis Swarm 3.2 - Columnar Task Table
+# Market tasks live in a column store owned by the Marketplace: a task's id is
+# its row number, and its state is spread over parallel NumPy arrays, so
+# market-wide updates (value decay, open-task scans) are vectorized. Rows of
+# retired tasks are reclaimed for new ones, so the table is sized by the tasks
+# alive at once, not by every task ever created; `serial` keeps creation order.
+# A bundle owns a contiguous range of a flat member list plus a running sum of
+# its members' positions, so its centroid follows member moves in O(1). The
+# list is compacted when it fills up, dropping the ranges nobody owns.
+# `Task` is a thin facade over one row for strategy and tour code.
 
-import uuid
-import time
 import numpy as np
 
+STATUS_NAMES = ('OPEN', 'ASSIGNED', 'COMPLETED')
+STATUS_OPEN, STATUS_ASSIGNED, STATUS_COMPLETED = range(3)
+
+class TaskTable:
+    # Column name -> (per-row shape, dtype, fill value)
+    FIELDS = {
+        'position': ((2,), np.float64, 0.0), 'status': ((), np.int8, STATUS_OPEN),
+        'base_value': ((), np.float64, 1.0), 'current_value': ((), np.float64, 1.0),
+        'creation_time': ((), np.float64, 0.0), 'last_update_time': ((), np.float64, 0.0),
+        'enemy_target_id': ((), np.int64, -1), 'assigned_agent_id': ((), np.int64, -1),
+        'winning_bid': ((), np.float64, np.inf), 'is_bundle': ((), np.bool_, False),
+        'bundle_parent': ((), np.int64, -1), 'reporter_count': ((), np.int64, 0),
+        'member_start': ((), np.int64, 0), 'member_count': ((), np.int64, 0), 'member_pos_sum': ((2,), np.float64, 0.0),
+        'serial': ((), np.int64, -1),
+    }
+
+    def __init__(self, capacity=64):
+        self.capacity = max(1, int(capacity))
+        self.count = 0
+        self.created = 0  # tasks ever created; the next task's serial
+        self._buffers = {name: np.full((self.capacity,) + shape, fill, dtype=dtype) for name, (shape, dtype, fill) in self.FIELDS.items()}
+        # One bit per reporting agent id, grown in 64-bit words as ids get larger.
+        self._buffers['reporter_bits'] = np.zeros((self.capacity, 1), dtype=np.uint64)
+        # Bundle members, as ranges [member_start, member_start + member_count) per bundle.
+        self.members = np.empty(64, dtype=np.int64)
+        self.members_used = 0
+        self._facades = []
+        # Retired rows wait one reclaim in _retiring (holders of their facades get to
+        # see them completed) before they are reused from _free_rows.
+        self._retiring = []
+        self._free_rows = []
+        self._refresh_views()
+
+    def _refresh_views(self):
+        # Public columns are always exactly `count` rows long.
+        for name, buf in self._buffers.items():
+            setattr(self, name, buf[:self.count])
+
+    def _grow(self):
+        self.capacity *= 2
+        for name, buf in self._buffers.items():
+            fill = self.FIELDS[name][2] if name in self.FIELDS else 0
+            grown = np.full((self.capacity,) + buf.shape[1:], fill, dtype=buf.dtype)
+            grown[:self.count] = buf[:self.count]
+            self._buffers[name] = grown
+
+    def _ensure_reporter_words(self, agent_id):
+        words_needed = agent_id // 64 + 1
+        bits = self._buffers['reporter_bits']
+        if words_needed > bits.shape[1]:
+            grown = np.zeros((self.capacity, words_needed), dtype=np.uint64)
+            grown[:, :bits.shape[1]] = bits
+            self._buffers['reporter_bits'] = grown
+            self._refresh_views()
+
+    def add(self, position, enemy_target_id, reporting_agent_id, creation_time, initial_value=1.0):
+        """Adds an OPEN task created at sim time `creation_time` and returns its id."""
+        row = int(self.add_many([position], [enemy_target_id], [initial_value], creation_time)[0])
+        if reporting_agent_id is not None: self.add_reporter(row, reporting_agent_id)
+        return row
+
+    def add_many(self, positions, enemy_target_ids, initial_values, creation_time):
+        """
+        Adds one OPEN task per position (without reporters), created at sim
+        time `creation_time`, and returns their ids. Reclaimed rows are used
+        before the table grows.
+        """
+        n = len(positions)
+        reused = [self._free_rows.pop() for _ in range(min(n, len(self._free_rows)))]
+        appended = n - len(reused)
+        while self.count + appended > self.capacity: self._grow()
+        rows = np.concatenate((np.array(reused, dtype=np.int64), np.arange(self.count, self.count + appended)))
+        buf = self._buffers
+        if reused:
+            for name, (_, _, fill) in self.FIELDS.items(): buf[name][reused] = fill
+            buf['reporter_bits'][reused] = 0
+        buf['serial'][rows] = np.arange(self.created, self.created + n)
+        self.created += n
+        buf['position'][rows] = positions
+        buf['base_value'][rows] = buf['current_value'][rows] = initial_values
+        buf['creation_time'][rows] = buf['last_update_time'][rows] = creation_time
+        buf['enemy_target_id'][rows] = enemy_target_ids
+        self._facades.extend(Task(self, row) for row in range(self.count, self.count + appended))
+        self.count += appended
+        self._refresh_views()
+        return rows
+
+    def retire(self, rows):
+        """Marks removed tasks' rows for reuse; they become free at the next reclaim_retired()."""
+        self._retiring.extend(int(row) for row in rows)
+
+    def reclaim_retired(self):
+        """Frees the rows retired before the previous call (their bundles give up their member ranges)."""
+        retiring, self._retiring = self._retiring, []
+        if not retiring: return
+        self.member_count[retiring] = 0
+        self._free_rows.extend(retiring)
+
+    def _compact_member_list(self):
+        # Moves every owned member range to the front of the list, in bundle order.
+        bundles = np.flatnonzero(self.is_bundle & (self.member_count > 0))
+        counts = self.member_count[bundles]
+        new_starts = np.cumsum(counts) - counts
+        total = int(counts.sum())
+        source = np.repeat(self.member_start[bundles] - new_starts, counts) + np.arange(total)
+        self.members[:total] = self.members[source]
+        self.member_start[bundles] = new_starts
+        self.members_used = total
+
+    def task(self, row):
+        return self._facades[row]
+
+    def has_reporter(self, row, agent_id):
+        word = agent_id // 64
+        if word >= self.reporter_bits.shape[1]: return False
+        return bool((int(self.reporter_bits[row, word]) >> (agent_id % 64)) & 1)
+
+    def add_reporter(self, row, agent_id):
+        if self.has_reporter(row, agent_id): return
+        self._ensure_reporter_words(agent_id)
+        self.reporter_bits[row, agent_id // 64] |= np.uint64(1 << (agent_id % 64))
+        self.reporter_count[row] += 1
+
+    def add_reporters(self, rows, agent_ids):
+        """Bulk form of add_reporter for (rows[k], agent_ids[k]) pairs; duplicates are harmless."""
+        rows, agent_ids = np.asarray(rows, dtype=np.int64), np.asarray(agent_ids, dtype=np.int64)
+        if not len(rows): return
+        self._ensure_reporter_words(int(agent_ids.max()))
+        bits = np.left_shift(np.uint64(1), (agent_ids % 64).astype(np.uint64))
+        np.bitwise_or.at(self.reporter_bits, (rows, agent_ids // 64), bits)
+        touched = np.unique(rows)
+        self.reporter_count[touched] = self._popcount(touched)
+
+    def _popcount(self, rows):
+        return np.unpackbits(self.reporter_bits[rows].view(np.uint8), axis=-1).sum(axis=-1)
+
+    def member_rows(self, bundle):
+        start = self.member_start[bundle]
+        return self.members[start:start + self.member_count[bundle]]
+
+    def create_bundle(self, rows, creation_time):
+        """
+        Merges the given tasks into a new bundle task positioned at their
+        centroid and returns its id. The first row provides the bundle's
+        enemy target id.
+        """
+        rows = list(rows)
+        if not rows: return None
+        bundle = self.add(np.mean(self.position[rows], axis=0), self.enemy_target_id[rows[0]], None, creation_time)
+        if self.members_used + len(rows) > len(self.members):
+            self._compact_member_list()
+            # Grow when the list would still be over half full, so compactions stay rare.
+            if 2 * (self.members_used + len(rows)) > len(self.members):
+                grown = np.empty(max(2 * len(self.members), 2 * (self.members_used + len(rows))), dtype=np.int64)
+                grown[:self.members_used] = self.members[:self.members_used]
+                self.members = grown
+        self.members[self.members_used:self.members_used + len(rows)] = rows
+        self.member_start[bundle], self.member_count[bundle] = self.members_used, len(rows)
+        self.members_used += len(rows)
+        self.member_pos_sum[bundle] = self.position[rows].sum(axis=0)
+        self.is_bundle[bundle] = True
+        self.bundle_parent[rows] = bundle
+        self.base_value[bundle] = sum(self.base_value[rows].tolist())
+        self.current_value[bundle] = sum(self.current_value[rows].tolist())
+        self.reporter_bits[bundle] = np.bitwise_or.reduce(self.reporter_bits[rows], axis=0)
+        self.reporter_count[bundle] = self._popcount(bundle)
+        return bundle
+
+    def move_member(self, row, new_position):
+        """Moves a task, keeping its bundle's running position sum in step."""
+        parent = self.bundle_parent[row]
+        if parent >= 0: self.member_pos_sum[parent] += new_position - self.position[row]
+        self.position[row] = new_position
+
+    def compact_members(self, bundle):
+        """
+        Drops completed members from a bundle's range (keeping the order of
+        the rest) and re-sums the remaining positions. Returns the new count.
+        """
+        members = self.member_rows(bundle)
+        remaining = members[self.status[members] != STATUS_COMPLETED]
+        members[:len(remaining)] = remaining
+        self.member_count[bundle] = len(remaining)
+        self.member_pos_sum[bundle] = self.position[remaining].sum(axis=0)
+        return len(remaining)
+
+    def centroid(self, bundle):
+        return self.member_pos_sum[bundle] / self.member_count[bundle]
+
+    def dissolve_bundle(self, bundle):
+        """Detaches the members (they become independent tasks again) and retires the bundle."""
+        members = self.member_rows(bundle).copy()
+        self.bundle_parent[members] = -1
+        self.member_count[bundle] = 0
+        self.status[bundle] = STATUS_COMPLETED
+        return members
+
+    def _with_members(self, row):
+        return np.concatenate(([row], self.member_rows(row))) if self.is_bundle[row] else row
+
+    def assign(self, row, agent_id, winning_bid):
+        rows = self._with_members(row)
+        self.status[rows] = STATUS_ASSIGNED
+        self.assigned_agent_id[rows] = agent_id
+        self.winning_bid[row] = winning_bid
+
+    def release(self, row):
+        rows = self._with_members(row)
+        self.status[rows] = STATUS_OPEN
+        self.assigned_agent_id[rows] = -1
+        self.winning_bid[rows] = np.inf
+
+    def complete(self, row):
+        self.status[self._with_members(row)] = STATUS_COMPLETED
+
 class Task:
-    def __init__(self, position, enemy_target_id, reporting_agent_id, initial_value=1.0):
-        self.id = uuid.uuid4()
-        self.creation_time = time.time()
-        self.last_update_time = self.creation_time
-        self.enemy_target_id = enemy_target_id
-        self.position = np.array(position, dtype=float)
-        self.base_value = float(initial_value)
-        self.current_value = float(initial_value)
-        self.reporters = {reporting_agent_id}
-        self.status = 'OPEN'
-        self.assigned_agent_id = None
-        self.winning_bid = float('inf')
-        self.is_bundle = False
-        self.sub_tasks = []
-
-        # --- [FIX] NEW FLAG ---
-        # This flag is set to True when a single task is absorbed into a bundle.
-        # This prevents it from being considered for other bundles.
-        self.is_part_of_bundle = False
+    """Read/write view of one row of a TaskTable."""
+    __slots__ = ('table', 'id')
+
+    def __init__(self, table, row):
+        self.table = table
+        self.id = row
+
+    @property
+    def position(self):
+        # A copy, so holders keep the position they read (as with the old per-task arrays).
+        return self.table.position[self.id].copy()
+
+    @property
+    def status(self):
+        return STATUS_NAMES[self.table.status[self.id]]
+
+    @property
+    def current_value(self):
+        return float(self.table.current_value[self.id])
+
+    @current_value.setter
+    def current_value(self, value):
+        self.table.current_value[self.id] = value
+
+    @property
+    def base_value(self):
+        return float(self.table.base_value[self.id])
+
+    @property
+    def creation_time(self):
+        return float(self.table.creation_time[self.id])
+
+    @property
+    def last_update_time(self):
+        return float(self.table.last_update_time[self.id])
+
+    @property
+    def enemy_target_id(self):
+        return int(self.table.enemy_target_id[self.id])
+
+    @property
+    def assigned_agent_id(self):
+        agent_id = int(self.table.assigned_agent_id[self.id])
+        return agent_id if agent_id >= 0 else None
+
+    @property
+    def winning_bid(self):
+        return float(self.table.winning_bid[self.id])
+
+    @property
+    def is_bundle(self):
+        return bool(self.table.is_bundle[self.id])
+
+    @property
+    def is_part_of_bundle(self):
+        return bool(self.table.bundle_parent[self.id] >= 0)
+
+    @property
+    def sub_tasks(self):
+        return [self.table.task(row) for row in self.table.member_rows(self.id).tolist()]
+
+    def first_open_sub_task(self):
+        """The first member that is not completed yet, or None."""
+        members = self.table.member_rows(self.id)
+        pending = members[self.table.status[members] != STATUS_COMPLETED]
+        return self.table.task(int(pending[0])) if len(pending) else None
+
+    @property
+    def reporter_count(self):
+        return int(self.table.reporter_count[self.id])
+
+    def has_reporter(self, agent_id):
+        return self.table.has_reporter(self.id, agent_id)
 
     def update_position(self, new_position):
-        self.position = np.array(new_position, dtype=float)
+        self.table.move_member(self.id, new_position)
 
     def add_reporter(self, agent_id):
-        self.reporters.add(agent_id)
+        self.table.add_reporter(self.id, agent_id)
 
     def assign_to(self, agent_id, winning_bid):
-        self.status = 'ASSIGNED'
-        self.assigned_agent_id = agent_id
-        self.winning_bid = winning_bid
-        if self.is_bundle:
-            for sub_task in self.sub_tasks:
-                sub_task.status = 'ASSIGNED'
-                sub_task.assigned_agent_id = agent_id
+        self.table.assign(self.id, agent_id, winning_bid)
 
     def release(self):
-        self.status = 'OPEN'
-        self.assigned_agent_id = None
-        self.winning_bid = float('inf')
-        if self.is_bundle:
-            for sub_task in self.sub_tasks:
-                sub_task.release()
-                
+        self.table.release(self.id)
+
     def complete(self):
-        self.status = 'COMPLETED'
-        if self.is_bundle:
-            for sub_task in self.sub_tasks:
-                sub_task.complete()
-
-    @staticmethod
-    def create_bundle(tasks_to_bundle):
-        if not tasks_to_bundle:
-            return None
-        
-        bundle_position = np.mean([t.position for t in tasks_to_bundle], axis=0)
-        first_task = tasks_to_bundle[0]
-        bundle_task = Task(bundle_position, first_task.enemy_target_id, first_task.reporters.copy().pop())
-        bundle_task.is_bundle = True
-        
-        # --- [FIX] Mark sub-tasks as claimed ---
-        for task in tasks_to_bundle:
-            task.is_part_of_bundle = True
-        bundle_task.sub_tasks = tasks_to_bundle
-        
-        bundle_task.base_value = sum(t.base_value for t in tasks_to_bundle)
-        bundle_task.current_value = sum(t.current_value for t in tasks_to_bundle)
-        bundle_task.reporters = set.union(*[t.reporters for t in tasks_to_bundle])
-        
-        return bundle_task
+        self.table.complete(self.id)
 
     def __repr__(self):
         if self.is_bundle:
-            return (f"BundleTask(id={str(self.id)[-6:]}, value={self.current_value:.2f}, "
-                    f"sub_tasks={len(self.sub_tasks)}, status={self.status})")
+            return (f"BundleTask(id={self.id}, value={self.current_value:.2f}, "
+                    f"sub_tasks={self.table.member_count[self.id]}, status={self.status})")
         else:
-            return (f"Task(id={str(self.id)[-6:]}, value={self.current_value:.2f}, "
-                    f"target={str(self.enemy_target_id)[-6:]}, status={self.status})")
\ No newline at end of file
+            return (f"Task(id={self.id}, value={self.current_value:.2f}, "
+                    f"target={self.enemy_target_id}, status={self.status})")
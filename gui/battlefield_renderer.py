@@ -0,0 +1,60 @@
+# Aegis Swarm 3.2 - Live Battlefield Renderer (Pygame Adapter)
+# The simulation engine (core/, intelligence/) is pure compute and never imports
+# pygame. This adapter owns all drawing for the live view and reads the engine's
+# state without modifying it.
+
+import pygame
+
+class BattlefieldRenderer:
+    def __init__(self, battlefield, situational_picture=None):
+        self.battlefield = battlefield
+        # Defaults to the battlefield's Blue common operating picture.
+        self.situational_picture = situational_picture if situational_picture is not None else getattr(battlefield, 'blue_picture', None)
+        self.global_config = battlefield.global_config
+        pygame.font.init()
+        self.font = pygame.font.SysFont('Arial', 24)
+
+    def draw(self, screen):
+        bf = self.battlefield
+        task_color_open = (255, 255, 100); task_color_assigned = (100, 100, 100)
+        for task in bf.blue_marketplace.tasks.values():
+            if task.status == 'COMPLETED': continue
+            color = task_color_open if task.status == 'OPEN' else task_color_assigned
+            pos_int = task.position.astype(int)
+            if task.is_bundle: pygame.draw.circle(screen, color, pos_int, 8, 2)
+            else: pygame.draw.rect(screen, color, (pos_int[0]-3, pos_int[1]-3, 6, 6))
+
+        if self.situational_picture is not None:
+            self.draw_known_contacts(screen, self.situational_picture)
+
+        for agent in bf.agents:
+            self.draw_agent(screen, agent)
+
+        blue_count, red_count = bf.team_alive_counts()
+        blue_text = self.font.render(f"Blue Team: {blue_count}", True, self.global_config['INFO_FONT_COLOR'])
+        red_text = self.font.render(f"Red Team: {red_count}", True, self.global_config['INFO_FONT_COLOR'])
+        screen.blit(blue_text, (10, 10))
+        screen.blit(red_text, (bf.screen_dims[0] - red_text.get_width() - 10, 10))
+
+    def draw_agent(self, screen, agent):
+        config = self.global_config
+        draw_pos = (int(agent.pos[0]), int(agent.pos[1]))
+        if agent.time_of_death is None:
+            pygame.draw.circle(screen, agent.color, draw_pos, agent.drone_radius)
+            bar_width = agent.drone_radius * 2.5; bar_height = 4
+            bar_x = agent.pos[0] - bar_width / 2
+            bar_y = agent.pos[1] - agent.drone_radius - bar_height - 5
+            health_percentage = agent.health / agent.max_health
+            pygame.draw.rect(screen, config['HEALTH_BAR_RED'], (bar_x, bar_y, bar_width, bar_height))
+            if health_percentage > 0:
+                pygame.draw.rect(screen, config['HEALTH_BAR_GREEN'], (bar_x, bar_y, bar_width * health_percentage, bar_height))
+        else:
+            p1,p2,p3,p4 = (draw_pos[0]-5, draw_pos[1]-5), (draw_pos[0]+5, draw_pos[1]+5), (draw_pos[0]-5, draw_pos[1]+5), (draw_pos[0]+5, draw_pos[1]-5)
+            pygame.draw.line(screen, (80,80,80), p1, p2, 1)
+            pygame.draw.line(screen, (80,80,80), p3, p4, 1)
+
+    def draw_known_contacts(self, screen, situational_picture):
+        """Visualizes the known enemy contacts."""
+        _, positions, _ = situational_picture.get_known_enemies()
+        for pos in positions.astype(int).tolist():
+            pygame.draw.circle(screen, (255, 255, 0, 100), pos, 15, 1)
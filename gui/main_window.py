@@ -8,11 +8,12 @@
 import sys, os, copy, subprocess
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QFrame, 
                              QComboBox, QSplitter, QMessageBox, QSlider, QFormLayout, QTextEdit, 
-                             QApplication, QFileDialog, QListWidget, QListWidgetItem)
+                             QApplication, QFileDialog, QListWidget, QListWidgetItem, QCheckBox)
 from PyQt5.QtCore import Qt, QObject, QThread, pyqtSignal
 from PyQt5.QtGui import QFont
 
 import config as config_module
+from analysis.replay_io import list_replays
 
 class ExperimentWorker(QObject):
     """Worker thread for running the simulation experiment suite."""
@@ -115,6 +116,10 @@ class MainWindow(QMainWindow):
         red_form.addRow("Strategy:", self.red_strategy_combo)
         self.control_layout.addLayout(red_form)
         self.control_layout.addStretch(1)
+        sample_every = config_module.GLOBAL_SIMULATION_SETTINGS.get('REPLAY_SAMPLE_EVERY', 20)
+        self.summary_only_checkbox = QCheckBox(f"Summary only (replays for 1 in {sample_every} runs)" if sample_every > 0 else "Summary only (no replays)")
+        self.summary_only_checkbox.setChecked(config_module.GLOBAL_SIMULATION_SETTINGS.get('SUMMARY_ONLY', False))
+        self.control_layout.addWidget(self.summary_only_checkbox)
         self.run_exp_button = QPushButton("Run Experiment Suite"); self.run_exp_button.clicked.connect(self.run_experiments)
         self.control_layout.addWidget(self.run_exp_button)
 
@@ -145,8 +150,8 @@ class MainWindow(QMainWindow):
         self.replay_list.clear()
         replays_dir = "replays"
         if os.path.exists(replays_dir):
-            files = sorted([f for f in os.listdir(replays_dir) if f.endswith(".json")], key=lambda f: os.path.getmtime(os.path.join(replays_dir, f)), reverse=True)
-            self.replay_list.addItems(files)
+            files = sorted(list_replays(replays_dir), key=os.path.getmtime, reverse=True)
+            self.replay_list.addItems([os.path.basename(f) for f in files])
         else:
             self.replay_list.addItem("No 'replays' directory found.")
 
@@ -222,6 +227,7 @@ class MainWindow(QMainWindow):
         else:
             default_key = new_config['TEAM_RED_CONFIG']['default_strategy']
             new_config['TEAM_RED_CONFIG']['active_strategy_profile'] = red_profiles[default_key]
+        new_config['GLOBAL_SIMULATION_SETTINGS']['SUMMARY_ONLY'] = self.summary_only_checkbox.isChecked()
         return new_config
 
     def run_experiments(self):
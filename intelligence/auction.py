@@ -0,0 +1,162 @@
+# Aegis Swarm 3.2 - Vectorized Auction Engine
+# Builds the full agents x tasks bid matrix with array operations and runs the
+# marketplace's greedy, value-ordered assignment on it. Bids are
+# travel_cost * (1 + risk * RISK_AVERSION_FACTOR), defined once in bid_prices;
+# risk depends only on the task, so it is evaluated once per task instead of
+# once per (agent, task) pair.
+# MARKET_CONFIG['AUCTION_MODE'] selects the greedy allocation or one of the
+# global solvers further down.
+
+import numpy as np
+from numba import njit
+
+def _pairwise_norms(a, b):
+    # |a_i - b_j| for every pair. The batched matmul reduces in the same order
+    # as np.linalg.norm on a single vector, so bids match the scalar path bit for bit.
+    diff = a[:, None, :] - b[None, :, :]
+    return np.sqrt((diff[..., None, :] @ diff[..., :, None])[..., 0, 0])
+
+def travel_cost_matrix(agent_pos, base_pos, task_pos):
+    """Round-trip cost agent -> task -> agent's base, shape (agents, tasks)."""
+    agent_pos = np.asarray(agent_pos, dtype=np.float64).reshape(-1, 2)
+    base_pos = np.asarray(base_pos, dtype=np.float64).reshape(-1, 2)
+    task_pos = np.asarray(task_pos, dtype=np.float64).reshape(-1, 2)
+    return _pairwise_norms(agent_pos, task_pos) + _pairwise_norms(base_pos, task_pos)
+
+def bid_prices(travel_cost, risk, risk_factor):
+    """The bids for a travel cost column or matrix, given the per-task risk (broadcast over agents)."""
+    return travel_cost * (1 + risk * risk_factor)
+
+def greedy_assignment(travel_cost, task_values, risk_of_task, risk_factor, on_award):
+    """
+    Tasks are auctioned in descending value order (ties keep their original
+    order); each goes to the cheapest still-available agent (ties go to the
+    lowest column). `risk_of_task(t)` is called when task t comes up, so it
+    sees the awards made earlier in the same round. `on_award(t, a, bid)` is
+    called for every award.
+    """
+    num_agents, num_tasks = travel_cost.shape
+    available = np.ones(num_agents, dtype=np.bool_)
+    remaining = num_agents
+    for t in np.argsort(-np.asarray(task_values, dtype=np.float64), kind='stable'):
+        if remaining == 0: break
+        bids = bid_prices(travel_cost[:, t], risk_of_task(t), risk_factor)
+        a = int(np.argmin(np.where(available, bids, np.inf)))
+        on_award(int(t), a, float(bids[a]))
+        available[a] = False; remaining -= 1
+
+# --- Global Assignment Solvers ---
+# These modes see the whole bid matrix at once, with per-task risk taken as a
+# snapshot at the start of the round. They minimize the total of bid/value,
+# so valuable targets remain preferred.
+
+AUCTION_MODES = ('greedy', 'hungarian', 'epsilon')
+
+def hungarian_assignment(cost):
+    """Optimal 1:1 assignment of rows (agents) to columns (tasks); returns (agent, task) pairs."""
+    try:
+        from scipy.optimize import linear_sum_assignment
+    except ImportError as e:
+        raise ImportError("AUCTION_MODE 'hungarian' requires scipy (pip install scipy)") from e
+    rows, cols = linear_sum_assignment(cost)
+    return [(int(a), int(t)) for a, t in zip(rows, cols)]
+
+@njit(cache=True)
+def epsilon_auction_numba(benefit, prices, epsilon):
+    # Bertsekas forward auction (Gauss-Seidel). Persons are rows and objects
+    # are columns, with rows <= columns. `prices` is updated in place. Returns
+    # the object of every person.
+    num_persons, num_objects = benefit.shape
+    person_object = np.full(num_persons, -1, dtype=np.int64)
+    object_owner = np.full(num_objects, -1, dtype=np.int64)
+    unassigned = np.arange(num_persons)[::-1].copy()
+    top = num_persons
+    while top > 0:
+        top -= 1
+        i = unassigned[top]
+        best_j = -1; best = -np.inf; second = -np.inf
+        for j in range(num_objects):
+            v = benefit[i, j] - prices[j]
+            if v > best:
+                second = best; best = v; best_j = j
+            elif v > second:
+                second = v
+        increment = epsilon if second == -np.inf else best - second + epsilon
+        prices[best_j] += increment
+        previous = object_owner[best_j]
+        if previous >= 0:
+            person_object[previous] = -1
+            unassigned[top] = previous; top += 1
+        object_owner[best_j] = i
+        person_object[i] = best_j
+    return person_object
+
+@njit(cache=True)
+def epsilon_reverse_numba(benefit, prices, person_object, epsilon):
+    # Reverse auction for the objects a warm-started forward pass left
+    # unassigned above the cheapest assigned price (Bertsekas' asymmetric
+    # auction). Each such object either drops its price to that floor or
+    # outbids for a person, freeing that person's old object. Afterwards no
+    # unassigned object costs more than an assigned one, so epsilon-CS bounds
+    # the total again. `prices` and `person_object` are updated in place.
+    num_persons, num_objects = benefit.shape
+    object_owner = np.full(num_objects, -1, dtype=np.int64)
+    profit = np.empty(num_persons)
+    for i in range(num_persons):
+        object_owner[person_object[i]] = i
+        profit[i] = benefit[i, person_object[i]] - prices[person_object[i]]
+    floor = np.inf
+    for j in range(num_objects):
+        if object_owner[j] >= 0 and prices[j] < floor: floor = prices[j]
+    pending = np.empty(num_objects, dtype=np.int64)
+    top = 0
+    for j in range(num_objects):
+        if object_owner[j] < 0 and prices[j] > floor:
+            pending[top] = j; top += 1
+    while top > 0:
+        top -= 1
+        j = pending[top]
+        best_i = -1; best = -np.inf; second = -np.inf
+        for i in range(num_persons):
+            v = benefit[i, j] - profit[i]
+            if v > best:
+                second = best; best = v; best_i = i
+            elif v > second:
+                second = v
+        if best - epsilon <= floor:
+            prices[j] = floor
+            continue
+        prices[j] = max(floor, second - epsilon)
+        previous = person_object[best_i]
+        object_owner[previous] = -1
+        if prices[previous] > floor:
+            pending[top] = previous; top += 1
+        object_owner[j] = best_i
+        person_object[best_i] = j
+        profit[best_i] = benefit[best_i, j] - prices[j]
+
+class EpsilonAuction:
+    """
+    Incremental epsilon-auction. Object prices are kept between rounds (keyed
+    by ('task', id) or ('agent', id)) and used to warm-start the next round, so a market
+    that barely changed settles in a few bids. A reverse pass then re-prices
+    objects left over with stale high prices, so the result is within
+    epsilon * n of the optimal total cost.
+    """
+    def __init__(self, epsilon=1.0):
+        self.epsilon = float(epsilon)
+        self.prices = {}
+
+    def solve(self, cost, agent_keys, task_keys):
+        benefit = -np.asarray(cost, dtype=np.float64)
+        transpose = len(agent_keys) > len(task_keys)
+        if transpose: benefit = np.ascontiguousarray(benefit.T)
+        object_keys = [('agent', key) for key in agent_keys] if transpose else [('task', key) for key in task_keys]
+        prices = np.array([self.prices.get(key, 0.0) for key in object_keys], dtype=np.float64)
+        if len(prices): prices -= prices.min()
+        person_object = epsilon_auction_numba(benefit, prices, self.epsilon)
+        if len(person_object) < len(prices): epsilon_reverse_numba(benefit, prices, person_object, self.epsilon)
+        self.prices = dict(zip(object_keys, prices.tolist()))
+        if transpose:
+            return [(int(a), t) for t, a in enumerate(person_object)]
+        return [(a, int(t)) for a, t in enumerate(person_object)]
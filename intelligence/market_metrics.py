@@ -0,0 +1,57 @@
+# Aegis Swarm 3.2 - Marketplace Instrumentation
+# Per-call wall time and work counters for the Blue marketplace, enabled with
+# MARKET_CONFIG['COLLECT_METRICS']. When disabled every hook returns at once,
+# so the instrumented code pays one attribute check per call.
+
+import time
+
+class MarketMetrics:
+    SECTIONS = ('update_market_state', 'ingest_detections', 'bundling', 'run_auction')
+    COUNTERS = ('tasks_scanned', 'bids_computed', 'bundles_formed', 'bundles_dissolved',
+                'assignments', 'idle_strikers', 'auction_rounds', 'detections_ingested', 'tasks_created')
+
+    def __init__(self, enabled=False):
+        self.enabled = bool(enabled)
+        self.sections = {name: {"calls": 0, "total_seconds": 0.0, "max_seconds": 0.0} for name in self.SECTIONS}
+        self.counters = dict.fromkeys(self.COUNTERS, 0)
+
+    def start(self):
+        """Returns a start stamp for `stop`, or None when disabled."""
+        return time.perf_counter() if self.enabled else None
+
+    def stop(self, section, start):
+        if start is None: return
+        elapsed = time.perf_counter() - start
+        stats = self.sections[section]
+        stats["calls"] += 1; stats["total_seconds"] += elapsed
+        if elapsed > stats["max_seconds"]: stats["max_seconds"] = elapsed
+
+    def count(self, counter, amount=1):
+        if self.enabled: self.counters[counter] += amount
+
+    def summary(self):
+        """A JSON-ready snapshot, or None when disabled."""
+        if not self.enabled: return None
+        return {"runs": 1, "sections": {name: dict(stats) for name, stats in self.sections.items()},
+                "counters": dict(self.counters)}
+
+    @staticmethod
+    def aggregate(summaries):
+        """
+        Combines summaries from several runs: calls, times and counters are
+        summed and max times take the maximum. Returns None if no run collected metrics.
+        """
+        summaries = [s for s in summaries if s]
+        if not summaries: return None
+        total = {"runs": 0, "sections": {}, "counters": {}}
+        for summary in summaries:
+            total["runs"] += summary["runs"]
+            for name, stats in summary["sections"].items():
+                merged = total["sections"].setdefault(name, {"calls": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+                merged["calls"] += stats["calls"]; merged["total_seconds"] += stats["total_seconds"]
+                merged["max_seconds"] = max(merged["max_seconds"], stats["max_seconds"])
+            for name, value in summary["counters"].items():
+                total["counters"][name] = total["counters"].get(name, 0) + value
+        for stats in total["sections"].values():
+            stats["mean_seconds"] = stats["total_seconds"] / stats["calls"] if stats["calls"] else 0.0
+        return total
@@ -2,136 +2,316 @@
 # PATCH: Fixed a critical KeyError when updating a bundle task after its
 # primary sub-task was completed. The update logic is now robust.
 
-import numpy as np
 import time
-from core.task import Task
+import numpy as np
+from core.clock import WallClock
+from core.spatial_index import IncrementalGrid
+from core.task import STATUS_COMPLETED, STATUS_OPEN, TaskTable
+from intelligence.market_metrics import MarketMetrics
+from intelligence.risk_field import RISK_MODELS, RiskRaster
+from intelligence.auction import AUCTION_MODES, EpsilonAuction, bid_prices, greedy_assignment, hungarian_assignment, travel_cost_matrix
 
 class Marketplace:
-    def __init__(self, config):
+    def __init__(self, config, clock=None):
+        self.clock = clock if clock is not None else WallClock()
         self.market_config = config['MARKET_CONFIG']
         self.team_blue_config = config['TEAM_BLUE_CONFIG']
+        # Columnar task store; `tasks` maps the ids of live (not yet removed) tasks
+        # to their Task facades, in creation order. Removed tasks' rows are retired
+        # and reclaimed at the next value update, after every holder has seen them
+        # completed, so ids are reused and only the table's `serial` is unique.
+        self.table = TaskTable()
         self.tasks = {}
-        self.enemy_id_to_task_id = {}
-        self.last_value_update_time = time.time()
+        # Enemy agent id -> id of the single task tracking it (-1 if none).
+        self.task_of_enemy = np.full(64, -1, dtype=np.int64)
+        self.screen_width = config['GLOBAL_SIMULATION_SETTINGS']['SCREEN_WIDTH']
+        self.screen_height = config['GLOBAL_SIMULATION_SETTINGS']['SCREEN_HEIGHT']
+        # Spatial index over task positions; OPEN status is checked at query time.
+        self.task_index = IncrementalGrid(max(self.market_config['TASK_BUNDLING_MAX_DIST'], self.market_config['RISK_ASSESSMENT_RADIUS']))
+        self.last_value_update_time = self.clock.now()
+        self.auction_mode = self.market_config.get('AUCTION_MODE', 'greedy')
+        if self.auction_mode not in AUCTION_MODES:
+            raise ValueError(f"Unknown AUCTION_MODE '{self.auction_mode}', expected one of {AUCTION_MODES}")
+        self.epsilon_auction = EpsilonAuction(self.market_config.get('AUCTION_EPSILON', 1.0))
+        # Bid risk: exact neighbour counts, or lookups in a raster of OPEN tasks rebuilt with the values.
+        self.risk_model = self.market_config.get('RISK_MODEL', 'exact')
+        if self.risk_model not in RISK_MODELS:
+            raise ValueError(f"Unknown RISK_MODEL '{self.risk_model}', expected one of {RISK_MODELS}")
+        self.risk_raster = RiskRaster(self.screen_width, self.screen_height, self.market_config.get('RISK_RASTER_CELL_SIZE', 25.0))
+        self._raster_serial = np.zeros(0, dtype=np.int64)  # task id -> serial of the task counted in the current raster (-1 if none)
+        # Wall-clock time spent in the allocation step, for comparing auction modes.
+        self.auction_stats = {"mode": self.auction_mode, "rounds": 0, "skipped_rounds": 0, "assignments": 0, "total_solve_seconds": 0.0, "max_solve_seconds": 0.0}
+        # Dirty-set bookkeeping for incremental auctioning.
+        self._dirty_task_ids = set()
+        self._idle_agent_positions = {}  # idle agent id -> position at its last auction round
+        self._last_auction_time = -float('inf')
+        self._last_full_auction_time = -float('inf')
+        # Per-call timings and work counters (bundling time is also included in its caller's).
+        self.metrics = MarketMetrics(self.market_config.get('COLLECT_METRICS', False))
 
     def get_open_tasks_for_auction(self):
-        open_tasks = []
-        for task in self.tasks.values():
-            if task.status == 'OPEN' and not task.is_part_of_bundle:
-                open_tasks.append(task)
-        return open_tasks
+        table = self.table
+        live_rows = np.fromiter(self.tasks, dtype=np.int64, count=len(self.tasks))
+        open_rows = live_rows[(table.status[live_rows] == STATUS_OPEN) & (table.bundle_parent[live_rows] < 0)]
+        return [table.task(row) for row in open_rows.tolist()]
 
     def process_new_intelligence(self, detected_enemy, reporting_agent):
-        enemy_id = detected_enemy.id
-        if enemy_id in self.enemy_id_to_task_id:
-            task_id = self.enemy_id_to_task_id[enemy_id]
-            existing_task = self.tasks.get(task_id)
-            if existing_task and reporting_agent.id not in existing_task.reporters:
-                existing_task.add_reporter(reporting_agent.id)
-        else:
-            screen_width = 1600
-            base_value = 1.0 + (detected_enemy.pos[0] / screen_width) * 2.0
-            new_task = Task(position=detected_enemy.pos.copy(),
-                            enemy_target_id=enemy_id,
-                            reporting_agent_id=reporting_agent.id,
-                            initial_value=base_value)
-            self.tasks[new_task.id] = new_task
-            self.enemy_id_to_task_id[enemy_id] = new_task.id
-            self._attempt_to_bundle(new_task)
-
-    def _attempt_to_bundle(self, new_task):
-        if new_task.is_part_of_bundle: return
+        """Single-contact form of ingest_detections."""
+        self.ingest_detections([reporting_agent.id], [detected_enemy.id], [detected_enemy.pos])
+
+    def ingest_detections(self, reporter_ids, enemy_ids, enemy_positions):
+        """
+        Ingests one tick's sparse detection table: reporter_ids[k] saw
+        enemy_ids[k], currently at enemy_positions[k]. Opens a task for every
+        enemy not yet tracked (in first-report order), records all reporters
+        in bulk, then runs one bundling pass over the new tasks.
+        """
+        reporter_ids = np.asarray(reporter_ids, dtype=np.int64)
+        enemy_ids = np.asarray(enemy_ids, dtype=np.int64)
+        if not len(enemy_ids): return
+        metrics_start = self.metrics.start()
+        enemy_positions = np.asarray(enemy_positions, dtype=np.float64).reshape(-1, 2)
+        if enemy_ids.max() >= len(self.task_of_enemy):
+            grown = np.full(max(2 * len(self.task_of_enemy), int(enemy_ids.max()) + 1), -1, dtype=np.int64)
+            grown[:len(self.task_of_enemy)] = self.task_of_enemy
+            self.task_of_enemy = grown
+
+        unique_enemies, first_seen = np.unique(enemy_ids, return_index=True)
+        first_seen = np.sort(first_seen[self.task_of_enemy[unique_enemies] < 0])
+        new_ids = np.empty(0, dtype=np.int64)
+        if len(first_seen):
+            positions = enemy_positions[first_seen]
+            base_values = 1.0 + (positions[:, 0] / self.screen_width) * 2.0
+            new_ids = self.table.add_many(positions, enemy_ids[first_seen], base_values, creation_time=self.clock.now())
+            self.task_of_enemy[enemy_ids[first_seen]] = new_ids
+            for task_id in new_ids.tolist(): self._add_task(task_id)
+
+        self.table.add_reporters(self.task_of_enemy[enemy_ids], reporter_ids)
+        for task_id in new_ids.tolist(): self._attempt_to_bundle(task_id, partner_limit=task_id)
+        self.metrics.count('detections_ingested', len(enemy_ids)); self.metrics.count('tasks_created', len(new_ids))
+        self.metrics.stop('ingest_detections', metrics_start)
+
+    def _add_task(self, task_id):
+        self.tasks[task_id] = self.table.task(task_id)
+        self.task_index.insert(task_id, self.table.position[task_id])
+        self._dirty_task_ids.add(task_id)
+
+    def count_open_tasks_near(self, task, radius):
+        """Number of other OPEN tasks strictly within `radius` of `task` (an estimate with the raster risk model)."""
+        if self.risk_model == 'raster': return float(self.raster_risk([task.id], radius)[0])
+        table, radius_sq = self.table, radius ** 2
+        position = table.position[task.id]
+        count = 0
+        for other_id in self.task_index.candidates(position, radius):
+            if other_id == task.id or table.status[other_id] != STATUS_OPEN: continue
+            if np.sum((position - table.position[other_id])**2) < radius_sq:
+                count += 1
+        return count
+
+    def rebuild_risk_raster(self):
+        """Re-rasterizes the live OPEN tasks."""
+        rows = np.fromiter(self.tasks, dtype=np.int64, count=len(self.tasks))
+        rows = rows[self.table.status[rows] == STATUS_OPEN]
+        self.risk_raster.rebuild(self.table.position[rows])
+        self._raster_serial = np.full(self.table.count, -1, dtype=np.int64)
+        self._raster_serial[rows] = self.table.serial[rows]
+
+    def raster_risk(self, task_ids, radius):
+        """
+        Raster estimate of count_open_tasks_near for several tasks at once. It
+        reflects the market as of the last value update.
+        """
+        task_ids = np.asarray(task_ids, dtype=np.int64)
+        counts = self.risk_raster.count_within(self.table.position[task_ids], radius)
+        # A task does not count towards its own risk.
+        counted = np.zeros(len(task_ids), dtype=np.bool_)
+        known = task_ids < len(self._raster_serial)
+        counted[known] = self._raster_serial[task_ids[known]] == self.table.serial[task_ids[known]]
+        return np.maximum(counts - counted, 0.0)
+
+    def _attempt_to_bundle(self, new_id, partner_limit=None):
+        # With partner_limit, only tasks created before it are candidates, so a batch of new
+        # tasks bundles exactly as if they had been reported one after another.
+        table = self.table
+        if table.bundle_parent[new_id] >= 0: return
+        metrics_start = self.metrics.start()
         max_dist_sq = self.market_config['TASK_BUNDLING_MAX_DIST'] ** 2
         max_time_diff = self.market_config['TASK_BUNDLING_MAX_TIME_DIFF']
+        position, creation_time = table.position[new_id], table.creation_time[new_id]
         potential_partners = []
-        for task in self.tasks.values():
-            if (task.id == new_task.id or task.is_bundle or 
-                task.status != 'OPEN' or task.is_part_of_bundle):
+        candidates = self.task_index.candidates(position, self.market_config['TASK_BUNDLING_MAX_DIST'])
+        self.metrics.count('tasks_scanned', len(candidates))
+        for task_id in candidates:
+            if (task_id == new_id or table.is_bundle[task_id] or
+                (partner_limit is not None and table.serial[task_id] >= table.serial[partner_limit]) or
+                table.status[task_id] != STATUS_OPEN or table.bundle_parent[task_id] >= 0):
                 continue
-            dist_sq = np.sum((new_task.position - task.position)**2)
-            time_diff = abs(new_task.creation_time - task.creation_time)
+            dist_sq = np.sum((position - table.position[task_id])**2)
+            time_diff = abs(creation_time - table.creation_time[task_id])
             if dist_sq < max_dist_sq and time_diff < max_time_diff:
-                potential_partners.append(task)
+                potential_partners.append(task_id)
         if potential_partners:
-            tasks_to_bundle = [new_task] + potential_partners
-            bundle = Task.create_bundle(tasks_to_bundle)
-            self.tasks[bundle.id] = bundle
+            bundle_id = table.create_bundle([new_id] + potential_partners, creation_time=self.clock.now())
+            self._add_task(bundle_id)
+            self.metrics.count('bundles_formed')
+        self.metrics.stop('bundling', metrics_start)
 
     def update_market_state(self, all_agents, battlefield_context):
-        current_time = time.time()
+        current_time = self.clock.now()
         if current_time - self.last_value_update_time < self.market_config['VALUE_UPDATE_INTERVAL']:
             return
+        metrics_start = self.metrics.start()
+        self.metrics.count('tasks_scanned', len(self.tasks))
+        self.table.reclaim_retired()
 
         red_team_id = 2
         enemy_map = {agent.id: agent for agent in all_agents if agent.team_id == red_team_id}
         
+        table = self.table
         tasks_to_remove = []
-        for task_id, task in list(self.tasks.items()):
-            
-            # --- [FINAL FIX] This entire block is rewritten for robustness ---
-            is_valid = True
-            if task.is_bundle:
-                # For bundles, update children and check their collective status
-                living_sub_task_positions = []
-                for sub_task in task.sub_tasks:
-                    if sub_task.status != 'COMPLETED':
-                        if sub_task.enemy_target_id in enemy_map:
-                            # Update sub-task position and add to centroid calculation
-                            sub_task.update_position(enemy_map[sub_task.enemy_target_id].pos.copy())
-                            living_sub_task_positions.append(sub_task.position)
-                        else:
-                            # If enemy is gone, complete the sub-task
-                            sub_task.complete()
-
-                if not living_sub_task_positions: # No living targets left
-                    task.complete()
-                else:
-                    # Update bundle's main position to the new centroid
-                    task.update_position(np.mean(living_sub_task_positions, axis=0))
-
-            else: # For single tasks
-                if task.enemy_target_id not in enemy_map:
-                    task.complete()
-                else:
-                    task.update_position(enemy_map[task.enemy_target_id].pos.copy())
-
-            # Now, check the final status
-            if task.status == 'COMPLETED':
+        changed_bundles = set()
+        # Single tasks (including bundle members) follow their enemy, or complete once it is gone.
+        for task_id in list(self.tasks):
+            if table.is_bundle[task_id]: continue
+            enemy = enemy_map.get(int(table.enemy_target_id[task_id]))
+            parent = int(table.bundle_parent[task_id])
+            if enemy is None or table.status[task_id] == STATUS_COMPLETED:
+                table.complete(task_id)
                 tasks_to_remove.append(task_id)
-                if not task.is_bundle and task.enemy_target_id in self.enemy_id_to_task_id:
-                     del self.enemy_id_to_task_id[task.enemy_target_id]
-                continue
+                self.task_of_enemy[table.enemy_target_id[task_id]] = -1
+                if parent >= 0: changed_bundles.add(parent)
+            else:
+                table.move_member(task_id, enemy.pos)
+                self.task_index.move(task_id, table.position[task_id])
 
-            # Dynamic value calculation (no changes here)
-            time_since_update = current_time - task.last_update_time
-            decay_multiplier = (1 - self.market_config['BASE_VALUE_DECAY_RATE']) ** (time_since_update / self.market_config['VALUE_UPDATE_INTERVAL'])
-            reliability_bonus = 1.0 + (len(task.reporters) - 1) * self.market_config['RELIABILITY_BONUS']
-            threat_bonus = 1.0 + (battlefield_context['screen_width'] - task.position[0]) / battlefield_context['screen_width'] * self.market_config['THREAT_VALUE_FACTOR']
-            task.current_value = task.base_value * decay_multiplier * reliability_bonus * threat_bonus
-            task.last_update_time = current_time
-
-        for task_id in tasks_to_remove:
-            if task_id in self.tasks:
-                del self.tasks[task_id]
+        # Bundles drop completed members, dissolve when too few remain, and move to their centroid.
+        min_members = self.market_config['BUNDLE_MIN_MEMBERS']
+        freed_members = []
+        for task_id in list(self.tasks):
+            if not table.is_bundle[task_id]: continue
+            remaining = table.compact_members(task_id) if task_id in changed_bundles else int(table.member_count[task_id])
+            if remaining == 0 or table.status[task_id] == STATUS_COMPLETED:
+                table.complete(task_id)
+                tasks_to_remove.append(task_id)
+            elif remaining < min_members and table.status[task_id] == STATUS_OPEN:
+                freed_members.extend(table.dissolve_bundle(task_id).tolist())
+                tasks_to_remove.append(task_id)
+                self.metrics.count('bundles_dissolved')
+            else:
+                table.move_member(task_id, table.centroid(task_id))
+                self.task_index.move(task_id, table.position[task_id])
+
+        removed = [task_id for task_id in dict.fromkeys(tasks_to_remove) if task_id in self.tasks]
+        for task_id in removed:
+            del self.tasks[task_id]
+            self.task_index.remove(task_id)
+        table.retire(removed)
+        for task_id in freed_members:
+            self._dirty_task_ids.add(task_id)
+            self._attempt_to_bundle(task_id)
+
+        # Dynamic value calculation, in one pass over every live task.
+        table = self.table
+        rows = np.fromiter(self.tasks, dtype=np.int64, count=len(self.tasks))
+        decay_multiplier = (1 - self.market_config['BASE_VALUE_DECAY_RATE']) ** ((current_time - table.last_update_time[rows]) / self.market_config['VALUE_UPDATE_INTERVAL'])
+        reliability_bonus = 1.0 + (table.reporter_count[rows] - 1) * self.market_config['RELIABILITY_BONUS']
+        threat_bonus = 1.0 + (battlefield_context['screen_width'] - table.position[rows, 0]) / battlefield_context['screen_width'] * self.market_config['THREAT_VALUE_FACTOR']
+        table.current_value[rows] = table.base_value[rows] * decay_multiplier * reliability_bonus * threat_bonus
+        table.last_update_time[rows] = current_time
+        self._dirty_task_ids.update(rows[table.status[rows] == STATUS_OPEN].tolist())
         self.last_value_update_time = current_time
+        if self.risk_model == 'raster': self.rebuild_risk_raster()
+        self.metrics.stop('update_market_state', metrics_start)
+
+    def _collect_dirty_agents(self, available_agents):
+        """Idle agents that were not idle at the last round, or moved more than AUCTION_MOVE_THRESHOLD since."""
+        threshold = self.market_config.get('AUCTION_MOVE_THRESHOLD', 0.0)
+        dirty_agents = []
+        for agent in available_agents:
+            last_pos = self._idle_agent_positions.get(agent.id)
+            if last_pos is None or np.linalg.norm(agent.pos - last_pos) > threshold:
+                dirty_agents.append(agent)
+        return dirty_agents
 
     def run_auction(self, agents):
-        open_tasks = self.get_open_tasks_for_auction()
-        if not open_tasks or not agents: return
+        """
+        Runs an auction round, but only over what changed since the last one:
+        new or re-valued tasks are offered to every idle agent, and newly idle
+        or moved agents bid on every open task. When nothing changed the round
+        is skipped. Every AUCTION_FULL_REFRESH_INTERVAL a full round runs regardless.
+        """
+        metrics_start = self.metrics.start()
+        self._run_auction(agents)
+        self.metrics.stop('run_auction', metrics_start)
+
+    def _run_auction(self, agents):
+        current_time = self.clock.now()
         available_agents = [agent for agent in agents if not agent.tour and agent.is_alive and agent.weapon_template]
-        if not available_agents: return
-
-        all_tasks_for_risk_assessment = list(self.tasks.values())
-        for task in sorted(open_tasks, key=lambda t: t.current_value, reverse=True):
-            if not available_agents: break
-            bids = {}
-            for agent in available_agents:
-                bid_value = agent.calculate_bid_for_task(task, all_tasks_for_risk_assessment)
-                if bid_value is not None: bids[agent.id] = bid_value
-            if not bids: continue
-            winner_id = min(bids, key=bids.get)
-            winning_agent = next((agent for agent in available_agents if agent.id == winner_id), None)
-            if winning_agent:
-                task.assign_to(winner_id, bids[winner_id])
-                winning_agent.add_task_to_tour(task)
-                available_agents.remove(winning_agent)
\ No newline at end of file
+        full_round = current_time - self._last_full_auction_time >= self.market_config.get('AUCTION_FULL_REFRESH_INTERVAL', 0.0)
+        dirty_agents = available_agents
+        if not full_round:
+            if current_time - self._last_auction_time < self.market_config.get('AUCTION_MIN_INTERVAL', 0.0): return
+            dirty_agents = self._collect_dirty_agents(available_agents)
+            if not dirty_agents and not self._dirty_task_ids:
+                self.auction_stats["skipped_rounds"] += 1
+                return
+        open_tasks = self.get_open_tasks_for_auction()
+        if not full_round:
+            if not dirty_agents: open_tasks = [task for task in open_tasks if task.id in self._dirty_task_ids]
+            elif not self._dirty_task_ids: available_agents = dirty_agents
+
+        self._last_auction_time = current_time
+        if full_round: self._last_full_auction_time = current_time
+        self._dirty_task_ids.clear()
+        if open_tasks and available_agents: self._allocate(open_tasks, available_agents)
+        # Remember where the agents that are still idle stood for this round.
+        for agent in available_agents:
+            if agent.tour: self._idle_agent_positions.pop(agent.id, None)
+            else: self._idle_agent_positions[agent.id] = agent.pos.copy()
+        idle_ids = {agent.id for agent in agents if not agent.tour and agent.is_alive}
+        for agent_id in [agent_id for agent_id in self._idle_agent_positions if agent_id not in idle_ids]:
+            del self._idle_agent_positions[agent_id]
+
+    def _allocate(self, open_tasks, available_agents):
+        solve_start = time.perf_counter()
+        travel_cost = travel_cost_matrix([agent.pos for agent in available_agents],
+                                         [agent.base_pos for agent in available_agents],
+                                         [task.position for task in open_tasks])
+        risk_radius = self.market_config['RISK_ASSESSMENT_RADIUS']
+        risk_factor = self.market_config['RISK_AVERSION_FACTOR']
+        task_values = np.array([task.current_value for task in open_tasks])
+        awarded = 0
+
+        def award(t, a, bid):
+            nonlocal awarded
+            winning_agent = available_agents[a]
+            open_tasks[t].assign_to(winning_agent.id, bid)
+            winning_agent.add_task_to_tour(open_tasks[t])
+            awarded += 1
+
+        if self.risk_model == 'raster':
+            # Raster risk does not see this round's awards, so it is looked up for every task at once.
+            raster_risk = self.raster_risk([task.id for task in open_tasks], risk_radius)
+            risk_of_task = lambda t: float(raster_risk[t])
+        else:
+            risk_of_task = lambda t: float(self.count_open_tasks_near(open_tasks[t], risk_radius))
+        if self.auction_mode == 'greedy':
+            greedy_assignment(travel_cost, task_values, risk_of_task, risk_factor, award)
+        else:
+            risk = np.array([risk_of_task(t) for t in range(len(open_tasks))], dtype=float)
+            bids = bid_prices(travel_cost, risk, risk_factor)
+            cost = bids / np.maximum(task_values, 1e-9)
+            if self.auction_mode == 'hungarian':
+                pairs = hungarian_assignment(cost)
+            else:
+                pairs = self.epsilon_auction.solve(cost, [agent.id for agent in available_agents], self.table.serial[[task.id for task in open_tasks]].tolist())
+            for a, t in sorted(pairs, key=lambda pair: -task_values[pair[1]]):
+                award(t, a, float(bids[a, t]))
+
+        self.metrics.count('auction_rounds'); self.metrics.count('idle_strikers', len(available_agents))
+        self.metrics.count('bids_computed', travel_cost.size); self.metrics.count('assignments', awarded)
+        solve_seconds = time.perf_counter() - solve_start
+        stats = self.auction_stats
+        stats["rounds"] += 1; stats["assignments"] += awarded
+        stats["total_solve_seconds"] += solve_seconds
+        stats["max_solve_seconds"] = max(stats["max_solve_seconds"], solve_seconds)
\ No newline at end of file
@@ -0,0 +1,57 @@
+# Aegis Swarm 3.2 - Risk Field Raster
+# A coarse density raster of OPEN task positions with a summed-area table, so
+# the number of tasks around any point is a constant-time lookup no matter how
+# many tasks the market holds. Used for bid risk pricing when
+# MARKET_CONFIG['RISK_MODEL'] is 'raster', and for the replay heat map.
+
+import numpy as np
+
+RISK_MODELS = ('exact', 'raster')
+
+class RiskRaster:
+    """
+    Counts points per square cell and keeps the cumulative (summed-area)
+    table. Density is treated as uniform inside a cell, so box sums are exact
+    on cell boundaries and linearly interpolated in between.
+    """
+    def __init__(self, width, height, cell_size=25.0):
+        cell_size = max(float(cell_size), 1.0)
+        self.width, self.height = float(width), float(height)
+        self.nx = max(1, int(np.ceil(self.width / cell_size)))
+        self.ny = max(1, int(np.ceil(self.height / cell_size)))
+        self.cell_size = cell_size
+        self.counts = np.zeros((self.ny, self.nx), dtype=np.float64)
+        self.table = np.zeros((self.ny + 1, self.nx + 1), dtype=np.float64)
+
+    def rebuild(self, positions):
+        """Re-rasterizes the given points (points outside the field land in the edge cells)."""
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        cell_x = np.clip(np.floor(positions[:, 0] / self.cell_size), 0, self.nx - 1).astype(np.int64)
+        cell_y = np.clip(np.floor(positions[:, 1] / self.cell_size), 0, self.ny - 1).astype(np.int64)
+        self.counts = np.bincount(cell_y * self.nx + cell_x, minlength=self.nx * self.ny).reshape(self.ny, self.nx).astype(np.float64)
+        self.table[1:, 1:] = self.counts.cumsum(axis=0).cumsum(axis=1)
+
+    def _cumulative(self, x, y):
+        # Points in [0, x) x [0, y), bilinear between the table's grid corners.
+        gx = np.clip(x / self.cell_size, 0.0, self.nx)
+        gy = np.clip(y / self.cell_size, 0.0, self.ny)
+        ix = np.minimum(np.floor(gx).astype(np.int64), self.nx - 1)
+        iy = np.minimum(np.floor(gy).astype(np.int64), self.ny - 1)
+        fx, fy = gx - ix, gy - iy
+        t = self.table
+        return ((t[iy, ix] * (1 - fx) + t[iy, ix + 1] * fx) * (1 - fy) +
+                (t[iy + 1, ix] * (1 - fx) + t[iy + 1, ix + 1] * fx) * fy)
+
+    def box_sum(self, points, half_size):
+        """Approximate number of points in the square of half-width `half_size` around each point."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        x0, x1 = points[:, 0] - half_size, points[:, 0] + half_size
+        y0, y1 = points[:, 1] - half_size, points[:, 1] + half_size
+        return self._cumulative(x1, y1) - self._cumulative(x0, y1) - self._cumulative(x1, y0) + self._cumulative(x0, y0)
+
+    def count_within(self, points, radius):
+        """
+        Approximate number of points within `radius` of each query point,
+        using the square of equal area to the disc.
+        """
+        return self.box_sum(points, radius * np.sqrt(np.pi) / 2)
@@ -1,46 +1,125 @@
-# Aegis Swarm 2.0 - Situational Awareness Module (Simplified)
-# UPGRADED for Aegis 2.5: HVA and BDA feedback logic has been removed as it is
-# superseded by the marketplace mechanism. This class is kept for basic
-# enemy contact management, potentially for advanced scout strategies in the future.
+# Aegis Swarm 3.2 - Situational Awareness Module (Track Store)
+# The team's common operating picture: one track per known enemy contact, kept
+# in contiguous arrays (position, last-seen sim time) and refreshed in batches
+# from the battlefield's detection table. Stale tracks are evicted through a
+# min-heap of expiry times with one entry per batch of sightings, so a purge
+# only touches the tracks that expire. Radius queries go through a spatial
+# index that is rebuilt at most once per change of the tracks.
 
-import pygame
-import time
+import heapq, itertools
 import numpy as np
+from core.clock import WallClock
+from core.spatial_index import UniformGrid
 
 class SharedSituationalPicture:
     """
-    Represents a team's collective understanding of the battlefield.
-    In Aegis 2.5, its role is simplified to primarily tracking known enemy contacts.
+    Represents a team's collective understanding of the battlefield as a store
+    of enemy contact tracks. A track expires `info_lifespan` seconds after the
+    contact was last seen.
     """
-    def __init__(self, config, screen_dims):
-        self.known_enemy_contacts = {}
+    def __init__(self, config, screen_dims, clock=None, wrap=False, capacity=64):
+        self.clock = clock if clock is not None else WallClock()
         self.config = config.get('situational_picture', {})
+        self.info_lifespan = self.config.get('info_lifespan', 5.0)
         self.screen_width, self.screen_height = screen_dims
-        self.last_purge_time = time.time()
+        self.wrap = wrap
+        self.last_purge_time = self.clock.now()
+        # Track slots; free slots are reused.
+        self.enemy_ids = np.full(capacity, -1, dtype=np.int64)
+        self.positions = np.zeros((capacity, 2), dtype=np.float64)
+        self.last_seen = np.full(capacity, -np.inf, dtype=np.float64)
+        self.active = np.zeros(capacity, dtype=np.bool_)
+        self._free_slots = np.arange(capacity - 1, -1, -1, dtype=np.int64)
+        self._free_count = capacity
+        self._slot_of_id = np.full(capacity, -1, dtype=np.int64)  # enemy id -> slot
+        self._expiry_heap = []  # (expiry time, seq, slots); re-checked against last_seen when popped
+        self._heap_seq = itertools.count()
+        self._grid = None
+
+    def _allocate_slots(self, n):
+        while self._free_count < n:
+            old = len(self.enemy_ids)
+            self.enemy_ids = np.concatenate([self.enemy_ids, np.full(old, -1, dtype=np.int64)])
+            self.positions = np.concatenate([self.positions, np.zeros((old, 2))])
+            self.last_seen = np.concatenate([self.last_seen, np.full(old, -np.inf)])
+            self.active = np.concatenate([self.active, np.zeros(old, dtype=np.bool_)])
+            # The free stack is sized to the capacity; the new slots go under the old free ones.
+            free = np.empty(2 * old, dtype=np.int64)
+            free[:old] = np.arange(2 * old - 1, old - 1, -1)
+            free[old:old + self._free_count] = self._free_slots[:self._free_count]
+            self._free_slots, self._free_count = free, old + self._free_count
+        self._free_count -= n
+        return self._free_slots[self._free_count:self._free_count + n][::-1].copy()
+
+    def _schedule(self, expiry, slots):
+        heapq.heappush(self._expiry_heap, (expiry, next(self._heap_seq), slots))
+
+    def upsert_detections(self, enemy_ids, positions):
+        """Creates or refreshes one track per detected enemy (ids may repeat; the last row wins)."""
+        enemy_ids = np.asarray(enemy_ids, dtype=np.int64)
+        if not len(enemy_ids): return
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        # Keep the last row of every id.
+        unique_ids, last_rows = np.unique(enemy_ids[::-1], return_index=True)
+        rows = len(enemy_ids) - 1 - last_rows
+        if unique_ids[-1] >= len(self._slot_of_id):
+            grown = np.full(max(2 * len(self._slot_of_id), unique_ids[-1] + 1), -1, dtype=np.int64)
+            grown[:len(self._slot_of_id)] = self._slot_of_id
+            self._slot_of_id = grown
+        slots = self._slot_of_id[unique_ids]
+        new = slots < 0
+        if new.any():
+            new_slots = self._allocate_slots(int(new.sum()))
+            slots[new] = new_slots
+            self._slot_of_id[unique_ids[new]] = new_slots
+            self.enemy_ids[new_slots], self.active[new_slots] = unique_ids[new], True
+            self._schedule(self.clock.now() + self.info_lifespan, new_slots)
+        self.positions[slots] = positions[rows]
+        self.last_seen[slots] = self.clock.now()
+        self._grid = None
 
     def update_from_perception(self, friendly_agent, detected_enemy):
         """Updates the shared picture with a new sensor reading."""
-        self.known_enemy_contacts[detected_enemy.id] = {
-            'id': detected_enemy.id,
-            'pos': detected_enemy.pos.copy(),
-            'last_seen': time.time()
-        }
+        self.upsert_detections([detected_enemy.id], [detected_enemy.pos])
 
     def purge_stale_data(self):
-        """Periodically purges old contacts."""
-        current_time = time.time()
-        info_lifespan = self.config.get('info_lifespan', 5.0)
-        self.known_enemy_contacts = {
-            eid: data for eid, data in self.known_enemy_contacts.items()
-            if current_time - data['last_seen'] < info_lifespan
-        }
+        """Evicts every track not seen for `info_lifespan` seconds."""
+        current_time = self.clock.now()
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= current_time:
+            _, _, slots = heapq.heappop(heap)
+            slots = slots[self.active[slots]]
+            expiry = self.last_seen[slots] + self.info_lifespan
+            expired = slots[expiry <= current_time]
+            if len(expired):
+                self._slot_of_id[self.enemy_ids[expired]] = -1
+                self.enemy_ids[expired], self.active[expired] = -1, False
+                self._free_slots[self._free_count:self._free_count + len(expired)] = expired
+                self._free_count += len(expired)
+                self._grid = None
+            # Seen again since this entry was scheduled: reschedule instead of evicting.
+            renewed, renewed_expiry = slots[expiry > current_time], expiry[expiry > current_time]
+            for t in np.unique(renewed_expiry).tolist():
+                self._schedule(t, renewed[renewed_expiry == t])
+        self.last_purge_time = current_time
+
+    def active_slots(self):
+        return np.flatnonzero(self.active)
 
     def get_known_enemies(self):
-        """Returns a list of all currently valid enemy contacts."""
-        return list(self.known_enemy_contacts.values())
-    
-    def draw(self, screen):
-        """Visualizes the known enemy contacts."""
-        # This can be used for debugging or specific visual modes.
-        for contact in self.get_known_enemies():
-            pygame.draw.circle(screen, (255, 255, 0, 100), contact['pos'].astype(int), 15, 1)
\ No newline at end of file
+        """All currently valid enemy contacts, as (ids, positions, last_seen) arrays."""
+        slots = self.active_slots()
+        return self.enemy_ids[slots], self.positions[slots], self.last_seen[slots]
+
+    def contacts_within(self, points, radius):
+        """
+        Known contacts within `radius` of each query point, as a CSR triple
+        (indptr, enemy_ids, positions). The spatial index is rebuilt lazily,
+        only after the tracks have changed.
+        """
+        if self._grid is None or self._grid[0] < radius:
+            slots = self.active_slots()
+            self._grid = (radius, slots, UniformGrid(self.positions[slots], radius, self.screen_width, self.screen_height, wrap=self.wrap))
+        _, slots, grid = self._grid
+        indptr, indices = grid.query_points(points, radius)
+        return indptr, self.enemy_ids[slots[indices]], self.positions[slots[indices]]
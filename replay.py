@@ -3,12 +3,13 @@
 # using OpenCV for non-interactive, background rendering.
 
 import pygame
-import json
 import sys
 import os
 import numpy as np
 import argparse # For command-line arguments
 import cv2      # For video encoding
+from intelligence.risk_field import RiskRaster
+from analysis.replay_io import list_replays, load_replay
 
 def find_font(preferred_fonts, fallback_size=16):
     """Finds an available system font from a preferred list."""
@@ -25,13 +26,11 @@ class Replayer:
 
         self.replay_filepath = replay_filepath
         print(f"Loading replay data from {replay_filepath}...")
-        with open(replay_filepath, 'r') as f:
-            self.log_data = json.load(f)
-
-        self.metadata = self.log_data.get("metadata", {})
-        self.timestamps = self.log_data.get("timestamps", [])
+        # Binary (.npz) or legacy JSON replay, read into columns; frames are rebuilt on demand.
+        self.replay = load_replay(replay_filepath)
+        self.metadata = self.replay.metadata
         
-        if not self.timestamps:
+        if not len(self.replay):
             print("Error: Replay file contains no timestamp data.")
             sys.exit(1)
 
@@ -43,6 +42,7 @@ class Replayer:
             'HEALTH_BAR_GREEN': (0, 255, 0), 'HEALTH_BAR_RED': (255, 0, 0),
             'DRONE_RADIUS': 5, 'TASK_OPEN_COLOR': (255, 255, 100),
             'TASK_ASSIGNED_COLOR': (100, 100, 100), 'BUNDLE_OUTLINE_COLOR': (255, 165, 0),
+            'HEATMAP_COLOR': (255, 60, 0), 'HEATMAP_RADIUS': 150.0, 'HEATMAP_CELL_SIZE': 25.0,
         }
 
         pygame.init()
@@ -54,11 +54,16 @@ class Replayer:
         self.hud_font = find_font(["calibri", "segoeui", "sans"], 16)
         self.big_font = find_font(["bahnschrift", "calibri", "segoeui"], 32)
         
+        # Playback runs over every simulated tick; ticks between recorded frames are interpolated.
+        self.playback_times = self.replay.playback_times()
         self.current_frame_index = 0
         self.is_paused = False
         self.play_speed = 1.0
         self.mouse_pos = (0, 0)
         self.hovered_task = None
+        # Risk heat map of OPEN tasks, the same raster the marketplace can price bids with.
+        self.show_heatmap = False
+        self.risk_raster = RiskRaster(self.config['SCREEN_WIDTH'], self.config['SCREEN_HEIGHT'], self.config['HEATMAP_CELL_SIZE'])
 
     def run(self):
         """Runs the interactive replay viewer."""
@@ -75,13 +80,13 @@ class Replayer:
                     if event.key == pygame.K_RIGHT: self.play_speed = min(8.0, self.play_speed * 2)
                     if event.key == pygame.K_LEFT: self.play_speed = max(0.125, self.play_speed / 2)
                     if event.key == pygame.K_r: self.play_speed = 1.0
+                    if event.key == pygame.K_h: self.show_heatmap = not self.show_heatmap
 
             if not self.is_paused:
-                self.current_frame_index = min(self.current_frame_index + 1, len(self.timestamps) - 1)
+                self.current_frame_index = min(self.current_frame_index + 1, len(self.playback_times) - 1)
 
-            if self.current_frame_index < len(self.timestamps):
-                frame_data = self.timestamps[self.current_frame_index]
-                self.draw_frame(frame_data)
+            if self.current_frame_index < len(self.playback_times):
+                self.draw_frame(self.frame_at(self.current_frame_index))
                 
             self.clock.tick(self.config['FPS'] * self.play_speed)
         pygame.quit()
@@ -96,8 +101,9 @@ class Replayer:
         video_writer = cv2.VideoWriter(output_filename, fourcc, self.config['FPS'], 
                                        (self.config['SCREEN_WIDTH'], self.config['SCREEN_HEIGHT']))
 
-        total_frames = len(self.timestamps)
-        for i, frame_data in enumerate(self.timestamps):
+        total_frames = len(self.playback_times)
+        for i in range(total_frames):
+            frame_data = self.frame_at(i)
             # Draw the frame onto the Pygame surface
             self.draw_frame(frame_data, is_exporting=True)
 
@@ -122,6 +128,11 @@ class Replayer:
         pygame.quit()
         print(f"Video successfully saved to {os.path.abspath(output_filename)}")
 
+    def frame_at(self, index):
+        """The snapshot for playback step `index`, with the events logged since the previous step."""
+        previous_time = self.playback_times[index - 1] if index > 0 else None
+        return self.replay.frame_at(self.playback_times[index], previous_time, max_step=self.config['SCREEN_WIDTH'] / 2)
+
     def draw_frame(self, frame_data, is_exporting=False):
         """Draws a single frame of the simulation."""
         self.screen.fill(self.config['BG_COLOR'])
@@ -131,6 +142,7 @@ class Replayer:
             self.hovered_task = None
 
         all_tasks = frame_data.get("tasks", [])
+        if self.show_heatmap: self.draw_risk_heatmap(all_tasks)
         if all_tasks: max_value = max(t.get('value', 1.0) for t in all_tasks) if any(t.get('value', 0) > 0 for t in all_tasks) else 1.0
         for task_state in sorted(all_tasks, key=lambda t: t.get('is_bundle', False)):
             pos = np.array(task_state["pos"])
@@ -175,9 +187,22 @@ class Replayer:
         if not is_exporting:
             pygame.display.flip()
 
+    def draw_risk_heatmap(self, all_tasks):
+        """Shades every raster cell by the number of OPEN tasks within HEATMAP_RADIUS of it."""
+        raster = self.risk_raster
+        raster.rebuild([t["pos"] for t in all_tasks if t["status"] == 'OPEN'])
+        cell_x, cell_y = np.meshgrid(np.arange(raster.nx), np.arange(raster.ny), indexing='ij')
+        centres = np.stack([cell_x.ravel(), cell_y.ravel()], axis=1) * raster.cell_size + raster.cell_size / 2
+        density = raster.count_within(centres, self.config['HEATMAP_RADIUS']).reshape(raster.nx, raster.ny)
+        if density.max() <= 0: return
+        heat = pygame.Surface((raster.nx, raster.ny), pygame.SRCALPHA)
+        heat.fill(self.config['HEATMAP_COLOR'])
+        pygame.surfarray.pixels_alpha(heat)[:] = (np.clip(density / density.max(), 0, 1) * 140).astype(np.uint8)
+        self.screen.blit(pygame.transform.smoothscale(heat, (self.config['SCREEN_WIDTH'], self.config['SCREEN_HEIGHT'])), (0, 0))
+
     def draw_hud_info(self, frame_data):
         """Draws all the Heads-Up Display information."""
-        main_meta = self.log_data.get("metadata", {})
+        main_meta = self.metadata
         time_text = self.font.render(f"Time: {frame_data['time']:.2f}s", True, self.config['INFO_FONT_COLOR'])
         blue_text = self.font.render(f"Blue: {frame_data['blue_count']}", True, self.config['DEFAULT_BLUE_COLOR'])
         red_text = self.font.render(f"Red:  {frame_data['red_count']}", True, self.config['RED_COLOR'])
@@ -189,14 +214,14 @@ class Replayer:
         self.screen.blit(red_strat_text, (self.config['SCREEN_WIDTH'] - red_strat_text.get_width() - 20, 45))
 
         speed_text = self.hud_font.render(f"Speed: {self.play_speed}x", True, self.config['INFO_FONT_COLOR'])
-        controls_text = self.hud_font.render("[SPACE] Pause | [<- / ->] Speed | [R] Reset Speed", True, self.config['INFO_FONT_COLOR'])
+        controls_text = self.hud_font.render("[SPACE] Pause | [<- / ->] Speed | [R] Reset Speed | [H] Risk Heat Map", True, self.config['INFO_FONT_COLOR'])
         self.screen.blit(speed_text, (self.config['SCREEN_WIDTH']/2 - speed_text.get_width()/2, self.config['SCREEN_HEIGHT'] - 60))
         self.screen.blit(controls_text, (self.config['SCREEN_WIDTH']/2 - controls_text.get_width()/2, self.config['SCREEN_HEIGHT'] - 35))
 
         if not self.hovered_task is None:
             task = self.hovered_task
             task_type = "BUNDLE" if task.get('is_bundle') else "SINGLE"
-            info_lines = [ f"Task Info ({task_type})", f"ID: ...{task.get('id', 'N/A')[-6:]}", f"Value: {task.get('value', 0.0):.2f}", f"Status: {task.get('status', 'N/A')}"]
+            info_lines = [ f"Task Info ({task_type})", f"ID: ...{str(task.get('id', 'N/A'))[-6:]}", f"Value: {task.get('value', 0.0):.2f}", f"Status: {task.get('status', 'N/A')}"]
             if task.get('is_bundle'): info_lines.append(f"Sub-Tasks: {task.get('sub_task_count', 0)}")
             box_height = len(info_lines) * 20 + 20; box_width = 200
             box_rect = pygame.Rect(self.config['SCREEN_WIDTH'] - box_width - 15, self.config['SCREEN_HEIGHT'] - box_height - 15, box_width, box_height)
@@ -206,7 +231,7 @@ class Replayer:
 if __name__ == '__main__':
     # --- [UPGRADED] Command-line argument parsing ---
     parser = argparse.ArgumentParser(description="Aegis Swarm 3.3 - Apollo Replayer")
-    parser.add_argument("replay_file", help="Path to the replay JSON file.")
+    parser.add_argument("replay_file", help="Path to the replay file (.npz or .json).")
     parser.add_argument("-e", "--export-video", action="store_true", help="Export the replay to an MP4 video file instead of playing it interactively.")
     args = parser.parse_args()
 
@@ -215,7 +240,7 @@ if __name__ == '__main__':
         print(f"Error: The specified file does not exist: {args.replay_file}")
         # Try to find the latest replay if the user just provides a directory
         if os.path.isdir(args.replay_file):
-             all_replays = [os.path.join(args.replay_file, f) for f in os.listdir(args.replay_file) if f.endswith('.json')]
+             all_replays = list_replays(args.replay_file)
              if all_replays:
                  latest_replay = max(all_replays, key=os.path.getmtime)
                  print(f"Directory provided. Attempting to use latest replay: {latest_replay}")
@@ -4,7 +4,6 @@
 
 import numpy as np
 from core.task import Task
-import random
 
 def get_closest_enemy(agent, enemies):
     if not enemies: return None
@@ -18,37 +17,36 @@ def strategy_dispatcher(agent, battlefield_intel):
     strategy_function = globals().get(strategy_name, striker_market_participant_strategy)
     strategy_function(agent, battlefield_intel)
 
-def _publish_intelligence(enemies, agent, battlefield_intel):
-    marketplace = battlefield_intel.get('marketplace')
-    if marketplace is None or not enemies:
-        return
-    for enemy in enemies:
-        marketplace.process_new_intelligence(detected_enemy=enemy, reporting_agent=agent)
-
 # --- SCOUT STRATEGY ---
 def scout_evade_and_publish_strategy(agent, battlefield_intel):
-    local_enemies = battlefield_intel['neighbors']['enemies']
-    _publish_intelligence(local_enemies, agent, battlefield_intel)
+    # Contacts reach the market through the battlefield's batched detection ingest.
+    # Threats come from the team's common picture, so a scout also evades contacts
+    # that only its teammates have seen.
+    picture = battlefield_intel['situational_picture']
+    _, _, threat_positions = picture.contacts_within([agent.pos], agent.perception_radius * 0.6)
 
-    if local_enemies:
-        closest_enemy = get_closest_enemy(agent, local_enemies)
-        if np.linalg.norm(agent.pos - closest_enemy.pos) < agent.perception_radius * 0.6: 
-            flee_vector = agent.pos - closest_enemy.pos
-            norm = np.linalg.norm(flee_vector)
-            if norm > 0:
-                agent.target_pos = agent.pos + (flee_vector / norm) * 200
-            else:
-                agent.target_pos = agent.pos + np.random.uniform(-1,1,size=2) * 200
-            return
+    if len(threat_positions):
+        offsets = agent.pos - threat_positions
+        if picture.wrap:
+            # Threats found across a wrapped screen edge are fled from the short way round.
+            dims = np.array([battlefield_intel['screen_width'], battlefield_intel['screen_height']], dtype=float)
+            offsets -= np.round(offsets / dims) * dims
+        flee_vector = offsets[np.argmin(np.sum(offsets**2, axis=1))]
+        norm = np.linalg.norm(flee_vector)
+        if norm > 0:
+            agent.target_pos = agent.pos + (flee_vector / norm) * 200
+        else:
+            agent.target_pos = agent.pos + battlefield_intel['rng'].uniform(-1,1,size=2) * 200
+        return
 
     if agent.target_pos is None or np.linalg.norm(agent.pos - agent.target_pos) < 150:
         w, h = battlefield_intel['screen_width'], battlefield_intel['screen_height']
-        agent.target_pos = np.array([random.uniform(w * 0.4, w * 0.8), random.uniform(h * 0.1, h * 0.9)], dtype=float)
+        rng = battlefield_intel['rng']
+        agent.target_pos = np.array([rng.uniform(w * 0.4, w * 0.8), rng.uniform(h * 0.1, h * 0.9)], dtype=float)
 
 # --- STRIKER STRATEGY ---
 def striker_market_participant_strategy(agent, battlefield_intel):
     local_enemies = battlefield_intel['neighbors']['enemies']
-    _publish_intelligence(local_enemies, agent, battlefield_intel)
 
     # 1. Self-Defense & Target Attack Logic
     # This logic now covers both assigned targets and immediate self-defense threats.
@@ -73,5 +71,5 @@ def striker_market_participant_strategy(agent, battlefield_intel):
 
     # 2. Default Behavior: If no tour/threats, rally.
     if not agent.tour and (agent.target_pos is None or np.linalg.norm(agent.pos - agent.target_pos) < 50):
-        rally_point = agent.base_pos + np.array([250, random.uniform(-250, 250)])
+        rally_point = agent.base_pos + np.array([250, battlefield_intel['rng'].uniform(-250, 250)])
         agent.target_pos = rally_point
\ No newline at end of file
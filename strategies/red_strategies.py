@@ -3,7 +3,6 @@
 # high-level "Missions" with low-level "Rules of Engagement" (ROE).
 
 import numpy as np
-import random
 
 # --- Helper Functions ---
 def get_closest_enemy(agent, enemies):
@@ -45,13 +44,13 @@ def _get_target_for_assault_mission(agent, mission_params):
     """Calculates navigation target for an assault mission."""
     return np.array(mission_params['target_pos'])
 
-def _get_target_for_sweep_mission(agent, mission_params):
+def _get_target_for_sweep_mission(agent, mission_params, rng):
     """Calculates navigation target for an area sweep mission."""
     if not hasattr(agent, 'patrol_target') or agent.patrol_target is None or \
        np.linalg.norm(agent.pos - agent.patrol_target) < 100:
         
         box = mission_params['sweep_box'] # [x_min, y_min, x_max, y_max]
-        agent.patrol_target = np.array([random.uniform(box[0], box[2]), random.uniform(box[1], box[3])])
+        agent.patrol_target = np.array([rng.uniform(box[0], box[2]), rng.uniform(box[1], box[3])])
     
     return agent.patrol_target
 
@@ -73,7 +72,7 @@ def advanced_strategy_dispatcher(agent, battlefield_intel):
     if mission_type == 'ASSAULT_POINT':
         macro_target = _get_target_for_assault_mission(agent, mission_params)
     elif mission_type == 'SWEEP_AREA':
-        macro_target = _get_target_for_sweep_mission(agent, mission_params)
+        macro_target = _get_target_for_sweep_mission(agent, mission_params, battlefield_intel['rng'])
     
     # Set the default navigation target to the macro target
     agent.target_pos = macro_target
@@ -141,4 +140,5 @@ def distributed_attack_strategy(agent, battlefield_intel):
     else:
         # If no assigned targets, patrol aggressively towards the enemy base area.
         w, h = battlefield_intel['screen_width'], battlefield_intel['screen_height']
-        agent.target_pos = np.array([random.uniform(w * 0.1, w * 0.4), random.uniform(h * 0.1, h * 0.9)], dtype=float)
\ No newline at end of file
+        rng = battlefield_intel['rng']
+        agent.target_pos = np.array([rng.uniform(w * 0.1, w * 0.4), rng.uniform(h * 0.1, h * 0.9)], dtype=float)
\ No newline at end of file
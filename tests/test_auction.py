@@ -0,0 +1,32 @@
+# Aegis Swarm 3.2 - Auction Engine Tests
+# Warm-started epsilon-auction rounds against the optimal (Hungarian) assignment.
+
+import os, sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pytest
+from intelligence.auction import EpsilonAuction, hungarian_assignment
+
+pytest.importorskip("scipy")
+
+def _total(cost, pairs):
+    return sum(cost[a, t] for a, t in pairs)
+
+@pytest.mark.parametrize("epsilon", [0.1, 1.0, 5.0])
+def test_warm_started_rounds_stay_within_epsilon_bound(epsilon):
+    rng = np.random.default_rng(7)
+    for trial in range(40):
+        auction = EpsilonAuction(epsilon)
+        task_ids, next_task_id = [], 0
+        for round_index in range(6):
+            # Churn the market between rounds, as expiring and new tasks do.
+            task_ids = [t for t in task_ids if rng.random() > 0.3]
+            while len(task_ids) < rng.integers(1, 20): task_ids.append(next_task_id); next_task_id += 1
+            agent_ids = rng.choice(40, int(rng.integers(1, 20)), replace=False).tolist()
+            cost = rng.uniform(0, 300, (len(agent_ids), len(task_ids)))
+            pairs = auction.solve(cost, agent_ids, task_ids)
+            assert len(pairs) == min(cost.shape)
+            assert len({a for a, _ in pairs}) == len({t for _, t in pairs}) == len(pairs)
+            optimal = _total(cost, hungarian_assignment(cost))
+            assert _total(cost, pairs) <= optimal + epsilon * min(cost.shape) + 1e-9
@@ -0,0 +1,72 @@
+# Aegis Swarm 3.2 - Combat Tests
+# Batched AOE detonations against a one-blast-at-a-time reference, and bulk
+# damage application against repeated apply_damage calls.
+
+import os, sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import copy
+import numpy as np
+import pytest
+import config
+from core.battlefield import Battlefield
+
+def _packed_battlefield(seed, rng):
+    battlefield = Battlefield(copy.deepcopy(config.full_config), seed=seed)
+    swarm = battlefield.swarm
+    swarm.pos[:] = rng.uniform(0, 150, (swarm.count, 2))  # everyone within blast range of someone
+    return battlefield
+
+def _sequential_blasts(swarm, detonators):
+    # Each detonator is out of the fight once it has fired; every blast sees the health from before the volley.
+    health, hits, kills = swarm.health.copy(), [], []
+    for agent in detonators:
+        health[agent.index] = 0
+        weapon, count = agent.weapon_template, 0
+        for i in np.flatnonzero(health > 0):
+            if swarm.team_id[i] == agent.team_id: continue
+            dist = np.linalg.norm(swarm.pos[agent.index] - swarm.pos[i])
+            damage = 0.0
+            if dist < weapon['kill_radius']: damage = health[i] + 1.0
+            elif dist < weapon['damage_radius']:
+                damage = weapon['base_damage'] * ((weapon['damage_radius'] - dist) / (weapon['damage_radius'] - weapon['kill_radius']))
+            if damage > 0:
+                hits.append((int(i), round(damage, 9))); count += damage >= health[i]
+        kills.append(count)
+    return sorted(hits), kills
+
+@pytest.mark.parametrize("seed", range(10))
+def test_detonations_match_sequential_blasts(seed):
+    rng = np.random.default_rng(seed)
+    battlefield = _packed_battlefield(seed, rng)
+    swarm = battlefield.swarm
+    armed = [a for a in battlefield.agents if a.weapon_template and a.weapon_template['type'] == 'suicide_aoe']
+    for agent in armed: agent.weapon_template = dict(agent.weapon_template, kill_prob=1.0)
+    detonators = [armed[i] for i in rng.choice(len(armed), min(8, len(armed)), replace=False)]
+    expected_hits, expected_kills = _sequential_blasts(swarm, detonators)
+    rows, damage, kills = battlefield.combat_model.resolve_detonations(
+        swarm, np.array([a.index for a in detonators]), np.flatnonzero(swarm.health > 0), battlefield.screen_dims)
+    assert kills.tolist() == expected_kills
+    assert sorted(zip(rows.tolist(), np.round(damage, 9).tolist())) == expected_hits
+
+@pytest.mark.parametrize("seed", range(5))
+def test_apply_damage_many_matches_repeated_apply_damage(seed):
+    rng = np.random.default_rng(seed)
+    bulk, single = (Battlefield(copy.deepcopy(config.full_config), seed=seed).swarm for _ in range(2))
+    for step in range(5):
+        # Rows repeat within a volley, and some are already dead.
+        rows = rng.integers(0, bulk.count, 60)
+        amounts = rng.uniform(0, 40, len(rows))
+        killed = bulk.apply_damage_many(rows, amounts, current_time=float(step))
+        totals = np.zeros(single.count); np.add.at(totals, rows, amounts)
+        expected_killed = [i for i in np.flatnonzero(totals) if single.health[i] > 0 and single.apply_damage(i, totals[i])]
+        for i in expected_killed:
+            if np.isnan(single.time_of_death[i]): single.time_of_death[i] = float(step)
+        assert sorted(killed.tolist()) == sorted(expected_killed)
+        np.testing.assert_allclose(bulk.health, single.health)
+        np.testing.assert_array_equal(bulk.time_of_death, single.time_of_death)
+        assert bulk.team_alive == single.team_alive
+        for team in bulk.team_alive:
+            mine = bulk.team_id == team
+            assert bulk.team_alive[team] == int((bulk.health[mine] > 0).sum())
+            assert bulk.team_health[team] == pytest.approx(bulk.health[mine].sum()) == pytest.approx(single.team_health[team])
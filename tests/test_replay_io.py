@@ -0,0 +1,88 @@
+# Aegis Swarm 3.2 - Replay I/O Tests
+# JSON and binary replays of the same frames must load to the same columns;
+# delta-encoded positions must stay within half a position quantum.
+
+import os, sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import copy
+import numpy as np
+import pytest
+import config
+from analysis.replay_io import ReplayRecorder, convert_replay, load_replay, make_replay_writer
+from core.battlefield import Battlefield
+
+def _synthetic_frames(rng, num_frames=150):
+    # Agents join and leave over the run (so later chunks are wider), wander, and lose health.
+    pos, health, frames = rng.uniform(0, 900, (30, 2)), np.full(30, 100.0), []
+    for i in range(num_frames):
+        pos = pos + rng.normal(0, 2.5, pos.shape); health = np.maximum(health - rng.integers(0, 2, 30) * 7.0, 0)
+        present = [k for k in range(30) if k < 10 + i // 10 and not (k % 7 == 3 and 40 <= i < 60)]
+        agents = [{"id": k, "team_id": 1 + k % 2, "pos": pos[k].tolist(), "health": float(health[k]), "max_health": 100.0, "role": "STRIKER"} for k in present]
+        tasks = [{"id": t, "pos": rng.uniform(0, 900, 2).tolist(), "status": ["OPEN", "ASSIGNED", "COMPLETED"][t % 3], "value": 1.5,
+                  "is_bundle": t == 2, "sub_task_count": 3 if t == 2 else 0} for t in range(i % 4)]
+        events = [{"type": "detonation", "pos": pos[0].tolist()}] if i % 25 == 0 else []
+        frames.append({"time": round(i * 0.016, 3), "blue_count": len(present) // 2, "red_count": len(present) - len(present) // 2,
+                       "agents": agents, "tasks": tasks, "events": events})
+    return frames
+
+def _write(path, frames, event_log, **options):
+    writer = make_replay_writer(str(path), **options)
+    for frame in frames: writer.write_frame(frame)
+    for event in event_log: writer.log_event(event)
+    return writer.close({"run": 1})
+
+def _assert_same_columns(a, b, pos_atol=0.0):
+    assert len(a) == len(b) and a.metadata == b.metadata and a.event_log == b.event_log and a.events == b.events
+    assert a.agent_id.tolist() == b.agent_id.tolist() and a.agent_team.tolist() == b.agent_team.tolist()
+    for name in ("time", "blue_count", "red_count", "present", "health", "task_indptr", "task_id", "task_pos", "task_status", "task_value", "task_is_bundle", "task_sub_count"):
+        np.testing.assert_array_equal(getattr(a, name), getattr(b, name), err_msg=name)
+    np.testing.assert_allclose(a.pos[a.present], b.pos[b.present], rtol=0, atol=pos_atol)
+
+@pytest.mark.parametrize("chunk_frames", [7, 256])
+def test_npz_and_json_load_to_the_same_columns(tmp_path, chunk_frames):
+    frames = _synthetic_frames(np.random.default_rng(chunk_frames))
+    event_log = [{"type": "task_status", "task_id": k, "status": "OPEN", "time": k * 0.016} for k in range(40)]
+    from_json = load_replay(_write(tmp_path / "run.json", frames, event_log, chunk_frames=chunk_frames))
+    from_npz = load_replay(_write(tmp_path / "run.npz", frames, event_log, chunk_frames=chunk_frames))
+    _assert_same_columns(from_json, from_npz)
+    # The legacy snapshot dicts survive the trip up to float32 rounding.
+    assert [a["id"] for a in from_npz.frame(45)["agents"]] == [a["id"] for a in frames[45]["agents"]]
+    assert from_npz.frame(71)["tasks"][2]["is_bundle"] and from_npz.frame(75)["events"] == frames[75]["events"]
+
+@pytest.mark.parametrize("chunk_frames, keyframe_interval, quantum", [(7, 3, 0.1), (64, 60, 0.1), (256, 1, 0.5), (50, 16, 0.01)])
+def test_delta_encoded_positions_stay_within_half_a_quantum(tmp_path, chunk_frames, keyframe_interval, quantum):
+    frames = _synthetic_frames(np.random.default_rng(keyframe_interval))
+    exact = load_replay(_write(tmp_path / "exact.npz", frames, [], chunk_frames=chunk_frames))
+    delta = load_replay(_write(tmp_path / "delta.npz", frames, [], chunk_frames=chunk_frames, delta_encoding=True,
+                               keyframe_interval=keyframe_interval, position_quantum=quantum))
+    # Quantization error does not build up across the deltas between keyframes.
+    _assert_same_columns(exact, delta, pos_atol=quantum / 2 + 1e-3)
+
+def test_convert_replay_round_trip(tmp_path):
+    frames = _synthetic_frames(np.random.default_rng(3), num_frames=40)
+    source = _write(tmp_path / "run.json", frames, [{"type": "detonation", "time": 0.5}])
+    converted = load_replay(convert_replay(source, 'npz', delta_encoding=True))
+    os.remove(source)
+    back = load_replay(convert_replay(str(tmp_path / "run.npz"), 'json'))
+    _assert_same_columns(converted, back)
+    assert back.frame(10)["agents"][0]["pos"] == pytest.approx(frames[10]["agents"][0]["pos"], abs=0.05 + 1e-3)
+
+@pytest.mark.parametrize("replay_format", ["json", "npz"])
+def test_recorder_samples_frames_and_logs_every_tick(tmp_path, replay_format):
+    cfg = copy.deepcopy(config.full_config)
+    battlefield = Battlefield(cfg, seed=5)
+    path = str(tmp_path / ("run." + replay_format))
+    recorder = ReplayRecorder(path, {"every_n_ticks": 4, "event_log": True, "delta_encoding": True}, tick_seconds=0.016)
+    for tick in range(30):
+        battlefield.update(0.016)
+        recorder.capture(battlefield, force_frame=tick == 29)
+    replay = load_replay(recorder.close({"run": 5}))
+    # Ticks 1, 5, ..., 29 are sampled and the last one (30) is forced.
+    assert replay.time.tolist() == [round(0.016 * tick, 3) for tick in [*range(1, 30, 4), 30]]
+    assert replay.metadata["recording"]["every_n_ticks"] == 4 and replay.metadata["run"] == 5
+    statuses = [event for event in replay.event_log if event["type"] == "task_status"]
+    final = {event["task_id"]: event["status"] for event in statuses}
+    table = battlefield.blue_marketplace.table
+    assert final == {row: table.task(row).status for row in range(table.count)}
+    assert len(replay.playback_times()) == 30
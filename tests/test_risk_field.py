@@ -0,0 +1,61 @@
+# Aegis Swarm 3.2 - Risk Raster Tests
+# Summed-area box sums against brute-force counts: exact when the box edges lie
+# on cell boundaries, bracketed by the enclosing and enclosed cell-aligned
+# boxes otherwise, and count_within close to the true disc counts.
+
+import os, sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pytest
+from intelligence.risk_field import RiskRaster
+
+WIDTH, HEIGHT, CELL = 400.0, 300.0, 25.0
+
+def _box_count(positions, x0, x1, y0, y1):
+    px, py = positions[:, 0], positions[:, 1]
+    return int(((px >= x0) & (px < x1) & (py >= y0) & (py < y1)).sum())
+
+@pytest.mark.parametrize("n", [0, 1, 50, 2000])
+def test_box_sum_is_exact_on_cell_boundaries(n):
+    rng = np.random.default_rng(n)
+    positions = rng.uniform(0, [WIDTH, HEIGHT], (n, 2))
+    raster = RiskRaster(WIDTH, HEIGHT, CELL)
+    raster.rebuild(positions)
+    centres = rng.integers(0, [WIDTH / CELL + 1, HEIGHT / CELL + 1], (100, 2)) * CELL
+    for half_cells in (1, 2, 5, 20):
+        half = half_cells * CELL
+        sums = raster.box_sum(centres, half)
+        expected = [_box_count(positions, x - half, x + half, y - half, y + half) for x, y in centres]
+        np.testing.assert_allclose(sums, expected, atol=1e-9)
+
+def test_box_sum_lies_between_enclosed_and_enclosing_cell_boxes():
+    rng = np.random.default_rng(1)
+    positions = rng.uniform(0, [WIDTH, HEIGHT], (1500, 2))
+    raster = RiskRaster(WIDTH, HEIGHT, CELL)
+    raster.rebuild(positions)
+    centres, halves = rng.uniform(0, [WIDTH, HEIGHT], (200, 2)), rng.uniform(5, 150, 200)
+    sums = np.concatenate([raster.box_sum(c, h) for c, h in zip(centres, halves)])
+    for (x, y), half, value in zip(centres, halves, sums):
+        inner = [np.ceil((x - half) / CELL) * CELL, np.floor((x + half) / CELL) * CELL, np.ceil((y - half) / CELL) * CELL, np.floor((y + half) / CELL) * CELL]
+        outer = [np.floor((x - half) / CELL) * CELL, np.ceil((x + half) / CELL) * CELL, np.floor((y - half) / CELL) * CELL, np.ceil((y + half) / CELL) * CELL]
+        low = _box_count(positions, *inner) if inner[0] < inner[1] and inner[2] < inner[3] else 0
+        assert low - 1e-9 <= value <= _box_count(positions, *outer) + 1e-9
+
+def test_points_outside_the_field_land_in_edge_cells():
+    raster = RiskRaster(WIDTH, HEIGHT, CELL)
+    raster.rebuild([[-10.0, -10.0], [WIDTH + 5, 50.0], [50.0, HEIGHT]])
+    assert raster.counts.sum() == 3 and raster.counts[0, 0] == 1 and raster.counts[2, -1] == 1 and raster.counts[-1, 2] == 1
+
+def test_count_within_approximates_disc_counts():
+    rng = np.random.default_rng(2)
+    positions = rng.uniform(0, [WIDTH, HEIGHT], (6000, 2))
+    raster = RiskRaster(WIDTH, HEIGHT, CELL)
+    raster.rebuild(positions)
+    radius = 60.0
+    # Away from the edges, where the field does not cut the disc.
+    points = rng.uniform([radius * 1.2, radius * 1.2], [WIDTH - radius * 1.2, HEIGHT - radius * 1.2], (300, 2))
+    exact = (np.linalg.norm(positions[None, :, :] - points[:, None, :], axis=-1) < radius).sum(axis=1)
+    estimate = raster.count_within(points, radius)
+    assert np.mean(np.abs(estimate - exact) / exact) < 0.05
+    assert abs(estimate.sum() / exact.sum() - 1.0) < 0.02
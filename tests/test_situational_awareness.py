@@ -0,0 +1,66 @@
+# Aegis Swarm 3.2 - Situational Picture Tests
+# The array track store (TTL heap, slot reuse, growth) against a dict of
+# last sightings, and contacts_within against brute-force distances.
+
+import os, sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pytest
+from core.clock import SimulationClock
+from intelligence.situational_awareness import SharedSituationalPicture
+
+WIDTH, HEIGHT, LIFESPAN = 1600.0, 900.0, 1.0
+
+def _picture(capacity=64, wrap=False):
+    clock = SimulationClock()
+    return clock, SharedSituationalPicture({'situational_picture': {'info_lifespan': LIFESPAN}}, (WIDTH, HEIGHT), clock=clock, wrap=wrap, capacity=capacity)
+
+@pytest.mark.parametrize("capacity", [1, 5, 64])
+def test_tracks_match_dict_reference(capacity):
+    rng = np.random.default_rng(capacity)
+    clock, picture = _picture(capacity)
+    reference = {}  # enemy id -> (position, last seen)
+    for tick in range(600):
+        clock.advance(0.05)
+        ids = rng.integers(0, 200, int(rng.integers(0, 30)))
+        positions = rng.uniform(0, HEIGHT, (len(ids), 2))
+        picture.upsert_detections(ids, positions)
+        for enemy_id, position in zip(ids.tolist(), positions): reference[enemy_id] = (position.copy(), clock.now())
+        picture.purge_stale_data()
+        reference = {k: v for k, v in reference.items() if v[1] + LIFESPAN > clock.now()}
+        ids_out, positions_out, seen_out = picture.get_known_enemies()
+        got = {k: (p, t) for k, p, t in zip(ids_out.tolist(), positions_out, seen_out.tolist())}
+        assert set(got) == set(reference)
+        assert all(np.array_equal(got[k][0], reference[k][0]) and got[k][1] == reference[k][1] for k in reference)
+        assert picture._free_count + picture.active.sum() == len(picture.enemy_ids)
+
+def test_repeated_ids_keep_the_last_row():
+    clock, picture = _picture()
+    picture.upsert_detections([3, 1, 3], [[1.0, 1.0], [2.0, 2.0], [5.0, 5.0]])
+    ids, positions, _ = picture.get_known_enemies()
+    assert dict(zip(ids.tolist(), positions.tolist())) == {1: [2.0, 2.0], 3: [5.0, 5.0]}
+
+@pytest.mark.parametrize("wrap", [False, True])
+def test_contacts_within_matches_brute_force(wrap):
+    rng = np.random.default_rng(5)
+    clock, picture = _picture(wrap=wrap)
+    for tick in range(40):
+        clock.advance(0.1)
+        ids = rng.integers(0, 300, 20)
+        picture.upsert_detections(ids, rng.uniform(0, [WIDTH, HEIGHT], (len(ids), 2)))
+        picture.purge_stale_data()
+        known_ids, known_positions, _ = picture.get_known_enemies()
+        by_id = dict(zip(known_ids.tolist(), known_positions.tolist()))
+        points, radius = rng.uniform(0, [WIDTH, HEIGHT], (8, 2)), float(rng.uniform(20, 250))
+        # The second, smaller query reuses the index built for the first.
+        for query_radius in (radius, radius / 2):
+            indptr, enemy_ids, positions = picture.contacts_within(points, query_radius)
+            for i, point in enumerate(points):
+                delta = np.abs(known_positions - point)
+                if wrap: delta = np.minimum(delta, np.array([WIDTH, HEIGHT]) - delta)
+                expected = known_ids[np.sqrt((delta ** 2).sum(axis=1)) < query_radius]
+                found = enemy_ids[indptr[i]:indptr[i + 1]]
+                assert sorted(found.tolist()) == sorted(expected.tolist())
+                # Each contact comes back with its own track position.
+                assert all(by_id[k] == p for k, p in zip(found.tolist(), positions[indptr[i]:indptr[i + 1]].tolist()))
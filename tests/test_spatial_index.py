@@ -0,0 +1,67 @@
+# Aegis Swarm 3.2 - Spatial Index Tests
+# UniformGrid radius queries against an O(N^2) reference, with and without
+# wrapped screen edges, and wrapped detection distances.
+
+import os, sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pytest
+from core.models import detect_pairs_numba
+from core.spatial_index import IncrementalGrid, UniformGrid
+
+WIDTH, HEIGHT = 400.0, 300.0
+
+def _distances(a, b, wrap):
+    delta = np.abs(a[:, None, :] - b[None, :, :])
+    if wrap: delta = np.minimum(delta, np.array([WIDTH, HEIGHT]) - delta)
+    return np.sqrt((delta ** 2).sum(axis=-1))
+
+def brute_force_neighbors(positions, radii, wrap):
+    """Reference for UniformGrid.query_neighbors: every other point closer than radii[i]."""
+    within = _distances(positions, positions, wrap) < radii[:, None]
+    np.fill_diagonal(within, False)
+    return [np.flatnonzero(row).tolist() for row in within]
+
+def _csr_lists(indptr, indices):
+    return [sorted(indices[indptr[i]:indptr[i + 1]].tolist()) for i in range(len(indptr) - 1)]
+
+@pytest.mark.parametrize("wrap", [False, True])
+def test_query_neighbors_matches_brute_force(wrap):
+    rng = np.random.default_rng(1)
+    for trial in range(20):
+        positions = rng.uniform(0, [WIDTH, HEIGHT], (int(rng.integers(1, 150)), 2))
+        radii = rng.uniform(5, 60, len(positions))
+        grid = UniformGrid(positions, radii.max(), WIDTH, HEIGHT, wrap=wrap)
+        assert _csr_lists(*grid.query_neighbors(radii)) == brute_force_neighbors(positions, radii, wrap)
+
+@pytest.mark.parametrize("wrap", [False, True])
+def test_query_points_matches_brute_force(wrap):
+    rng = np.random.default_rng(2)
+    positions = rng.uniform(0, [WIDTH, HEIGHT], (120, 2))
+    points = rng.uniform(0, [WIDTH, HEIGHT], (40, 2))
+    radii = rng.uniform(5, 60, len(points))
+    grid = UniformGrid(positions, radii.max(), WIDTH, HEIGHT, wrap=wrap)
+    expected = [np.flatnonzero(row).tolist() for row in _distances(points, positions, wrap) < radii[:, None]]
+    assert _csr_lists(*grid.query_points(points, radii)) == expected
+
+def test_detection_sees_across_wrapped_edges():
+    pos = np.array([[2.0, 150.0], [WIDTH - 3.0, 150.0]])
+    radius, pairs = np.array([10.0, 10.0]), np.array([0], dtype=np.int64)
+    rolls = np.zeros(1)
+    assert detect_pairs_numba(pos, radius, pairs, pairs + 1, rolls, 1.0, 0.0, WIDTH, HEIGHT, True)[0]
+    assert not detect_pairs_numba(pos, radius, pairs, pairs + 1, rolls, 1.0, 0.0, WIDTH, HEIGHT, False)[0]
+
+def test_incremental_grid_candidates_cover_radius():
+    rng = np.random.default_rng(3)
+    grid, positions = IncrementalGrid(30.0), {}
+    for key in range(200):
+        positions[key] = rng.uniform(0, [WIDTH, HEIGHT]); grid.insert(key, positions[key])
+    for key in range(0, 200, 3):
+        positions[key] = rng.uniform(0, [WIDTH, HEIGHT]); grid.move(key, positions[key])
+    for key in range(1, 200, 7):
+        del positions[key]; grid.remove(key)
+    for query in rng.uniform(0, [WIDTH, HEIGHT], (30, 2)):
+        candidates = grid.candidates(query, 45.0)
+        assert len(candidates) == len(set(candidates)) and set(candidates) <= set(positions)
+        assert {k for k, p in positions.items() if np.linalg.norm(p - query) < 45.0} <= set(candidates)
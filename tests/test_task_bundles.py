@@ -0,0 +1,105 @@
+# Aegis Swarm 3.2 - Task Bundle Tests
+# Running bundle position sums against recomputed centroids, and reclamation of
+# retired task rows and member ranges, under a churning enemy population.
+
+import os, sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import copy
+from types import SimpleNamespace
+import numpy as np
+import pytest
+import config
+from core.clock import SimulationClock
+from core.task import STATUS_COMPLETED, STATUS_OPEN, TaskTable
+from intelligence.marketplace import Marketplace
+
+RED_TEAM_ID = 2
+
+def _check_bundles(table, live_ids):
+    owned = []
+    for row in live_ids:
+        if not table.is_bundle[row] or table.member_count[row] == 0: continue
+        members = table.member_rows(row)
+        np.testing.assert_allclose(table.member_pos_sum[row], table.position[members].sum(axis=0), atol=1e-9)
+        assert (table.bundle_parent[members] == row).all()
+        owned.append((int(table.member_start[row]), int(table.member_start[row] + table.member_count[row])))
+    # Live member ranges never overlap, and all lie in the used part of the list.
+    owned.sort()
+    assert all(end <= start for (_, end), (start, _) in zip(owned, owned[1:]))
+    assert all(end <= table.members_used for _, end in owned)
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_market_churn_keeps_sums_exact_and_table_bounded(seed):
+    rng = np.random.default_rng(seed)
+    cfg = copy.deepcopy(config.full_config)
+    clock = SimulationClock()
+    market = Marketplace(cfg, clock=clock)
+    context = {'screen_width': market.screen_width, 'screen_height': 800.0}
+    enemies, next_enemy_id, peak_live = {}, 0, 0
+    for step in range(300):
+        clock.advance(0.25)
+        # Enemies arrive in clusters (so bundles form), wander, and die.
+        for _ in range(int(rng.integers(0, 3))):
+            centre = rng.uniform(100, 900, 2)
+            for _ in range(int(rng.integers(1, 5))):
+                enemies[next_enemy_id] = SimpleNamespace(id=next_enemy_id, team_id=RED_TEAM_ID, pos=centre + rng.normal(0, 30, 2))
+                next_enemy_id += 1
+        for enemy_id in [e for e in enemies if rng.random() < 0.04]: del enemies[enemy_id]
+        for enemy in enemies.values(): enemy.pos = enemy.pos + rng.normal(0, 3, 2)
+        # Strikers finish some tasks.
+        for task_id in list(market.tasks):
+            if rng.random() < 0.01: market.table.complete(task_id)
+        market.update_market_state(list(enemies.values()), context)
+        seen = [e for e in enemies.values() if rng.random() < 0.8]
+        market.ingest_detections([0] * len(seen), [e.id for e in seen], [e.pos for e in seen])
+        live = list(market.tasks)
+        peak_live = max(peak_live, len(live))
+        _check_bundles(market.table, live)
+        table = market.table
+        assert len(set(table.serial[live].tolist())) == len(live)
+        assert not set(live) & set(table._free_rows)
+        for row in live:
+            if not table.is_bundle[row] and table.status[row] != STATUS_COMPLETED:
+                assert market.task_of_enemy[table.enemy_target_id[row]] == row
+    table = market.table
+    assert table.created > 2 * peak_live
+    # Rows wait one value update before reuse, so the table holds at most about two updates' worth of tasks.
+    assert table.count <= 2 * peak_live + 64
+    assert len(table.members) <= 4 * max(table.members_used, 64)
+
+def test_reclaimed_rows_come_back_clean():
+    table = TaskTable()
+    rows = table.add_many(np.array([[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]]), np.array([7, 8, 9]), np.ones(3), creation_time=0.0)
+    table.add_reporters(rows, np.array([1, 2, 3]))
+    bundle = table.create_bundle(rows[:2], creation_time=0.0)
+    table.assign(bundle, agent_id=4, winning_bid=2.5)
+    table.complete(bundle)
+    table.retire([bundle, *rows[:2].tolist()])
+    # Retired rows are only reused after the next reclaim.
+    assert table.add_many(np.zeros((1, 2)), np.array([1]), np.ones(1), creation_time=1.0).tolist() == [4]
+    table.reclaim_retired()
+    reused = table.add_many(np.full((4, 2), 9.0), np.array([10, 11, 12, 13]), np.ones(4), creation_time=2.0)
+    assert sorted(reused.tolist()[:3]) == sorted([bundle, *rows[:2].tolist()]) and reused[3] == 5 == table.count - 1
+    assert table.serial[reused].tolist() == [5, 6, 7, 8]
+    for row in reused.tolist():
+        task = table.task(row)
+        assert task.status == 'OPEN' and task.assigned_agent_id is None and task.winning_bid == np.inf
+        assert not task.is_bundle and not task.is_part_of_bundle and table.reporter_count[row] == 0
+        assert table.member_count[row] == 0 and (table.position[row] == 9.0).all()
+    assert (table.status[rows[2]] == STATUS_OPEN) and table.reporter_count[rows[2]] == 1
+
+def test_full_member_list_is_compacted_before_growing():
+    table = TaskTable()
+    rng = np.random.default_rng(4)
+    live_bundles = []
+    for step in range(200):
+        rows = table.add_many(rng.uniform(0, 500, (3, 2)), np.arange(3), np.ones(3), creation_time=float(step))
+        live_bundles.append(table.create_bundle(rows, creation_time=float(step)))
+        if len(live_bundles) > 5:
+            table.dissolve_bundle(live_bundles.pop(0))
+        _check_bundles(table, live_bundles)
+        for bundle in live_bundles:
+            np.testing.assert_allclose(table.centroid(bundle), table.position[table.member_rows(bundle)].mean(axis=0))
+    # Only five bundles of three are ever alive, so the list stays small.
+    assert len(table.members) <= 64
@@ -0,0 +1,102 @@
+# Aegis Swarm 3.2 - Task Table Tests
+# TaskTable rows and their Task facades against a per-object reference with the
+# semantics of the old one-object-per-task Task class.
+
+import os, sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pytest
+from core.task import TaskTable
+
+class ReferenceTask:
+    """The old per-object task: a bundle owns its sub-task objects and cascades status changes to them."""
+    def __init__(self, position, enemy_target_id, reporting_agent_id, initial_value=1.0):
+        self.position = np.array(position, dtype=float)
+        self.enemy_target_id = enemy_target_id
+        self.base_value = self.current_value = float(initial_value)
+        self.reporters = {reporting_agent_id}
+        self.status, self.assigned_agent_id, self.winning_bid = 'OPEN', None, float('inf')
+        self.is_bundle, self.is_part_of_bundle, self.sub_tasks = False, False, []
+
+    def assign_to(self, agent_id, winning_bid):
+        self.status, self.assigned_agent_id, self.winning_bid = 'ASSIGNED', agent_id, winning_bid
+        for sub_task in self.sub_tasks: sub_task.status, sub_task.assigned_agent_id = 'ASSIGNED', agent_id
+
+    def release(self):
+        self.status, self.assigned_agent_id, self.winning_bid = 'OPEN', None, float('inf')
+        for sub_task in self.sub_tasks: sub_task.release()
+
+    def complete(self):
+        self.status = 'COMPLETED'
+        for sub_task in self.sub_tasks: sub_task.complete()
+
+    @staticmethod
+    def create_bundle(tasks):
+        bundle = ReferenceTask(np.mean([t.position for t in tasks], axis=0), tasks[0].enemy_target_id, None)
+        bundle.is_bundle, bundle.sub_tasks = True, tasks
+        for task in tasks: task.is_part_of_bundle = True
+        bundle.base_value = sum(t.base_value for t in tasks)
+        bundle.current_value = sum(t.current_value for t in tasks)
+        bundle.reporters = set.union(*[t.reporters for t in tasks])
+        return bundle
+
+def _assert_same(table, row, ref):
+    task = table.task(row)
+    np.testing.assert_allclose(task.position, ref.position)
+    assert task.status == ref.status and task.enemy_target_id == ref.enemy_target_id
+    assert task.assigned_agent_id == ref.assigned_agent_id and task.winning_bid == ref.winning_bid
+    assert task.is_bundle == ref.is_bundle and task.is_part_of_bundle == ref.is_part_of_bundle
+    assert task.base_value == pytest.approx(ref.base_value) and task.current_value == pytest.approx(ref.current_value)
+    reporters = ref.reporters - {None}
+    assert task.reporter_count == len(reporters)
+    assert {agent_id for agent_id in range(130) if task.has_reporter(agent_id)} == reporters
+
+@pytest.mark.parametrize("seed", [0, 1, 2, 3])
+def test_table_matches_per_object_tasks(seed):
+    rng = np.random.default_rng(seed)
+    table, refs = TaskTable(), {}
+    for step in range(400):
+        op = rng.integers(6)
+        singles = [row for row, ref in refs.items() if not ref.is_bundle]
+        top_level = [row for row, ref in refs.items() if not ref.is_part_of_bundle]
+        if op == 0 or not refs:
+            position, enemy_id, reporter = rng.uniform(0, 800, 2), int(rng.integers(100)), int(rng.integers(130))
+            value = float(rng.uniform(0.5, 3.0))
+            row = table.add(position, enemy_id, reporter, creation_time=float(step), initial_value=value)
+            refs[row] = ReferenceTask(position, enemy_id, reporter, value)
+        elif op == 1:
+            row, reporter = int(rng.choice(singles)), int(rng.integers(130))
+            table.task(row).add_reporter(reporter); refs[row].reporters.add(reporter)
+        elif op == 2:
+            free = [row for row in singles if not refs[row].is_part_of_bundle and refs[row].status == 'OPEN']
+            if len(free) < 2: continue
+            rows = rng.choice(free, int(rng.integers(2, min(4, len(free)) + 1)), replace=False).tolist()
+            bundle = table.create_bundle(rows, creation_time=float(step))
+            refs[bundle] = ReferenceTask.create_bundle([refs[row] for row in rows])
+            assert [task.id for task in table.task(bundle).sub_tasks] == rows
+        elif op == 3:
+            row, agent_id, bid = int(rng.choice(top_level)), int(rng.integers(50)), float(rng.uniform(0, 100))
+            table.task(row).assign_to(agent_id, bid); refs[row].assign_to(agent_id, bid)
+        elif op == 4:
+            row = int(rng.choice(top_level))
+            if rng.random() < 0.5: table.task(row).release(); refs[row].release()
+            else: table.task(row).complete(); refs[row].complete()
+        else:
+            row, position = int(rng.choice(singles)), rng.uniform(0, 800, 2)
+            table.task(row).update_position(position); refs[row].position = np.array(position)
+        if step % 20 == 19:
+            for row, ref in refs.items(): _assert_same(table, row, ref)
+    for row, ref in refs.items(): _assert_same(table, row, ref)
+
+def test_facades_are_stable_and_positions_are_copies():
+    table = TaskTable()
+    first = table.add([1.0, 2.0], 5, 0, creation_time=0.0)
+    task = table.task(first)
+    for i in range(100): table.add([float(i), 0.0], i, i, creation_time=1.0)
+    # Growing the table keeps the facade valid and pointing at the same row.
+    assert table.task(first) is task and task.enemy_target_id == 5
+    position = task.position
+    position[0] = 99.0
+    assert task.position.tolist() == [1.0, 2.0]
+    assert task.creation_time == 0.0 and table.task(first + 1).creation_time == 1.0